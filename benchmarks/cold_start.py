@@ -0,0 +1,83 @@
+"""
+Cold-start benchmark of the headless entry point: a fresh `python -m headcount select` on the bundled roster.
+
+    python -m benchmarks.cold_start                                   # median of 5 runs
+    python -m benchmarks.cold_start --runs 9 --thresholds benchmarks/thresholds.json
+
+Each run is a new interpreter, so imports, the schema plan, parsing, features, ranking and the CSV write
+are all paid again (the on-disk roster cache is bypassed). `wall_ms`, the median time from process start to
+the CSV being written, is the end-to-end cold start and is checked against `cold_start_ms` in the thresholds
+file. The same number of fresh `import numpy, pandas` runs give the baseline no pandas program can beat;
+`headcount_ms` (median wall time minus median baseline) is what this package adds and is checked against
+`cold_start_overhead_ms`. The report also lists any Streamlit module the run imported, which should be none.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+DEFAULT_ROSTER = REPO / "data_room/people/employee_roster.csv"
+DEFAULT_THRESHOLDS = Path(__file__).resolve().parent / "thresholds.json"
+
+
+def _wall_ms(argv) -> float:
+    start = time.perf_counter()
+    subprocess.run(argv, cwd=REPO, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1e3
+
+
+def _imported_modules(argv) -> list:
+    """Top-level modules a run imports, from `-X importtime`."""
+    result = subprocess.run(argv[:1] + ["-X", "importtime"] + argv[1:], cwd=REPO, check=True, capture_output=True, text=True)
+    names = (line.rsplit("|", 1)[-1].strip() for line in result.stderr.splitlines() if line.startswith("import time:"))
+    return sorted({name.split(".")[0] for name in names})
+
+
+def measure(roster=DEFAULT_ROSTER, runs=5, headcount=10) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        select = [sys.executable, "-m", "headcount", "select", str(roster), "--headcount", str(headcount), "--no-cache", "--out", str(Path(tmp) / "top.csv")]
+        baseline = [sys.executable, "-c", "import numpy, pandas"]
+        _wall_ms(select)  # warm the OS file cache; bytecode is compiled on this run too
+        walls = [_wall_ms(select) for _ in range(runs)]
+        baselines = [_wall_ms(baseline) for _ in range(runs)]
+        modules = _imported_modules(select)
+    wall, base = statistics.median(walls), statistics.median(baselines)
+    return {
+        "roster": str(roster),
+        "runs": runs,
+        "wall_ms": round(wall, 1),
+        "pandas_baseline_ms": round(base, 1),
+        "headcount_ms": round(wall - base, 1),
+        "streamlit_modules": [m for m in modules if m in ("streamlit", "altair")],
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.cold_start", description="Benchmark the headless cold start")
+    parser.add_argument("--roster", default=str(DEFAULT_ROSTER))
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per measurement; the median is reported")
+    parser.add_argument("--thresholds", default=None, help="JSON file with cold_start_ms / cold_start_overhead_ms limits")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    report = measure(Path(args.roster), runs=max(1, args.runs))
+    failed = bool(report["streamlit_modules"])
+    if args.thresholds:
+        thresholds = json.loads(Path(args.thresholds).read_text())
+        for measured, name in (("wall_ms", "cold_start_ms"), ("headcount_ms", "cold_start_overhead_ms")):
+            limit = thresholds.get(name)
+            report[name] = limit
+            failed = failed or (limit is not None and report[measured] > limit)
+    print(json.dumps(report, indent=2))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Headless benchmark of the roster pipeline, one stage at a time, on synthetic rosters.
+
+    python -m benchmarks.run_benchmarks                          # 1k/10k/100k rows, every schema
+    python -m benchmarks.run_benchmarks --sizes 1000000,10000000 --schemas series_e --repeat 1
+    python -m benchmarks.run_benchmarks --out report.json --thresholds benchmarks/thresholds.json
+
+Stages timed separately: load (CSV -> cleaned roster, streaming above STREAM_THRESHOLD_BYTES like the app),
+detect (equity column/format detection on the raw column), features (build_features), score (one weighted
+sum) and select (ranking plus a top-N summary). Each stage reports the best of `--repeat` runs in seconds and
+microseconds per row. With --thresholds, any stage slower per row than its limit (for sizes of at least
+`min_rows`) is listed under "regressions" and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import SCHEMAS, write_roster
+from headcount import engine
+from headcount.selection import RankedSelection
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_THRESHOLDS = Path(__file__).resolve().parent / "thresholds.json"
+STAGES = ("load", "detect", "features", "score", "select")
+SELECT_HEADCOUNT = 100
+
+
+def _best_of(repeat: int, fn):
+    """(best wall time in seconds, result of the last call)."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _load(path: Path):
+    if path.stat().st_size > engine.STREAM_THRESHOLD_BYTES:
+        return engine.load_roster(path, chunksize=engine.STREAM_CHUNK_ROWS)
+    return engine.load_roster(path)
+
+
+def _raw_equity_column(path: Path) -> pd.DataFrame:
+    column, _ = engine.find_equity_column(pd.read_csv(path, nrows=0).columns)
+    return pd.read_csv(path, usecols=[column], dtype=str, keep_default_na=False)
+
+
+def _select(scores, comp):
+    ranking = RankedSelection(scores, comp)
+    return ranking.summary(min(SELECT_HEADCOUNT, len(scores)))
+
+
+def bench_one(path: Path, schema: str, n_rows: int, repeat: int) -> dict:
+    """Time every stage on one roster file."""
+    timings = {}
+    timings["load"], (df, equity_info) = _best_of(repeat, lambda: _load(path))
+    raw = _raw_equity_column(path)
+    timings["detect"], detected = _best_of(repeat, lambda: engine.detect_equity_format(raw))
+    timings["features"], features = _best_of(repeat, lambda: engine.build_features(df, equity_info["format"]))
+    timings["score"], scores = _best_of(repeat, lambda: engine.score(features, engine.DEFAULT_WEIGHTS))
+    timings["select"], _ = _best_of(repeat, lambda: _select(scores, features.comp))
+    return {
+        "schema": schema,
+        "rows": n_rows,
+        "loaded_rows": len(df),
+        "file_bytes": path.stat().st_size,
+        "equity_format": detected["format"],
+        "seconds": {stage: round(timings[stage], 6) for stage in STAGES},
+        "us_per_row": {stage: round(timings[stage] * 1e6 / max(1, n_rows), 4) for stage in STAGES},
+    }
+
+
+def check_thresholds(results: list, thresholds: dict) -> list:
+    """Stages whose microseconds per row exceed the configured limit."""
+    min_rows = thresholds.get("min_rows", 0)
+    limits = thresholds.get("us_per_row", {})
+    regressions = []
+    for result in results:
+        if result["rows"] < min_rows:
+            continue
+        for stage, limit in limits.items():
+            actual = result["us_per_row"].get(stage)
+            if actual is not None and actual > limit:
+                regressions.append(
+                    {"schema": result["schema"], "rows": result["rows"], "stage": stage, "us_per_row": actual, "limit": limit}
+                )
+    return regressions
+
+
+def run(sizes, schemas, repeat=3, seed=0, workdir=None) -> list:
+    results = []
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for schema in schemas:
+            for n_rows in sizes:
+                path = Path(tmp) / "{}_{}.csv".format(schema, n_rows)
+                write_roster(path, schema, n_rows, seed=seed)
+                results.append(bench_one(path, schema, n_rows, repeat))
+                engine.clear_feature_cache()
+                path.unlink()
+                print(
+                    "{schema:>15} {rows:>10,} rows  ".format(**results[-1])
+                    + "  ".join("{}={:.4f}s".format(s, results[-1]["seconds"][s]) for s in STAGES),
+                    file=sys.stderr,
+                )
+    return results
+
+
+def _int_list(text: str) -> list:
+    return [int(float(part)) for part in text.split(",") if part]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run_benchmarks", description="Benchmark the roster pipeline")
+    parser.add_argument("--sizes", type=_int_list, default=list(DEFAULT_SIZES), help="Comma-separated row counts (1e6 ok)")
+    parser.add_argument("--schemas", default=",".join(SCHEMAS), help="Comma-separated schemas: " + ", ".join(SCHEMAS))
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the best is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=None, help="Where to write the temporary roster files")
+    parser.add_argument("--out", default=None, help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--thresholds", default=None, help="JSON file of per-stage microsecond-per-row limits")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    schemas = [s for s in args.schemas.split(",") if s]
+    unknown = sorted(set(schemas) - set(SCHEMAS))
+    if unknown:
+        raise SystemExit("Unknown schema(s): {}".format(", ".join(unknown)))
+
+    results = run(args.sizes, schemas, repeat=max(1, args.repeat), seed=args.seed, workdir=args.workdir)
+    report = {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    if args.thresholds:
+        thresholds = json.loads(Path(args.thresholds).read_text())
+        report["thresholds"] = thresholds
+        report["regressions"] = check_thresholds(results, thresholds)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+    else:
+        print(text)
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
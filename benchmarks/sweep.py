@@ -0,0 +1,73 @@
+"""
+Benchmark of the batch scenario sweep: 50k employees x 100k weight vectors x 3 headcounts on one core.
+
+    python -m benchmarks.sweep                                        # the full target case
+    python -m benchmarks.sweep --scenarios 10000 --thresholds benchmarks/thresholds.json
+
+Weight vectors are drawn without replacement from the default `weight_grid` and evaluated with
+`run_sweep(..., workers=1)`, so the number is single-core: more workers only divide it. `seconds_per_100k`
+(wall time scaled to 100k scenarios, for shorter runs) is checked against `sweep_seconds` in the thresholds
+file.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.synthetic import write_roster
+from headcount import engine, sweep
+
+DEFAULT_THRESHOLDS = Path(__file__).resolve().parent / "thresholds.json"
+HEADCOUNTS = (10, 100, 1000)
+
+
+def measure(rows=50_000, scenarios=100_000, seed=0) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "roster.csv"
+        write_roster(path, "data_room", rows, seed=seed)
+        df, equity_info = engine.load_roster(path)
+    features = engine.get_features(df, equity_info["format"])
+    grid = sweep.weight_grid()
+    weights = grid[np.random.default_rng(seed).choice(len(grid), min(scenarios, len(grid)), replace=False)]
+    start = time.perf_counter()
+    result = sweep.run_sweep(features, weights, HEADCOUNTS, workers=1)
+    seconds = time.perf_counter() - start
+    return {
+        "rows": len(features),
+        "scenarios": len(weights),
+        "headcounts": list(HEADCOUNTS),
+        "result_rows": len(result),
+        "cpu_count": os.cpu_count(),
+        "seconds": round(seconds, 2),
+        "seconds_per_100k": round(seconds * 100_000 / max(1, len(weights)), 2),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.sweep", description="Benchmark the scenario sweep on one core")
+    parser.add_argument("--rows", type=int, default=50_000, help="Employees in the synthetic roster")
+    parser.add_argument("--scenarios", type=int, default=100_000, help="Weight vectors drawn from the default grid")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--thresholds", default=None, help="JSON file with a sweep_seconds limit")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    report = measure(args.rows, args.scenarios, args.seed)
+    failed = False
+    if args.thresholds:
+        limit = json.loads(Path(args.thresholds).read_text()).get("sweep_seconds")
+        report["sweep_seconds"] = limit
+        failed = limit is not None and report["seconds_per_100k"] > limit
+    print(json.dumps(report, indent=2))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Synthetic roster generator that mimics every CSV schema the app accepts.
+
+    data_room       data_room/people/employee_roster.csv (level, start_date, equity_pct, summary trailer)
+    seed_startup    employee_roster_seed_startup.csv (employee_name/title, equity_shares)
+    seed_refreshes  employee_roster_seed_startup_refreshes.csv (seed_startup + equity_refreshes)
+    series_e        employee_roster_series_e.csv (id/salary/currency/rsu_grant_value, messy values, trailer)
+
+Rows are generated column-wise with NumPy, in chunks, so 10M-row files can be written without holding
+them in memory. The output is deterministic for a given (schema, n_rows, seed).
+"""
+import numpy as np
+import pandas as pd
+
+SCHEMAS = ("data_room", "seed_startup", "seed_refreshes", "series_e")
+CHUNK_ROWS = 500_000
+
+_LEVELS = np.array(["C-Level", "VP", "Director", "Manager", "Staff", "Senior", "Mid", "Junior"])
+_LEVEL_P = np.array([0.002, 0.008, 0.03, 0.07, 0.08, 0.25, 0.34, 0.22])
+_DEPARTMENTS = np.array(["Engineering", "Product", "Sales", "Marketing", "Finance", "Operations", "Executive"])
+_ROLES = np.array(["Backend Engineer", "ML Engineer", "Product Manager", "Account Executive", "Accountant", "Recruiter"])
+_LOCATIONS = np.array(["Boston", "Santa Clara", "San Francisco, CA", "New York, NY", "Remote", "Berlin", "Tokyo"])
+_FIRST = np.array(["Ana", "Bo", "Carla", "Dev", "Eli", "Fatima", "Gus", "Hana", "Ivan", "Jo"])
+_LAST = np.array(["Li", "Kim", "Garcia", "Smith", "Patel", "Nguyen", "Müller", "O'Brien", "Tanaka", "Walsh"])
+_CURRENCIES = np.array(["USD", "EUR", "JPY"])
+
+
+def _ids(start: int, n: int, width: int) -> np.ndarray:
+    return np.char.add("E", np.char.zfill(np.arange(start + 1, start + n + 1).astype(str), width))
+
+
+def _managers(start: int, n: int, width: int, rng, root_token: str) -> np.ndarray:
+    """A random tree: employee i reports to someone among the first i // 4 employees (roots report to the board)."""
+    idx = np.arange(start, start + n)
+    manager = (rng.random(n) * (idx // 4)).astype(np.int64)
+    out = np.char.add("E", np.char.zfill((manager + 1).astype(str), width)).astype(object)
+    out[idx < 2] = root_token
+    return out
+
+
+def _chunk(schema: str, start: int, n: int, total: int, rng) -> pd.DataFrame:
+    width = max(3, len(str(total)))
+    ids = _ids(start, n, width)
+    names = np.char.add(np.char.add(rng.choice(_FIRST, n), " "), rng.choice(_LAST, n))
+    comp = (rng.lognormal(11.9, 0.35, n) // 1000 * 1000).astype(np.int64)
+    start_days = rng.integers(0, 365 * 8, n)
+    start_dates = (np.datetime64("2017-01-01") + start_days.astype("timedelta64[D]")).astype(str)
+
+    if schema == "data_room":
+        return pd.DataFrame(
+            {
+                "employee_id": ids,
+                "name": names,
+                "role": rng.choice(_ROLES, n),
+                "level": rng.choice(_LEVELS, n, p=_LEVEL_P),
+                "department": rng.choice(_DEPARTMENTS, n),
+                "location": rng.choice(_LOCATIONS[:2], n),
+                "start_date": start_dates,
+                "comp_usd": comp,
+                "equity_pct": np.round(rng.exponential(0.05, n), 3),
+                "reports_to": _managers(start, n, width, rng, "Board"),
+            }
+        )
+    if schema in ("seed_startup", "seed_refreshes"):
+        bonus = np.where(rng.random(n) < 0.4, (comp * 0.25).astype(np.int64).astype(str), "")
+        df = pd.DataFrame(
+            {
+                "employee_id": ids,
+                "employee_name": names,
+                "title": rng.choice(_ROLES, n),
+                "reports_to": _managers(start, n, width, rng, "Board"),
+                "location": rng.choice(_LOCATIONS[2:5], n),
+                "comp_usd": comp,
+                "bonus_ote_usd": bonus,
+                "equity_shares": (rng.lognormal(10.5, 1.0, n)).astype(np.int64),
+            }
+        )
+        if schema == "seed_refreshes":
+            df["equity_refreshes"] = np.where(rng.random(n) < 0.5, 0, (rng.lognormal(9.5, 0.8, n)).astype(np.int64))
+        return df
+    if schema == "series_e":
+        currency = rng.choice(_CURRENCIES, n, p=[0.85, 0.1, 0.05])
+        salary = np.where(currency == "JPY", comp * 100, comp).astype(str).astype(object)
+        salary[rng.random(n) < 0.002] = "TBD - hourly"
+        level = np.char.add("L", rng.integers(0, 11, n).astype(str))
+        return pd.DataFrame(
+            {
+                "id": _ids(start, n, max(4, width)),
+                "employee_name": names,
+                "position": rng.choice(_ROLES, n),
+                "dept": rng.choice(_DEPARTMENTS, n),
+                "manager_id": _managers(start, n, max(4, width), rng, "BOARD"),
+                "office_location": rng.choice(_LOCATIONS, n),
+                "country": rng.choice(np.array(["USA", "Germany", "Japan"]), n),
+                "salary": salary,
+                "currency": currency,
+                "bonus_target_pct": rng.integers(0, 100, n),
+                "rsu_grant_value": (rng.lognormal(11.5, 0.9, n) // 1000 * 1000).astype(np.int64),
+                "vesting_start_date": start_dates,
+                "hire_date": start_dates,
+                "employment_type": np.where(rng.random(n) < 0.97, "Full-Time", "Intern"),
+                "cost_center": np.char.add("00", rng.integers(1, 10, n).astype(str)),
+                "is_exempt": rng.choice(np.array(["Yes", "No", "Y", "TRUE", "N/A"]), n),
+                "email": np.char.add(np.char.lower(ids.astype(str)), "@example.com"),
+                "phone": np.char.add("+1 555 ", rng.integers(1000000, 9999999, n).astype(str)),
+                "level": level,
+                "performance_rating": rng.choice(np.array(["Meets", "Exceeds", ""]), n),
+            }
+        )
+    raise ValueError("Unknown schema {!r} (expected one of: {})".format(schema, ", ".join(SCHEMAS)))
+
+
+def _trailer(schema: str, columns: list, n_rows: int) -> str:
+    """The non-employee summary rows the real exports carry at the bottom."""
+    if schema == "data_room":
+        # Short rows, like the bundled roster's "Summary Statistics" section
+        return "\nSummary Statistics\nTotal Headcount,{}\nMedian Comp,140000\n".format(n_rows)
+    pad = "," * (len(columns) - 2)
+    lines = ["", "Summary Statistics,", "Total Headcount,{}".format(n_rows)]
+    if schema == "series_e":
+        lines += ["Avg Base (USD),~175000", "Last Updated,2024-01-15"]
+    return "\n".join(line + pad if line else "," * (len(columns) - 1) for line in lines) + "\n"
+
+
+def generate_roster(schema: str, n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """An in-memory synthetic roster (no trailer rows)."""
+    rng = np.random.default_rng(seed)
+    return _chunk(schema, 0, n_rows, n_rows, rng)
+
+
+def write_roster(path, schema: str, n_rows: int, seed: int = 0, chunk_rows: int = CHUNK_ROWS) -> None:
+    """Write a synthetic roster CSV of `n_rows` employees plus the schema's trailer rows, chunk by chunk."""
+    rng = np.random.default_rng(seed)
+    columns = None
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        for start in range(0, n_rows, chunk_rows):
+            chunk = _chunk(schema, start, min(chunk_rows, n_rows - start), n_rows, rng)
+            columns = list(chunk.columns)
+            chunk.to_csv(fh, index=False, header=start == 0)
+        if columns is None:
+            columns = list(_chunk(schema, 0, 0, 0, rng).columns)
+            fh.write(",".join(columns) + "\n")
+        fh.write(_trailer(schema, columns, n_rows))
@@ -0,0 +1,39 @@
+"""
+Streamlit-free core of the headcount scenario simulator.
+
+The names below are imported on first use (PEP 562), so `import headcount` and `python -m headcount --help`
+do not pay for pandas; `from headcount import load_roster` works as before.
+"""
+import importlib
+
+_EXPORTS = {
+    "DEFAULT_WEIGHTS": "headcount.engine",
+    "FEATURE_NAMES": "headcount.engine",
+    "FeatureSet": "headcount.engine",
+    "build_features": "headcount.engine",
+    "clear_feature_cache": "headcount.engine",
+    "detect_equity_format": "headcount.engine",
+    "get_features": "headcount.engine",
+    "load_features": "headcount.pipeline",
+    "load_roster": "headcount.engine",
+    "parse_weights": "headcount.batch",
+    "roster_features": "headcount.pipeline",
+    "score": "headcount.engine",
+    "select_roster": "headcount.batch",
+    "select_top": "headcount.engine",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError("module 'headcount' has no attribute {!r}".format(name))
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
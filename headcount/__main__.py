@@ -0,0 +1,199 @@
+"""
+Command line entry point: `python -m headcount <command>`.
+
+    python -m headcount cache list          # show cached rosters, most recently used first
+    python -m headcount cache clear         # invalidate every cached roster
+    python -m headcount cache clear KEY     # invalidate one entry
+    python -m headcount cache evict --max-bytes N
+    python -m headcount sweep ROSTER.csv --step 0.5 --headcounts 10,50,100 --out sweep.parquet
+    python -m headcount compare A.csv B.csv C.csv --headcount 10
+    python -m headcount select ROSTER.csv --headcount 25 --weights comp=1,tenure=2 --out top25.csv --timings
+    python -m headcount select ROSTER.csv --cap-table cap_table.json --round 120e6:700e6:5 --out top10.csv
+
+Each command imports what it needs when it runs, so parsing the arguments costs no pandas import.
+"""
+import argparse
+import sys
+import time
+
+# Reference point for `select --timings`: everything after interpreter startup, imports included
+_STARTED = time.perf_counter()
+
+
+def _cache_command(args) -> int:
+    from headcount import disk_cache
+
+    cache_dir = args.cache_dir or disk_cache.DEFAULT_CACHE_DIR
+    if args.action == "list":
+        for entry in disk_cache.list_entries(cache_dir):
+            print("{key}\t{bytes}".format(**entry))
+    elif args.action == "clear":
+        removed = disk_cache.invalidate(args.key, cache_dir)
+        print("Removed {} cache entr{}".format(removed, "y" if removed == 1 else "ies"))
+    elif args.action == "evict":
+        max_bytes = disk_cache.DEFAULT_MAX_BYTES if args.max_bytes is None else args.max_bytes
+        evicted = disk_cache.evict(cache_dir, max_bytes=max_bytes)
+        print("Evicted {} cache entr{}".format(len(evicted), "y" if len(evicted) == 1 else "ies"))
+    return 0
+
+
+def _sweep_command(args) -> int:
+    from headcount import engine, pipeline, sweep
+
+    df, _, features = pipeline.load_features(args.roster, args.total_shares, args.as_of, args.equity)
+    weights = sweep.weight_grid(
+        step=args.step,
+        max_weight=args.max_weight,
+        features=tuple(args.features.split(",")),
+        fixed=engine.DEFAULT_WEIGHTS,
+    )
+    headcounts = [int(n) for n in args.headcounts.split(",")]
+    result = sweep.run_sweep(
+        features,
+        weights,
+        headcounts,
+        employee_ids=df["employee_id"].to_numpy() if args.ids else None,
+        workers=args.workers,
+    )
+    sweep.write_sweep(result, args.out)
+    print("Wrote {} rows ({} weight vectors x {} headcounts) to {}".format(len(result), len(weights), len(set(headcounts)), args.out))
+    return 0
+
+
+def _compare_command(args) -> int:
+    from headcount import compare, engine
+
+    scenarios = compare.compare_rosters(
+        args.rosters,
+        engine.DEFAULT_WEIGHTS,
+        args.headcount,
+        args.total_shares,
+        args.workers,
+        as_of=args.as_of,
+        equity_basis=args.equity,
+        cap_table=args.cap_table,
+        share_basis=args.share_basis,
+    )
+    print(compare.kpi_table(scenarios).to_string(index=False))
+    print()
+    print(compare.overlap_table(scenarios).to_string(index=False))
+    return 0
+
+
+def _dilution_round(text):
+    """RAISE:PRE_MONEY[:POOL_PCT] from the command line, e.g. 120e6:700e6:5."""
+    from headcount import captable
+
+    parts = text.split(":")
+    if len(parts) not in (2, 3):
+        raise argparse.ArgumentTypeError("expected RAISE:PRE_MONEY[:POOL_PCT], got {!r}".format(text))
+    try:
+        numbers = [float(part) for part in parts]
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected numbers in RAISE:PRE_MONEY[:POOL_PCT], got {!r}".format(text))
+    pool = numbers[2] / 100 if len(numbers) == 3 else 0.0
+    return captable.DilutionEvent.round(text, numbers[0], numbers[1], pool)
+
+
+def _select_command(args) -> int:
+    from headcount import batch, export, trace
+
+    tracer = trace.Tracer()
+    with tracer:
+        try:
+            weights = batch.parse_weights(args.weights)
+        except ValueError as exc:
+            raise SystemExit(str(exc))
+        try:
+            selected = batch.select_roster(
+                args.roster,
+                headcount=args.headcount,
+                weights=weights,
+                budget=args.budget,
+                total_shares_outstanding=args.total_shares,
+                as_of=args.as_of,
+                equity_basis=args.equity,
+                cache=not args.no_cache,
+                cap_table=args.cap_table,
+                share_basis=args.share_basis,
+                dilution=args.round,
+            )
+        except ValueError as exc:
+            raise SystemExit(str(exc))
+        with tracer.stage("write", rows=len(selected)):
+            if args.out == "-":
+                for chunk in export.iter_csv(selected):
+                    sys.stdout.buffer.write(chunk)
+                sys.stdout.flush()
+            else:
+                export.write_export(selected, args.out)
+    if args.out != "-":
+        print("Wrote {} selected employees to {}".format(len(selected), args.out), file=sys.stderr)
+    if args.timings:
+        for record in tracer.finished():
+            print("{}{:<24} {:8.1f} ms".format("  " * record.depth, record.name, record.seconds * 1e3), file=sys.stderr)
+        print("first result {:.0f} ms after startup (imports included)".format((time.perf_counter() - _STARTED) * 1e3), file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m headcount", description="Headcount scenario tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    cache = commands.add_parser("cache", help="inspect or invalidate the on-disk roster cache")
+    cache.add_argument("action", choices=["list", "clear", "evict"])
+    cache.add_argument("key", nargs="?", default=None, help="entry to clear (default: all)")
+    cache.add_argument("--cache-dir", default=None)
+    cache.add_argument("--max-bytes", type=int, default=None)
+    cache.set_defaults(func=_cache_command)
+
+    sweep = commands.add_parser("sweep", help="evaluate a grid of weight vectors x target headcounts")
+    sweep.add_argument("roster", help="roster CSV")
+    sweep.add_argument("--features", default="comp,tenure,level,reports,equity", help="features to vary (others keep default weights)")
+    sweep.add_argument("--step", type=float, default=0.5)
+    sweep.add_argument("--max-weight", type=float, default=5.0)
+    sweep.add_argument("--headcounts", required=True, help="comma-separated target headcounts")
+    sweep.add_argument("--total-shares", type=int, default=None, help="shares outstanding when equity is in shares")
+    sweep.add_argument("--as-of", default=None, help="score equity and tenure as of this date (default: today)")
+    sweep.add_argument("--equity", choices=["vested", "unvested", "total"], default=None, help="equity counted when vesting dates are known (default: vested with a vesting_start_date column, else total)")
+    sweep.add_argument("--workers", type=int, default=0, help="process pool size (0 = all cores, 1 = no pool)")
+    sweep.add_argument("--ids", action="store_true", help="include the selected employee IDs per scenario")
+    sweep.add_argument("--out", required=True, help="output path (.csv, .csv.gz or .parquet)")
+    sweep.set_defaults(func=_sweep_command)
+
+    compare = commands.add_parser("compare", help="score several rosters under the default weights side by side")
+    compare.add_argument("rosters", nargs="+", help="roster CSVs (loaded concurrently)")
+    compare.add_argument("--headcount", type=int, default=10, help="target headcount per roster")
+    compare.add_argument("--total-shares", type=int, default=None, help="shares outstanding when equity is in shares")
+    compare.add_argument("--as-of", default=None, help="score equity and tenure as of this date (default: today)")
+    compare.add_argument("--equity", choices=["vested", "unvested", "total"], default=None, help="equity counted when vesting dates are known (default: vested with a vesting_start_date column, else total)")
+    compare.add_argument("--cap-table", default=None, help="cap_table.json to take share counts from (rosters with equity in shares)")
+    compare.add_argument("--share-basis", choices=["outstanding", "fully_diluted"], default="outstanding", help="cap-table share count to measure ownership against")
+    compare.add_argument("--workers", type=int, default=None, help="thread pool size (default: one per roster)")
+    compare.set_defaults(func=_compare_command)
+
+    select = commands.add_parser("select", help="score one roster and write the selected employees")
+    select.add_argument("roster", help="roster CSV")
+    select.add_argument("--headcount", type=int, default=10, help="number of employees to select")
+    select.add_argument("--budget", type=float, default=None, help="select by total compensation cap instead of headcount")
+    select.add_argument("--weights", default="", help="feature=weight overrides, e.g. comp=1,tenure=2 (others keep defaults)")
+    select.add_argument("--total-shares", type=int, default=None, help="shares outstanding when equity is in shares")
+    select.add_argument("--as-of", default=None, help="score equity and tenure as of this date (default: today)")
+    select.add_argument("--equity", choices=["vested", "unvested", "total"], default=None, help="equity counted when vesting dates are known (default: vested with a vesting_start_date column, else total)")
+    select.add_argument("--cap-table", default=None, help="cap_table.json to take share counts from")
+    select.add_argument("--share-basis", choices=["outstanding", "fully_diluted"], default="outstanding", help="cap-table share count to measure ownership against")
+    select.add_argument("--round", type=_dilution_round, action="append", default=[], help="future round RAISE:PRE_MONEY[:POOL_PCT] diluting equity (repeatable)")
+    select.add_argument("--no-cache", action="store_true", help="parse the CSV instead of using the on-disk roster cache")
+    select.add_argument("--out", default="-", help="output path (.csv, .csv.gz or .parquet; default: CSV on stdout)")
+    select.add_argument("--timings", action="store_true", help="print per-stage timings and time to first result to stderr")
+    select.set_defaults(func=_select_command)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
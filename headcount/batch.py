@@ -0,0 +1,72 @@
+"""
+Headless selection for scheduled jobs: load a roster, apply weights, select, write the result.
+
+`select_roster` runs the same pipeline as the app (headcount.pipeline: schema plan, value parsing, cached
+features, vesting as of a date, dilution; then ranking or knapsack) and returns the selected employees best first, without Streamlit. It is
+what `python -m headcount select` calls.
+
+Cold start matters more here than in the app, since every nightly run pays it. Importing `headcount` does not
+import pandas (see headcount/__init__.py), the command line imports each command's modules only when that
+command runs, and Streamlit is never imported.
+"""
+import pandas as pd
+
+from headcount import captable, engine, export, knapsack, pipeline, trace
+from headcount.selection import get_ranking
+
+
+def parse_weights(text) -> dict:
+    """
+    Weights from "comp=1,tenure=0.5" on top of engine.DEFAULT_WEIGHTS; features not named keep their default.
+    Raises ValueError for an unknown feature or a value that is not a number.
+    """
+    weights = dict(engine.DEFAULT_WEIGHTS)
+    for part in (text or "").split(","):
+        if not part.strip():
+            continue
+        name, sep, value = part.partition("=")
+        name = name.strip()
+        if not sep or name not in engine.FEATURE_NAMES:
+            raise ValueError("Expected feature=weight with a feature in {}, got {!r}".format(", ".join(engine.FEATURE_NAMES), part))
+        weights[name] = float(value)
+    return weights
+
+
+def select_roster(
+    roster,
+    headcount=10,
+    weights=None,
+    budget=None,
+    total_shares_outstanding=None,
+    as_of=None,
+    equity_basis=None,
+    cache=True,
+    cap_table=None,
+    share_basis="outstanding",
+    dilution=(),
+) -> pd.DataFrame:
+    """
+    The employees of `roster` (a path or file-like CSV) selected under `weights` (default:
+    engine.DEFAULT_WEIGHTS): the top `headcount` by impact score, or, with `budget`, the highest total score
+    whose compensation fits it. Rows are best first, with the roster columns, the feature columns,
+    `impact_score` and `rank`. Equity and tenure are scored as of `as_of` (default today) on `equity_basis`
+    (default: vested with a vesting_start_date column, else total), as in the app. `cache=False` parses the CSV instead of going through the on-disk roster cache.
+    Share counts come from `cap_table` (a cap_table.json path or CapTable) on `share_basis` unless
+    `total_shares_outstanding` is given, and `dilution` (DilutionEvents) dilutes them before scoring.
+    """
+    weights = engine.DEFAULT_WEIGHTS if weights is None else weights
+    if cap_table is not None and total_shares_outstanding is None:
+        table = cap_table if isinstance(cap_table, captable.CapTable) else captable.load_cap_table(cap_table)
+        total_shares_outstanding = table.shares(share_basis)
+    dilution_factor = captable.retained(dilution)[-1]
+    df, _, features = pipeline.load_features(roster, total_shares_outstanding, as_of, equity_basis, dilution_factor, cache=cache)
+    ranking = get_ranking(features, weights)
+    with trace.stage("select", rows=len(features)):
+        if budget is None:
+            positions = ranking.positions(headcount)
+        else:
+            chosen = knapsack.select_within_budget(ranking.scores, features.comp, budget)["positions"]
+            positions = chosen[(-ranking.scores[chosen]).argsort(kind="stable")]
+        selected = export.scored_roster(df, features, ranking.scores).iloc[positions].reset_index(drop=True)
+        selected["rank"] = range(1, len(selected) + 1)
+    return selected
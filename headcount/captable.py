@@ -0,0 +1,193 @@
+"""
+Cap-table-backed equity conversion and dilution scenarios.
+
+A roster with equity in shares needs a share count to turn grants into ownership. `load_cap_table` reads it
+from the data room's cap_table.json: shares outstanding, fully diluted shares and the option pool. The
+table's `version` is a hash of the file content, and everything derived from it is cached under that version.
+
+A future round or option-pool top-up scales every existing holder by the same factor: they keep
+`1 - new_money_pct - pool_topup_pct` of the company. A scenario is a sequence of such `DilutionEvent`s, and
+`retained` is the cumulative product of their factors, one value per round. So the ownership of every
+employee after every round is one outer product: `shares[:, None] / base_shares * retained[None, :]`.
+
+Since equity_pct is linear in the share count's denominator, a diluted FeatureSet only rescales the equity
+column of the base set (`features_diluted`). `sweep_round_sizes` re-scores the whole roster for dozens of
+round sizes at once with one (employees x sizes) score matrix.
+"""
+import dataclasses
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from headcount import engine, trace
+
+SHARE_BASES = ("outstanding", "fully_diluted")
+_CACHE_SIZE = 64
+_tables: "OrderedDict[tuple, CapTable]" = OrderedDict()
+_diluted: "OrderedDict[tuple, engine.FeatureSet]" = OrderedDict()
+_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class CapTable:
+    """Share counts from a cap table. `version` identifies the file content."""
+
+    version: str
+    total_shares_outstanding: int
+    fully_diluted_shares: int
+    option_pool_shares: int = 0
+    as_of_date: str = None
+    last_round: str = None
+    last_raise: float = None
+    post_money_valuation: float = None
+
+    def shares(self, basis="outstanding") -> int:
+        """The share count ownership is measured against: "outstanding" or "fully_diluted"."""
+        if basis not in SHARE_BASES:
+            raise ValueError("Unknown share basis {!r} (expected one of: {})".format(basis, ", ".join(SHARE_BASES)))
+        return self.fully_diluted_shares if basis == "fully_diluted" else self.total_shares_outstanding
+
+
+def parse_cap_table(data: dict, version=None) -> CapTable:
+    """CapTable from the parsed JSON; missing totals are summed from `holders` (options count as diluted only)."""
+    holders = data.get("holders") or []
+    options = sum(int(h.get("shares") or 0) for h in holders if str(h.get("share_class", "")).lower().startswith("option"))
+    issued = sum(int(h.get("shares") or 0) for h in holders) - options
+    outstanding = int(data.get("total_shares_outstanding") or issued)
+    rounds = data.get("funding_rounds") or []
+    last = rounds[-1] if rounds else {}
+    return CapTable(
+        version=version or hashlib.blake2b(json.dumps(data, sort_keys=True).encode("utf-8"), digest_size=12).hexdigest(),
+        total_shares_outstanding=outstanding,
+        fully_diluted_shares=int(data.get("fully_diluted_shares") or outstanding + options),
+        option_pool_shares=options,
+        as_of_date=data.get("as_of_date"),
+        last_round=data.get("last_round") or last.get("round"),
+        last_raise=last.get("amount_raised"),
+        post_money_valuation=data.get("post_money_valuation") or last.get("post_money_valuation"),
+    )
+
+
+def load_cap_table(path) -> CapTable:
+    """Read a cap_table.json, parsed once per file content."""
+    raw = Path(path).read_bytes()
+    version = hashlib.blake2b(raw, digest_size=12).hexdigest()
+    with _lock:
+        table = _tables.get(version)
+        if table is not None:
+            return table
+    table = parse_cap_table(json.loads(raw), version=version)
+    with _lock:
+        _tables[version] = table
+        while len(_tables) > _CACHE_SIZE:
+            _tables.popitem(last=False)
+    return table
+
+
+@dataclass(frozen=True)
+class DilutionEvent:
+    """
+    One future dilution: new investors get `new_money_pct` and new options `pool_topup_pct` of the company
+    after the event (both fractions of post-event fully diluted shares).
+    """
+
+    name: str
+    new_money_pct: float = 0.0
+    pool_topup_pct: float = 0.0
+
+    @classmethod
+    def round(cls, name, amount_raised, pre_money_valuation, pool_topup_pct=0.0) -> "DilutionEvent":
+        """A priced round: investors buy amount / (pre-money + amount) of the company."""
+        post = float(pre_money_valuation) + float(amount_raised)
+        return cls(name, float(amount_raised) / post if post > 0 else 0.0, pool_topup_pct)
+
+    @property
+    def retained(self) -> float:
+        """Fraction of their ownership existing holders keep through this event."""
+        kept = 1.0 - self.new_money_pct - self.pool_topup_pct
+        if not 0.0 < kept <= 1.0:
+            raise ValueError("Dilution event {!r} leaves existing holders {:.1%} of the company".format(self.name, kept))
+        return kept
+
+
+def retained(events) -> np.ndarray:
+    """Ownership kept after each event (cumulative), with 1.0 first for "today": length len(events) + 1."""
+    return np.cumprod([1.0] + [event.retained for event in events])
+
+
+def ownership(shares, base_shares, events=()) -> np.ndarray:
+    """Ownership % of every holder after every event: (len(shares), len(events) + 1), column 0 being today."""
+    shares = np.asarray(shares, dtype=float)
+    return np.outer(shares / float(base_shares) * 100, retained(events))
+
+
+def features_diluted(base: engine.FeatureSet, factor: float) -> engine.FeatureSet:
+    """`base` with every equity_pct scaled by `factor` (ownership kept after dilution), cached per (set, factor)."""
+    factor = float(factor)
+    if factor == 1.0:
+        return base
+    key = (base.key, "diluted", factor)
+    with _lock:
+        cached = _diluted.get(key)
+        if cached is not None:
+            _diluted.move_to_end(key)
+            return cached
+    with trace.stage("captable.dilute", rows=len(base)):
+        c = engine.FEATURE_NAMES.index("equity")
+        columns = base.columns.copy(deep=False)
+        columns["equity_pct"] = base.columns["equity_pct"].to_numpy(dtype=float) * factor
+        raw_max = np.array(base.raw_max, dtype=float)
+        raw_max[c] = raw_max[c] * factor
+        matrix = np.array(base.matrix)
+        matrix[:, c] = columns["equity_pct"].to_numpy() / max(1.0, raw_max[c])
+        matrix.flags.writeable = False
+        # Scaling by the same factor keeps a refresh delta valid: the same rows changed, the same columns rescaled
+        delta = None if base.delta is None else dataclasses.replace(base.delta, base_key=(base.delta.base_key, "diluted", factor))
+        features = engine.FeatureSet(key=key, columns=columns, matrix=matrix, comp=base.comp, org=base.org, raw_max=raw_max, delta=delta)
+    with _lock:
+        _diluted[key] = features
+        while len(_diluted) > _CACHE_SIZE:
+            _diluted.popitem(last=False)
+    return features
+
+
+def diluted_scores(features: engine.FeatureSet, weights: dict, factors) -> np.ndarray:
+    """Impact scores under each ownership factor in `factors`: an (employees, len(factors)) matrix."""
+    factors = np.asarray(factors, dtype=float)
+    w = engine.weight_vector(weights)
+    c = engine.FEATURE_NAMES.index("equity")
+    rest = features.matrix @ np.where(np.arange(len(w)) == c, 0.0, w)
+    equity = features.columns["equity_pct"].to_numpy(dtype=float)
+    # Each factor rescales the equity column and its normalization (never below 1, as in build_features)
+    scale = factors / np.maximum(1.0, features.raw_max[c] * factors)
+    return rest[:, None] + w[c] * np.outer(equity, scale)
+
+
+def sweep_round_sizes(features: engine.FeatureSet, weights: dict, headcount: int, amounts, pre_money_valuation, pool_topup_pct=0.0, base_factor=1.0) -> pd.DataFrame:
+    """
+    Re-score the roster for a next round of each size in `amounts` (at `pre_money_valuation`, on top of the
+    dilution `base_factor` already applied). One row per amount: ownership kept, the selected team's total
+    ownership %, and how many of the top `headcount` differ from the undiluted selection.
+    """
+    amounts = np.asarray(amounts, dtype=float)
+    factors = np.array([DilutionEvent.round("sweep", a, pre_money_valuation, pool_topup_pct).retained for a in amounts]) * base_factor
+    n = min(int(headcount), len(features))
+    with trace.stage("captable.sweep", rows=len(features) * len(factors)):
+        scores = diluted_scores(features, weights, np.concatenate([[1.0], factors]))
+        # engine.select_top per round size, so ties at the cut-off are kept in roster order as in the ranking
+        top = np.column_stack([engine.select_top(scores[:, j], n) for j in range(scores.shape[1])])
+        equity = features.columns["equity_pct"].to_numpy(dtype=float)
+        team_equity = equity[top[:, 1:]].sum(axis=0) * factors
+        baseline = np.zeros(len(features), dtype=bool)
+        baseline[top[:, 0]] = True
+        changed = n - baseline[top[:, 1:]].sum(axis=0)
+    return pd.DataFrame(
+        {"retained": factors, "team_equity_pct": team_equity, "selection_changes": changed},
+        index=pd.Index(amounts, name="amount_raised"),
+    )
@@ -0,0 +1,192 @@
+"""
+Several rosters side by side: seed vs. refreshes vs. Series E, or this quarter's export vs. last quarter's.
+
+Each roster is loaded, schema-detected and featurized in its own worker, so the wall time for N files
+approaches that of the slowest one. Threads are the default: pyarrow and the pandas C parser release the GIL
+for the bulk of a CSV parse, the numeric feature work runs in NumPy, and threads hand the frames back without
+pickling them. Every roster is then scored under the same weights, and the comparison is made on employee
+IDs with set operations (who is in both rosters, who is selected in both, who only in one).
+"""
+import contextvars
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from headcount import captable, engine, pipeline, trace
+from headcount.selection import RankedSelection, get_ranking
+
+
+@dataclass(frozen=True)
+class RosterScenario:
+    """One roster scored under the shared weights; `selected_ids` are the top `headcount` IDs, best first."""
+
+    label: str
+    df: pd.DataFrame
+    equity_info: dict
+    features: engine.FeatureSet
+    ranking: RankedSelection
+    selected_ids: np.ndarray
+
+    @property
+    def headcount(self) -> int:
+        return len(self.selected_ids)
+
+
+def source_label(source) -> str:
+    """Display name for a roster source: the file name of a path or an uploaded file's name."""
+    name = getattr(source, "name", None)
+    return Path(name if isinstance(name, str) else str(source)).name
+
+
+def _labels(sources) -> list:
+    """Unique labels in input order; a repeated file name gets a ` (2)`, ` (3)`, ... suffix."""
+    labels, seen = [], {}
+    for source in sources:
+        label = source_label(source)
+        seen[label] = seen.get(label, 0) + 1
+        labels.append(label if seen[label] == 1 else "{} ({})".format(label, seen[label]))
+    return labels
+
+
+def _load_one(source, total_shares_outstanding, as_of, equity_basis):
+    return pipeline.load_features(source, total_shares_outstanding, as_of, equity_basis)
+
+
+def load_rosters(
+    sources,
+    total_shares_outstanding=None,
+    workers=None,
+    processes=False,
+    as_of=None,
+    equity_basis=None,
+    cap_table=None,
+    share_basis="outstanding",
+) -> dict:
+    """
+    Load and featurize every roster in `sources` (paths or file-like objects) concurrently, with equity and
+    tenure as of `as_of` on `equity_basis` (see headcount.pipeline).
+    Share counts come from `cap_table` (a cap_table.json path or CapTable) on `share_basis` unless
+    `total_shares_outstanding` is given; each roster only uses them when its own equity is in shares.
+    Returns {label: (df, equity_info, FeatureSet)} in input order. `workers` caps the pool (default: one
+    per source, at most the CPU count); `processes=True` uses a process pool, which only pays off for
+    large files given by path since each result is pickled back.
+    """
+    sources = list(sources)
+    labels = _labels(sources)
+    if not sources:
+        return {}
+    if cap_table is not None and total_shares_outstanding is None:
+        table = cap_table if isinstance(cap_table, captable.CapTable) else captable.load_cap_table(cap_table)
+        total_shares_outstanding = table.shares(share_basis)
+    workers = min(len(sources), workers or os.cpu_count() or 1)
+    with trace.stage("compare.load", rows=len(sources)):
+        if workers == 1:
+            results = [_load_one(source, total_shares_outstanding, as_of, equity_basis) for source in sources]
+        elif processes:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                repeat = [[value] * len(sources) for value in (total_shares_outstanding, as_of, equity_basis)]
+                results = list(pool.map(_load_one, sources, *repeat))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # Each task runs in a copy of this context so its stages land on the active tracer
+                futures = [
+                    pool.submit(contextvars.copy_context().run, _load_one, source, total_shares_outstanding, as_of, equity_basis)
+                    for source in sources
+                ]
+                results = [future.result() for future in futures]
+    return dict(zip(labels, results))
+
+
+def score_rosters(rosters: dict, weights: dict, headcount: int) -> list:
+    """Score each loaded roster (see `load_rosters`) under `weights` and pick its top `headcount`."""
+    scenarios = []
+    for label, (df, equity_info, features) in rosters.items():
+        with trace.stage("compare.score", rows=len(features)):
+            ranking = get_ranking(features, weights)
+            selected = df["employee_id"].to_numpy(dtype=object)[ranking.positions(headcount)].astype(str)
+        scenarios.append(RosterScenario(label, df, equity_info, features, ranking, selected))
+    return scenarios
+
+
+def compare_rosters(
+    sources,
+    weights: dict,
+    headcount: int,
+    total_shares_outstanding=None,
+    workers=None,
+    as_of=None,
+    equity_basis=None,
+    cap_table=None,
+    share_basis="outstanding",
+) -> list:
+    """Load `sources` concurrently and score them under one set of weights; a list of RosterScenario."""
+    rosters = load_rosters(
+        sources,
+        total_shares_outstanding,
+        workers,
+        as_of=as_of,
+        equity_basis=equity_basis,
+        cap_table=cap_table,
+        share_basis=share_basis,
+    )
+    return score_rosters(rosters, weights, headcount)
+
+
+def kpi_table(scenarios: list) -> pd.DataFrame:
+    """One row per roster: size and payroll, then the KPI cards of its selection."""
+    rows = []
+    for scenario in scenarios:
+        summary = scenario.ranking.summary(scenario.headcount)
+        rows.append(
+            {
+                "roster": scenario.label,
+                "employees": len(scenario.df),
+                "payroll": float(scenario.features.comp.sum()),
+                "equity_format": scenario.equity_info.get("format"),
+                "selected": summary["headcount"],
+                "total": float(summary["total"]),
+                "average": float(summary["average"]),
+                "median": float(summary["median"]),
+            }
+        )
+    return pd.DataFrame(rows, columns=["roster", "employees", "payroll", "equity_format", "selected", "total", "average", "median"])
+
+
+def overlap_table(scenarios: list) -> pd.DataFrame:
+    """
+    One row per pair of rosters: employees in both rosters, and of the selections, how many are selected
+    in both, only in the first, only in the second, and their Jaccard similarity.
+    """
+    ids = [np.unique(scenario.df["employee_id"].to_numpy(dtype=object).astype(str)) for scenario in scenarios]
+    selected = [np.unique(scenario.selected_ids) for scenario in scenarios]
+    rows = []
+    for i in range(len(scenarios)):
+        for j in range(i + 1, len(scenarios)):
+            both = len(np.intersect1d(selected[i], selected[j], assume_unique=True))
+            union = len(selected[i]) + len(selected[j]) - both
+            rows.append(
+                {
+                    "roster_a": scenarios[i].label,
+                    "roster_b": scenarios[j].label,
+                    "in_both_rosters": len(np.intersect1d(ids[i], ids[j], assume_unique=True)),
+                    "selected_in_both": both,
+                    "selected_only_a": len(selected[i]) - both,
+                    "selected_only_b": len(selected[j]) - both,
+                    "jaccard": both / union if union else 1.0,
+                }
+            )
+    columns = ["roster_a", "roster_b", "in_both_rosters", "selected_in_both", "selected_only_a", "selected_only_b", "jaccard"]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def selection_matrix(scenarios: list) -> pd.DataFrame:
+    """Every employee selected in at least one roster, with a True/False column per roster."""
+    everyone = np.unique(np.concatenate([s.selected_ids for s in scenarios])) if scenarios else np.array([], dtype=str)
+    return pd.DataFrame(
+        {s.label: np.isin(everyone, s.selected_ids) for s in scenarios},
+        index=pd.Index(everyone, name="employee_id"),
+    )
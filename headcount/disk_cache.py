@@ -0,0 +1,200 @@
+"""
+Persistent, content-addressed cache of parsed rosters shared by every process on the machine.
+
+Entries are keyed by a hash of the source bytes plus the detected schema (header line and loader options)
+and stored as uncompressed Arrow IPC files next to a small JSON sidecar holding `equity_info`.
+Arrow files are memory-mapped on read, so a cold start skips CSV parsing entirely and concurrent
+workers share the same page-cache pages. The directory is kept under a byte budget by evicting the
+least recently used entries. Requires pyarrow; without it the loader falls back to parsing every time.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from headcount import schema, trace
+from headcount.engine import load_roster
+
+# Bump when the normalized roster layout changes so stale entries are never read back.
+CACHE_FORMAT_VERSION = 5
+DEFAULT_CACHE_DIR = Path(os.environ.get("HEADCOUNT_CACHE_DIR", Path.home() / ".cache" / "headcount"))
+DEFAULT_MAX_BYTES = int(os.environ.get("HEADCOUNT_CACHE_MAX_BYTES", 1 << 30))
+
+_BLOCK_SIZE = 1 << 20
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        return None
+    return pa
+
+
+def _iter_source_blocks(csv_source):
+    if isinstance(csv_source, (str, os.PathLike)):
+        with open(csv_source, "rb") as fh:
+            while block := fh.read(_BLOCK_SIZE):
+                yield block
+        return
+    if hasattr(csv_source, "getvalue"):
+        yield csv_source.getvalue()
+        return
+    csv_source.seek(0)
+    while block := csv_source.read(_BLOCK_SIZE):
+        yield block.encode("utf-8") if isinstance(block, str) else block
+    csv_source.seek(0)
+
+
+def cache_key(csv_source, **load_kwargs) -> str:
+    """Hash of the source bytes plus its schema (header line, remembered column mapping, loader options and cache format version)."""
+    content = hashlib.blake2b(digest_size=20)
+    header = b""
+    for block in _iter_source_blocks(csv_source):
+        if not header:
+            header = block.split(b"\n", 1)[0].strip()
+        content.update(block)
+    # The column mapping remembered for this header changes the parsed frame, so it is part of the key
+    mapping = load_kwargs.get("mapping")
+    if mapping is None:
+        mapping = schema.remembered_mapping(schema.parse_header_line(header))
+    layout = hashlib.blake2b(digest_size=8)
+    layout.update(header)
+    layout.update(
+        json.dumps([CACHE_FORMAT_VERSION, sorted({**load_kwargs, "mapping": mapping}.items())], default=str, sort_keys=True).encode("utf-8")
+    )
+    return "{}-{}".format(content.hexdigest(), layout.hexdigest())
+
+
+def _entry_paths(cache_dir: Path, key: str) -> tuple:
+    return cache_dir / (key + ".arrow"), cache_dir / (key + ".json")
+
+
+def _atomic_write(path: Path, write) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=path.suffix)
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def read_entry(key: str, cache_dir=None):
+    """Return (DataFrame, equity_info) for a cached key, or None on a miss. Marks the entry as recently used."""
+    pa = _pyarrow()
+    if pa is None:
+        return None
+    data_path, meta_path = _entry_paths(Path(cache_dir or DEFAULT_CACHE_DIR), key)
+    try:
+        meta = json.loads(meta_path.read_text())
+        with pa.memory_map(str(data_path), "r") as source:
+            df = pa.ipc.open_file(source).read_all().to_pandas()
+    except (OSError, ValueError, pa.ArrowInvalid):
+        return None
+    os.utime(meta_path)
+    df.attrs["fingerprint"] = meta["fingerprint"]
+    equity_info = dict(meta["equity_info"])
+    equity_info["raw_values"] = pd.to_numeric(df["equity_raw"], errors="coerce") if "equity_raw" in df.columns else None
+    return df, equity_info
+
+
+def write_entry(key: str, df: pd.DataFrame, equity_info: dict, cache_dir=None, max_bytes=None) -> bool:
+    """Store a parsed roster under `key`, then evict old entries beyond `max_bytes`. Returns False without pyarrow."""
+    pa = _pyarrow()
+    if pa is None:
+        return False
+    cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    data_path, meta_path = _entry_paths(cache_dir, key)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    def write_table(tmp):
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    meta = {
+        "fingerprint": df.attrs.get("fingerprint"),
+        "equity_info": {k: v for k, v in equity_info.items() if k != "raw_values"},
+        "rows": len(df),
+        "created": time.time(),
+    }
+    _atomic_write(data_path, write_table)
+    _atomic_write(meta_path, lambda tmp: Path(tmp).write_text(json.dumps(meta)))
+    evict(cache_dir, max_bytes=DEFAULT_MAX_BYTES if max_bytes is None else max_bytes)
+    return True
+
+
+def list_entries(cache_dir=None) -> list:
+    """Cached entries as dicts (key, bytes, last_used), most recently used first."""
+    cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+    entries = []
+    for meta_path in cache_dir.glob("*.json"):
+        data_path = meta_path.with_suffix(".arrow")
+        try:
+            size = meta_path.stat().st_size + (data_path.stat().st_size if data_path.exists() else 0)
+            entries.append({"key": meta_path.stem, "bytes": size, "last_used": meta_path.stat().st_mtime})
+        except FileNotFoundError:
+            continue  # removed by a concurrent eviction
+    return sorted(entries, key=lambda e: e["last_used"], reverse=True)
+
+
+def evict(cache_dir=None, max_bytes=DEFAULT_MAX_BYTES) -> list:
+    """Remove least recently used entries until the cache fits in `max_bytes`. Returns the evicted keys."""
+    cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+    entries = list_entries(cache_dir)
+    total = sum(e["bytes"] for e in entries)
+    evicted = []
+    while entries and total > max_bytes:
+        entry = entries.pop()
+        invalidate(entry["key"], cache_dir)
+        total -= entry["bytes"]
+        evicted.append(entry["key"])
+    return evicted
+
+
+def invalidate(key=None, cache_dir=None) -> int:
+    """Remove one entry (or every entry when `key` is None). Returns the number of entries removed."""
+    cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+    keys = [key] if key is not None else [e["key"] for e in list_entries(cache_dir)]
+    removed = 0
+    for k in keys:
+        found = False
+        for path in _entry_paths(cache_dir, k):
+            try:
+                path.unlink()
+                found = True
+            except FileNotFoundError:
+                pass
+        removed += found
+    return removed
+
+
+def load_roster_cached(csv_source, cache_dir=None, max_bytes=None, key=None, **load_kwargs) -> tuple[pd.DataFrame, dict]:
+    """
+    `load_roster` backed by the on-disk cache: parse only when this exact source/schema has not been seen.
+    `key` skips hashing the source again when the caller already has its `cache_key`.
+    """
+    if _pyarrow() is None:
+        return load_roster(csv_source, **load_kwargs)
+    if key is None:
+        with trace.stage("load.cache_key"):
+            key = cache_key(csv_source, **load_kwargs)
+    with trace.stage("load.cache_read") as stage:
+        hit = read_entry(key, cache_dir)
+        stage.rows = None if hit is None else len(hit[0])
+    if hit is not None:
+        return hit
+    df, equity_info = load_roster(csv_source, **load_kwargs)
+    try:
+        with trace.stage("load.cache_write", rows=len(df)):
+            write_entry(key, df, equity_info, cache_dir, max_bytes)
+    except OSError:
+        pass  # a read-only or full cache directory must never break loading
+    return df, equity_info
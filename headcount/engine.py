@@ -0,0 +1,496 @@
+"""
+Headless scoring engine for the headcount scenario simulator.
+
+Nothing in this module imports Streamlit, so the app, the tests and batch jobs can all share it.
+The expensive part of a rerun (tenure parsing, report counts, level mapping, equity conversion
+and normalization) is done once per roster by `build_features` and cached by `get_features`;
+a weight change then only costs one weighted sum (`score`) and a top-N pick (`select_top`).
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from headcount import schema, trace, values
+from headcount.org import OrgIndex, org_index_for_roster
+
+# Order of the columns in FeatureSet.matrix and of the weight vector passed to `score`.
+# span/subtree_comp/depth come from the org tree (headcount.org): everyone below an employee, their total
+# compensation, and closeness to the top of the org (1 for roots, 0 for the deepest level).
+FEATURE_NAMES = ("comp", "tenure", "level", "reports", "equity", "span", "subtree_comp", "depth")
+
+DEFAULT_WEIGHTS = {
+    "comp": 1.0,
+    "tenure": 0.5,
+    "level": 1.0,
+    "reports": 0.5,
+    "equity": 0.2,
+}
+
+LEVEL_SCORES = {
+    "C-Level": 5.0,
+    "VP": 4.0,
+    "Director": 3.0,
+    "Manager": 2.0,
+    "Staff": 3.0,
+    "Senior": 3.0,
+    "Mid": 1.5,
+    "Junior": 1.0,
+}
+
+
+# Priority order for equity column detection
+EQUITY_COLUMN_CANDIDATES = [
+    # Percentage columns (highest priority if named explicitly)
+    ("equity_pct", "pct"),
+    ("equity_percent", "pct"),
+    ("ownership_pct", "pct"),
+    ("ownership_percent", "pct"),
+    # Share columns
+    ("equity_shares", "shares"),
+    ("shares", "shares"),
+    ("stock_options", "shares"),
+    ("options", "shares"),
+    # Value columns (RSU grants, etc.)
+    ("rsu_grant_value", "value"),
+    ("equity_value", "value"),
+    ("grant_value", "value"),
+    # Generic equity column - need to infer format
+    ("equity", None),
+]
+
+
+def find_equity_column(columns) -> tuple:
+    """
+    Pick the equity column from a header by name alone.
+    Returns (actual column name, format); format is None for a generic column whose values decide it.
+    """
+    cols_lower = {c.lower(): c for c in columns}
+    for candidate, fmt in EQUITY_COLUMN_CANDIDATES:
+        if candidate in cols_lower:
+            return cols_lower[candidate], fmt
+    return None, None
+
+
+def infer_equity_format(max_val) -> str:
+    """Infer the format of a generic "equity" column from its largest value."""
+    if pd.isna(max_val):
+        return "pct"  # default to pct if no valid values
+    if max_val <= 100:
+        # Values are <= 100, likely percentages
+        return "pct"
+    # Values > 100, likely shares
+    return "shares"
+
+
+def detect_equity_format(df: pd.DataFrame) -> dict:
+    """
+    Detect the equity column and its format (percentage vs shares).
+    Returns dict with keys: 'column_name', 'format' ('pct', 'shares', 'value', or None), 'raw_values'
+    """
+    result = {"column_name": None, "format": None, "raw_values": None}
+
+    actual_col, fmt = find_equity_column(df.columns)
+    if actual_col is None:
+        return result
+    result["column_name"] = actual_col
+
+    # Parse numeric values (percent signs, currency symbols and thousands separators allowed)
+    raw_values = pd.Series(values.parse_numbers(df[actual_col])[0], index=df.index)
+    result["raw_values"] = raw_values
+    result["format"] = fmt if fmt is not None else infer_equity_format(raw_values.max())
+    return result
+
+
+def normalize_columns(df: pd.DataFrame, equity_info: dict) -> pd.DataFrame:
+    """Map common alternative column names to the expected schema."""
+    mapping = {}
+    if "employee_name" in df.columns and "name" not in df.columns:
+        mapping["employee_name"] = "name"
+    if "title" in df.columns and "role" not in df.columns:
+        mapping["title"] = "role"
+    if "position" in df.columns and "role" not in df.columns:
+        mapping["position"] = "role"
+    if "dept" in df.columns and "department" not in df.columns:
+        mapping["dept"] = "department"
+    if "team" in df.columns and "department" not in df.columns:
+        mapping["team"] = "department"
+    if "manager" in df.columns and "reports_to" not in df.columns:
+        mapping["manager"] = "reports_to"
+    if "manager_id" in df.columns and "reports_to" not in df.columns:
+        mapping["manager_id"] = "reports_to"
+    if "salary" in df.columns and "comp_usd" not in df.columns:
+        mapping["salary"] = "comp_usd"
+    if "total_comp" in df.columns and "comp_usd" not in df.columns:
+        mapping["total_comp"] = "comp_usd"
+    # Map detected equity column to equity_raw (we'll convert later)
+    if equity_info["column_name"] is not None and equity_info["column_name"] != "equity_raw":
+        mapping[equity_info["column_name"]] = "equity_raw"
+    if "employee_id" not in df.columns:
+        # try common id column names
+        if "id" in df.columns:
+            mapping["id"] = "employee_id"
+    if mapping:
+        df = df.rename(columns=mapping)
+    return df
+
+
+def roster_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of a roster frame (column names plus cell values), used as a cache key."""
+    h = hashlib.sha1()
+    h.update("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def load_roster(csv_source, chunksize=None, csv_engine=None, mapping=None) -> tuple[pd.DataFrame, dict]:
+    """
+    Load roster CSV and detect equity format.
+    Returns (DataFrame, equity_info dict). The roster's content hash is stored in df.attrs["fingerprint"].
+    Only the columns the header's compiled plan needs are parsed (see headcount.schema); `mapping`
+    ({roster column: header column}) overrides the mapping remembered for this header.
+    Passing `chunksize` or `csv_engine="pyarrow"` switches to the memory-bounded streaming reader
+    (see `load_roster_streaming`).
+    """
+    if chunksize is not None or csv_engine is not None:
+        return load_roster_streaming(csv_source, chunksize=chunksize or STREAM_CHUNK_ROWS, csv_engine=csv_engine, mapping=mapping)
+
+    plan = _plan_for(csv_source, mapping)
+    # Read CSV; file contains a "Summary Statistics" section at the bottom, so coerce comp_usd and drop non-employee rows.
+    with trace.stage("load.parse") as stage:
+        df = plan.apply(pd.read_csv(csv_source, usecols=list(plan.usecols), dtype=str, keep_default_na=False))
+        stage.rows = len(df)
+
+    # Keep rows that have an employee_id; the summary trailer is dropped before its values are parsed
+    if "employee_id" in df.columns:
+        df = df[df["employee_id"].str.startswith("E", na=False)]
+    with trace.stage("load.values", rows=len(df)):
+        df, issues = values.normalize_values(df, equity_format=plan.equity_format)
+    if "employee_id" not in df.columns:
+        # if no employee_id, keep any row with a compensation and create an index-based id
+        df = df[df["comp_usd"].notna()]
+        df = df.reset_index(drop=True)
+        df["employee_id"] = ["U{:04d}".format(i + 1) for i in range(len(df))]
+    # Rows without a usable compensation cannot be scored; they are listed in equity_info["value_issues"]
+    # Positions, not file line numbers: a disk-cache hit comes back with a RangeIndex too, and FeatureSets
+    # are shared between both by content fingerprint
+    df = df.dropna(subset=["comp_usd"]).reset_index(drop=True)
+    df["comp_usd"] = df["comp_usd"].round().astype("int64")
+    df = schema.compact_dtypes(df, plan)
+    equity_info = _equity_info(plan, df)
+    equity_info["value_issues"] = issues
+    df.attrs["fingerprint"] = roster_fingerprint(df)
+    return df, equity_info
+
+
+def _plan_for(csv_source, mapping):
+    plan = schema.plan_for_header(_read_header(csv_source), mapping)
+    if "comp_usd" not in plan.columns:
+        raise RuntimeError("Expected column 'comp_usd' in roster CSV (found: {})".format(", ".join(plan.header)))
+    return plan
+
+
+def _equity_info(plan, df: pd.DataFrame) -> dict:
+    """equity_info for a roster loaded with `plan`; a generic column's format comes from the parsed values."""
+    equity_info = {"column_name": plan.equity_column, "format": plan.equity_format, "raw_values": None}
+    equity_info["schema"] = plan.signature
+    equity_info["header"] = list(plan.header)
+    if plan.equity_column is not None and "equity_raw" in df.columns:
+        equity_info["raw_values"] = df["equity_raw"]
+        if plan.equity_format is None:
+            equity_info["format"] = infer_equity_format(df["equity_raw"].max())
+    return equity_info
+
+
+# Streaming ingest: only these (normalized) columns are kept, everything else is skipped by the parser.
+ROSTER_COLUMNS = (
+    "employee_id",
+    "name",
+    "role",
+    "department",
+    "location",
+    "comp_usd",
+    "reports_to",
+    "start_date",
+    "level",
+    "equity_raw",
+    "currency",
+    "vesting_start_date",
+    "equity_refreshes",
+)
+# Low-cardinality text columns stored as categoricals by the streaming reader
+CATEGORY_COLUMNS = ("role", "department", "location", "level", "currency")
+STREAM_CHUNK_ROWS = 100_000
+# Rosters larger than this are loaded with the streaming reader by the app
+STREAM_THRESHOLD_BYTES = 64 * 1024 * 1024
+
+
+def _read_header(csv_source) -> list:
+    header = pd.read_csv(csv_source, nrows=0).columns.tolist()
+    if hasattr(csv_source, "seek"):
+        csv_source.seek(0)
+    return header
+
+
+def _iter_csv_chunks(csv_source, usecols, chunksize, csv_engine):
+    """Yield string-typed DataFrame chunks holding only `usecols`."""
+    if csv_engine == "pyarrow":
+        try:
+            import pyarrow as pa
+            from pyarrow import csv as pa_csv
+        except ImportError as exc:
+            raise RuntimeError("csv_engine='pyarrow' requires the pyarrow package") from exc
+        reader = pa_csv.open_csv(
+            csv_source,
+            read_options=pa_csv.ReadOptions(block_size=16 << 20),
+            # Trailer rows with fewer fields than the header are skipped instead of failing the read
+            parse_options=pa_csv.ParseOptions(invalid_row_handler=lambda row: "skip"),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=usecols,
+                column_types={c: pa.string() for c in usecols},
+                strings_can_be_null=False,
+            ),
+        )
+        for batch in reader:
+            yield batch.to_pandas()
+        return
+    if csv_engine not in (None, "c", "python"):
+        raise ValueError("Unsupported csv_engine: {!r}".format(csv_engine))
+    yield from pd.read_csv(
+        csv_source,
+        usecols=usecols,
+        dtype=str,
+        keep_default_na=False,
+        chunksize=chunksize,
+        engine=csv_engine or "c",
+    )
+
+
+def _clean_chunk(chunk: pd.DataFrame, equity_format=None) -> tuple[pd.DataFrame, list]:
+    """Drop blank/trailer rows, parse the value columns and give text columns compact dtypes."""
+    if "employee_id" in chunk.columns:
+        chunk = chunk[chunk["employee_id"].str.startswith("E", na=False)].copy()
+    for column in CATEGORY_COLUMNS:
+        if column in chunk.columns:
+            chunk[column] = chunk[column].astype("category")
+    chunk, issues = values.normalize_values(chunk, equity_format=equity_format)
+    chunk = chunk[chunk["comp_usd"].notna()]
+    chunk["comp_usd"] = chunk["comp_usd"].round().astype("int64")
+    return chunk, issues
+
+
+def _concat_chunks(chunks: list, columns: list) -> pd.DataFrame:
+    if not chunks:
+        return pd.DataFrame({c: pd.Series(dtype=str) for c in columns}).astype({"comp_usd": "int64"})
+    for column in CATEGORY_COLUMNS:
+        if column in chunks[0].columns:
+            dtype = pd.CategoricalDtype(union_categoricals([ch[column] for ch in chunks]).categories)
+            for ch in chunks:
+                ch[column] = ch[column].astype(dtype)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def load_roster_streaming(csv_source, chunksize=STREAM_CHUNK_ROWS, csv_engine=None, mapping=None) -> tuple[pd.DataFrame, dict]:
+    """
+    Memory-bounded variant of `load_roster` for very large exports.
+    The header's compiled plan decides which columns are read (see headcount.schema); the body is then
+    parsed in chunks of `chunksize` rows (or pyarrow blocks when `csv_engine="pyarrow"`), dropping
+    trailer/blank rows, parsing comp_usd/equity_raw/start_date (see headcount.values) and converting
+    low-cardinality text to categoricals as it streams. Peak memory scales with the retained columns, not the raw file.
+    """
+    plan = _plan_for(csv_source, mapping)
+    with trace.stage("load.stream") as stage:
+        cleaned = [
+            _clean_chunk(plan.apply(chunk), plan.equity_format)
+            for chunk in _iter_csv_chunks(csv_source, list(plan.usecols), chunksize, csv_engine)
+        ]
+        df = _concat_chunks([chunk for chunk, _ in cleaned], plan.columns)
+        stage.rows = len(df)
+    if "employee_id" not in df.columns:
+        df["employee_id"] = ["U{:04d}".format(i + 1) for i in range(len(df))]
+    df = schema.compact_dtypes(df, plan)
+    equity_info = _equity_info(plan, df)
+    equity_info["value_issues"] = values.merge_issues(issues for _, issues in cleaned)
+    df.attrs["fingerprint"] = roster_fingerprint(df)
+    return df, equity_info
+
+
+def compute_tenure_years(start_date_series: pd.Series, as_of=None) -> pd.Series:
+    # Already datetime64 after load_roster; a column mapped in the app is parsed once per distinct string
+    parsed = pd.Series(values.parse_dates(start_date_series)[0], index=start_date_series.index)
+    now = pd.Timestamp.now() if as_of is None else pd.Timestamp(as_of)
+    years = (now - parsed).dt.days / 365.25
+    years = years.fillna(0.0).clip(lower=0.0)
+    return years
+
+
+def compute_direct_reports_count(df: pd.DataFrame) -> pd.Series:
+    if "reports_to" not in df.columns:
+        return pd.Series(0, index=df.index)
+    reports = df["reports_to"].fillna("").astype(str)
+    counts = reports.value_counts()
+    return df["employee_id"].map(counts).fillna(0).astype(int)
+
+
+def map_level_to_score(level_series: pd.Series) -> pd.Series:
+    if isinstance(level_series.dtype, pd.CategoricalDtype):
+        # Score each category once and gather by code (code -1, i.e. missing, takes the default)
+        category_scores = np.array([LEVEL_SCORES.get(c, 1.0) for c in level_series.cat.categories] + [1.0])
+        return pd.Series(category_scores[level_series.cat.codes.to_numpy()], index=level_series.index)
+    return level_series.map(LEVEL_SCORES).fillna(1.0).astype(float)
+
+
+def compute_equity_pct(df: pd.DataFrame, equity_format, total_shares_outstanding=None) -> pd.Series:
+    """Convert equity_raw to a percentage (or 0-100 relative score for grant values) based on the detected format."""
+    if "equity_raw" in df.columns:
+        equity_raw = pd.to_numeric(df["equity_raw"], errors="coerce").fillna(0.0)
+
+        if equity_format == "shares" and total_shares_outstanding is not None and total_shares_outstanding > 0:
+            # Convert shares to percentage: (shares / total_shares_outstanding) * 100
+            return (equity_raw / total_shares_outstanding) * 100
+        if equity_format == "value":
+            # For grant values, normalize to a 0-100 scale for relative comparison
+            max_value = equity_raw.max()
+            if max_value > 0:
+                return (equity_raw / max_value) * 100
+            return pd.Series(0.0, index=df.index)
+        # Already percentage or unknown format - use as-is
+        return equity_raw
+    if "equity_pct" in df.columns:
+        return pd.to_numeric(df["equity_pct"], errors="coerce").fillna(0.0)
+    return pd.Series(0.0, index=df.index)
+
+
+@dataclass(frozen=True)
+class FeatureSet:
+    """
+    Derived per-employee columns plus the normalized feature matrix for one roster.
+    `columns` holds tenure_years, direct_reports, level_score, equity_pct, transitive_reports, org_depth and
+    subtree_comp aligned with the roster rows; `matrix` is an (n_employees, len(FEATURE_NAMES)) float array
+    with each feature scaled to 0..1; `org` is the roster's OrgIndex. `raw_max` holds each feature's maximum
+    before scaling, and `delta` links a set patched by headcount.incremental to the set it was derived from.
+    """
+
+    key: tuple
+    columns: pd.DataFrame
+    matrix: np.ndarray
+    comp: np.ndarray
+    org: OrgIndex = None
+    raw_max: np.ndarray = None
+    delta: object = None
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+
+def _blank(df: pd.DataFrame, column: str) -> pd.Series:
+    return df[column] if column in df.columns else pd.Series([""] * len(df), index=df.index)
+
+
+def build_features(df: pd.DataFrame, equity_format=None, total_shares_outstanding=None, as_of=None, key=()) -> FeatureSet:
+    """Compute every scoring feature for a roster; independent of the weights."""
+    n = len(df)
+    columns = pd.DataFrame(index=df.index)
+    with trace.stage("features.tenure", rows=n):
+        columns["tenure_years"] = compute_tenure_years(_blank(df, "start_date"), as_of=as_of)
+    with trace.stage("features.reports", rows=n):
+        columns["direct_reports"] = compute_direct_reports_count(df)
+    with trace.stage("features.level", rows=n):
+        columns["level_score"] = map_level_to_score(_blank(df, "level"))
+    with trace.stage("features.equity", rows=n):
+        columns["equity_pct"] = compute_equity_pct(df, equity_format, total_shares_outstanding)
+
+    with trace.stage("features.org", rows=n):
+        org = org_index_for_roster(df)
+    columns["transitive_reports"] = org.transitive_reports
+    columns["org_depth"] = org.depth
+    columns["subtree_comp"] = org.subtree_comp
+
+    comp = df["comp_usd"].to_numpy(dtype=float)
+    max_depth = float(org.depth.max()) if len(df) else 0.0
+    raw = np.column_stack(
+        [
+            comp,
+            columns["tenure_years"].to_numpy(dtype=float),
+            columns["level_score"].to_numpy(dtype=float),
+            columns["direct_reports"].to_numpy(dtype=float),
+            columns["equity_pct"].to_numpy(dtype=float),
+            org.transitive_reports.astype(float),
+            org.subtree_comp,
+            max_depth - org.depth,
+        ]
+    )
+    # Normalize components to 0..1 (never divide by less than 1, as the app always has)
+    raw_max = raw.max(axis=0) if len(df) else np.zeros(len(FEATURE_NAMES))
+    matrix = raw / np.maximum(1.0, raw_max)
+    matrix.flags.writeable = False
+    comp.flags.writeable = False
+    return FeatureSet(key=key, columns=columns, matrix=matrix, comp=comp, org=org, raw_max=raw_max)
+
+
+_FEATURE_CACHE_SIZE = 8
+_feature_cache: "OrderedDict[tuple, FeatureSet]" = OrderedDict()
+_feature_cache_lock = threading.Lock()
+
+
+def get_features(df: pd.DataFrame, equity_format=None, total_shares_outstanding=None, roster_key=None, as_of=None) -> FeatureSet:
+    """
+    Return the FeatureSet for a roster, building it only on a cache miss.
+    The cache key is the roster content (df.attrs["fingerprint"] or `roster_key` when given, else a fresh
+    content hash), the equity settings and the tenure reference date (today when `as_of` is None).
+    """
+    if roster_key is None:
+        roster_key = df.attrs.get("fingerprint") or roster_fingerprint(df)
+    as_of_day = (pd.Timestamp.now() if as_of is None else pd.Timestamp(as_of)).normalize()
+    key = (roster_key, equity_format, total_shares_outstanding, as_of_day)
+    with _feature_cache_lock:
+        cached = _feature_cache.get(key)
+        if cached is not None:
+            _feature_cache.move_to_end(key)
+            return cached
+    features = build_features(df, equity_format, total_shares_outstanding, as_of=as_of, key=key)
+    with _feature_cache_lock:
+        _feature_cache[key] = features
+        while len(_feature_cache) > _FEATURE_CACHE_SIZE:
+            _feature_cache.popitem(last=False)
+    return features
+
+
+def clear_feature_cache() -> None:
+    with _feature_cache_lock:
+        _feature_cache.clear()
+
+
+def weight_vector(weights: dict) -> np.ndarray:
+    """Turn a {feature name: weight} dict into a vector ordered like FEATURE_NAMES (missing names weigh 0)."""
+    unknown = set(weights) - set(FEATURE_NAMES)
+    if unknown:
+        raise ValueError("Unknown feature weight(s): {}".format(", ".join(sorted(unknown))))
+    return np.array([float(weights.get(name, 0.0)) for name in FEATURE_NAMES])
+
+
+def score(features: FeatureSet, weights: dict) -> np.ndarray:
+    """Impact score per employee: the weighted sum of the normalized features."""
+    return features.matrix @ weight_vector(weights)
+
+
+def select_top(scores: np.ndarray, n: int) -> np.ndarray:
+    """
+    Positions of the `n` highest scores, best first, ties kept in roster order.
+    Uses a linear-time partition so only the selected rows are sorted.
+    """
+    scores = np.asarray(scores)
+    n = max(0, min(int(n), len(scores)))
+    if n == 0:
+        return np.empty(0, dtype=np.intp)
+    if n == len(scores):
+        return np.argsort(-scores, kind="stable")
+    threshold = -np.partition(-scores, n - 1)[n - 1]
+    above = np.flatnonzero(scores > threshold)
+    ties = np.flatnonzero(scores == threshold)[: n - len(above)]
+    idx = np.concatenate([above, ties])
+    return idx[np.lexsort((idx, -scores[idx]))]
@@ -0,0 +1,110 @@
+"""
+Chunked exports of scenario results as CSV, gzip-compressed CSV or Parquet.
+
+Every format is produced as an iterator of byte chunks, so a caller can stream it to a file or
+socket without ever holding the whole serialized file, and nothing is serialized until asked for.
+"""
+import io
+import os
+import tempfile
+import zlib
+from pathlib import Path
+
+import pandas as pd
+
+# format -> (file suffix, MIME type)
+EXPORT_FORMATS = {
+    "csv": (".csv", "text/csv"),
+    "csv.gz": (".csv.gz", "application/gzip"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+CHUNK_ROWS = 50_000
+
+
+def iter_csv(df: pd.DataFrame, chunk_rows=CHUNK_ROWS, compress=False):
+    """Yield the CSV encoding of `df` (UTF-8, header first) in chunks of `chunk_rows` rows, optionally gzipped."""
+    gzip = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None  # wbits=31: gzip container
+    for start in range(0, max(len(df), 1), chunk_rows):
+        data = df.iloc[start : start + chunk_rows].to_csv(index=False, header=start == 0).encode("utf-8")
+        data = gzip.compress(data) if gzip else data
+        if data:
+            yield data
+    if gzip:
+        yield gzip.flush()
+
+
+def iter_parquet(df: pd.DataFrame, chunk_rows=CHUNK_ROWS):
+    """Yield a Parquet file in pieces, one row group of `chunk_rows` rows at a time. Requires pyarrow."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError("Parquet export requires the pyarrow package") from exc
+    sink = io.BytesIO()
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(sink, schema) as writer:
+        for start in range(0, len(df), chunk_rows):
+            writer.write_table(pa.Table.from_pandas(df.iloc[start : start + chunk_rows], schema=schema, preserve_index=False))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    # Closing the writer appends the footer
+    yield sink.getvalue()
+
+
+def iter_export(df: pd.DataFrame, fmt="csv", chunk_rows=CHUNK_ROWS):
+    """Byte chunks of `df` in one of EXPORT_FORMATS."""
+    if fmt == "csv":
+        return iter_csv(df, chunk_rows)
+    if fmt == "csv.gz":
+        return iter_csv(df, chunk_rows, compress=True)
+    if fmt == "parquet":
+        return iter_parquet(df, chunk_rows)
+    raise ValueError("Unknown export format {!r} (expected one of: {})".format(fmt, ", ".join(EXPORT_FORMATS)))
+
+
+def export_bytes(df: pd.DataFrame, fmt="csv") -> bytes:
+    """The whole export as one bytes object (for download widgets that need it in memory)."""
+    return b"".join(iter_export(df, fmt))
+
+
+def format_for_path(path) -> str:
+    """Infer the export format from a file name (.csv, .csv.gz, .parquet)."""
+    name = str(path).lower()
+    if name.endswith(".csv.gz"):
+        return "csv.gz"
+    if name.endswith(".parquet"):
+        return "parquet"
+    if name.endswith(".csv"):
+        return "csv"
+    raise ValueError("Cannot infer export format from {!r}".format(str(path)))
+
+
+def write_export(df: pd.DataFrame, path, fmt=None) -> None:
+    """Stream `df` to `path` chunk by chunk; the format defaults to the one implied by the file name."""
+    fmt = fmt or format_for_path(path)
+    with open(Path(path), "wb") as fh:
+        for chunk in iter_export(df, fmt):
+            fh.write(chunk)
+
+
+def write_temp_export(df: pd.DataFrame, fmt="csv") -> Path:
+    """Stream `df` to a new temporary file in `fmt` and return its path; the caller deletes it."""
+    fd, path = tempfile.mkstemp(prefix="headcount-export-", suffix=EXPORT_FORMATS.get(fmt, ("",))[0])
+    os.close(fd)
+    try:
+        write_export(df, path, fmt)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return Path(path)
+
+
+def scored_roster(roster_df: pd.DataFrame, features, scores) -> pd.DataFrame:
+    """The full roster with its derived feature columns and impact score, in roster order."""
+    scored = pd.concat(
+        [roster_df.drop(columns=list(features.columns.columns), errors="ignore"), features.columns],
+        axis=1,
+    )
+    scored["impact_score"] = scores
+    return scored
@@ -0,0 +1,183 @@
+"""
+Monte Carlo headcount and payroll forecast for a selected team, driven by the attrition history.
+
+`fit_rates` turns the quarterly history (data_room/people/attrition_history.csv) into posteriors for two
+rates: the quarterly departure probability per employee (Beta) and hires per employee per quarter (Gamma).
+Each trial draws its own rates from these posteriors, so the bands also reflect how little history there is.
+
+`simulate` then steps every trial through the quarters at once. Per trial it keeps the headcount, the
+payroll and the sum of squared salaries. A quarter's departures are Binomial, and the payroll they take is
+drawn from the exact mean and finite-population variance of a random subset of the current team. Hires are
+Poisson, with pay from the team's starting pay distribution. The only Python loop is over quarters, so
+100k trials x 8 quarters is a few dozen array operations. Large runs are split into fixed-size shards with
+their own seed streams, which may go to a process pool; the result does not depend on the worker count.
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from headcount import trace
+
+DEFAULT_TRIALS = 100_000
+# Trials per shard; a run is split into shards of this size, each with its own child seed
+SHARD_TRIALS = 250_000
+PERCENTILES = (5, 25, 50, 75, 95)
+# Recent quarters used for the fit; attrition has been trending down as the company matured
+DEFAULT_WINDOW = 8
+
+_PERIOD = re.compile(r"^(\d{4})-Q([1-4])$")
+
+
+def load_attrition_history(csv_source) -> pd.DataFrame:
+    """Quarterly rows of the attrition history (period YYYY-Qn); the summary trailer is dropped."""
+    raw = pd.read_csv(csv_source, dtype=str, keep_default_na=False)
+    df = raw[raw["period"].str.strip().str.match(_PERIOD.pattern)].copy()
+    df["period"] = df["period"].str.strip()
+    for column in ("headcount_start", "hires", "voluntary_departures", "involuntary_departures", "headcount_end"):
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors="coerce").fillna(0).astype(int)
+    return df.reset_index(drop=True)
+
+
+def next_periods(last_period: str, n: int) -> list:
+    """The `n` quarter labels after `last_period` ("2026-Q1" -> ["2026-Q2", ...])."""
+    match = _PERIOD.match(str(last_period))
+    if match is None:
+        return ["Q+{}".format(i + 1) for i in range(n)]
+    index = int(match.group(1)) * 4 + int(match.group(2)) - 1
+    return ["{}-Q{}".format((index + i) // 4, (index + i) % 4 + 1) for i in range(1, n + 1)]
+
+
+@dataclass(frozen=True)
+class QuarterlyRates:
+    """
+    Posteriors fitted from the history: quarterly departure probability ~ Beta(departure_alpha,
+    departure_beta) and hires per employee per quarter ~ Gamma(hire_shape, rate=hire_rate).
+    """
+
+    departure_alpha: float
+    departure_beta: float
+    hire_shape: float
+    hire_rate: float
+    quarters: int
+    last_period: str = None
+
+    @property
+    def departure_probability(self) -> float:
+        return self.departure_alpha / (self.departure_alpha + self.departure_beta)
+
+    @property
+    def hires_per_head(self) -> float:
+        return self.hire_shape / self.hire_rate
+
+
+def fit_rates(history: pd.DataFrame, window=DEFAULT_WINDOW) -> QuarterlyRates:
+    """
+    Pool the last `window` quarters (all when None): departures out of starting headcount for the
+    departure probability, hires per starting head for the hire rate. Uniform priors on both.
+    """
+    recent = history.tail(window) if window else history
+    exposure = float(recent["headcount_start"].sum())
+    departures = float((recent["voluntary_departures"] + recent["involuntary_departures"]).sum())
+    hires = float(recent["hires"].sum())
+    return QuarterlyRates(
+        departure_alpha=departures + 1.0,
+        departure_beta=max(exposure - departures, 0.0) + 1.0,
+        hire_shape=hires + 1.0,
+        hire_rate=max(exposure, 1.0),
+        quarters=len(recent),
+        last_period=recent["period"].iloc[-1] if len(recent) else None,
+    )
+
+
+def _simulate_shard(args) -> tuple:
+    """(headcount, payroll) trajectories, each (trials, quarters + 1), for one shard."""
+    comp_stats, hire_stats, rates, quarters, trials, seed, hire_scale = args
+    rng = np.random.default_rng(seed)
+    n0, total0, squares0 = comp_stats
+    hire_mean, hire_var = hire_stats
+    departure_p = rng.beta(rates.departure_alpha, rates.departure_beta, trials)
+    hire_lambda = rng.gamma(rates.hire_shape, 1.0 / rates.hire_rate, trials) * hire_scale
+
+    heads = np.full(trials, n0, dtype=np.int64)
+    total = np.full(trials, total0, dtype=float)
+    squares = np.full(trials, squares0, dtype=float)
+    head_path = np.empty((trials, quarters + 1), dtype=np.int32)
+    comp_path = np.empty((trials, quarters + 1), dtype=np.float32)
+    head_path[:, 0], comp_path[:, 0] = heads, total
+    for quarter in range(1, quarters + 1):
+        start = heads
+        left = rng.binomial(start, departure_p)
+        safe = np.maximum(start, 1)
+        mean = total / safe
+        var = np.maximum(squares / safe - mean**2, 0.0)
+        # Payroll of a random `left`-subset: exact mean, finite-population variance, normal draw
+        shrink = np.where(start > 1, (start - left) / np.maximum(start - 1, 1), 0.0)
+        removed = left * mean + np.sqrt(left * var * shrink) * rng.standard_normal(trials)
+        removed = np.where(left >= start, total, np.clip(removed, 0.0, total))
+        squares = squares - left * (squares / safe)
+        total = total - removed
+        heads = start - left
+
+        hired = rng.poisson(hire_lambda * start)
+        added = hired * hire_mean + np.sqrt(hired * hire_var) * rng.standard_normal(trials)
+        total = total + np.maximum(added, 0.0)
+        squares = squares + hired * (hire_var + hire_mean**2)
+        heads = heads + hired
+        head_path[:, quarter], comp_path[:, quarter] = heads, total
+    return head_path, comp_path
+
+
+def simulate(comp, rates: QuarterlyRates, quarters=4, trials=DEFAULT_TRIALS, seed=0, hire_comp=None, hire_scale=1.0, workers=1):
+    """
+    Simulate a team with salaries `comp` for `quarters` quarters. New hires are paid like `hire_comp`
+    (default: the team itself); `hire_scale` scales the fitted hire rate (0 = attrition only).
+    Returns (headcount, payroll) arrays of shape (trials, quarters + 1), column 0 being today.
+    `workers` > 1 runs the shards on a process pool (0 = all cores).
+    """
+    comp = np.asarray(comp, dtype=float)
+    hire_comp = comp if hire_comp is None else np.asarray(hire_comp, dtype=float)
+    comp_stats = (len(comp), float(comp.sum()), float((comp**2).sum()))
+    hire_stats = (float(hire_comp.mean()), float(hire_comp.var())) if len(hire_comp) else (0.0, 0.0)
+    sizes = [SHARD_TRIALS] * (trials // SHARD_TRIALS) + ([trials % SHARD_TRIALS] if trials % SHARD_TRIALS else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    shards = [(comp_stats, hire_stats, rates, quarters, size, child, hire_scale) for size, child in zip(sizes, seeds)]
+    workers = (os.cpu_count() or 1) if workers == 0 else workers
+    with trace.stage("forecast.simulate", rows=trials):
+        if workers > 1 and len(shards) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+                results = list(pool.map(_simulate_shard, shards))
+        else:
+            results = [_simulate_shard(shard) for shard in shards]
+    if not results:
+        return np.empty((0, quarters + 1), dtype=np.int32), np.empty((0, quarters + 1), dtype=np.float32)
+    return np.concatenate([r[0] for r in results]), np.concatenate([r[1] for r in results])
+
+
+def percentile_bands(headcount: np.ndarray, payroll: np.ndarray, periods=None) -> pd.DataFrame:
+    """
+    One row per quarter (today first) with headcount_pN and payroll_pN for every N in PERCENTILES,
+    indexed by `periods` when given.
+    """
+    with trace.stage("forecast.percentiles", rows=len(headcount)):
+        heads = np.percentile(headcount, PERCENTILES, axis=0)
+        pay = np.percentile(payroll.astype(float), PERCENTILES, axis=0)
+    columns = {}
+    for row, p in enumerate(PERCENTILES):
+        columns["headcount_p{}".format(p)] = heads[row]
+    for row, p in enumerate(PERCENTILES):
+        columns["payroll_p{}".format(p)] = pay[row]
+    bands = pd.DataFrame(columns)
+    if periods is not None:
+        bands.index = pd.Index(list(periods), name="period")
+    return bands
+
+
+def forecast(comp, rates: QuarterlyRates, quarters=4, trials=DEFAULT_TRIALS, seed=0, hire_comp=None, hire_scale=1.0, workers=1) -> pd.DataFrame:
+    """`simulate` followed by `percentile_bands`, labelled "now" and the quarters after the history."""
+    headcount, payroll = simulate(comp, rates, quarters, trials, seed, hire_comp, hire_scale, workers)
+    return percentile_bands(headcount, payroll, ["now"] + next_periods(rates.last_period, quarters))
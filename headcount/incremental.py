@@ -0,0 +1,499 @@
+"""
+Incremental roster reload: apply row-level deltas to a loaded roster and its features.
+
+The HRIS rewrites the roster CSV every few minutes, usually changing a handful of rows. A `LiveRoster`
+keeps the parsed roster in memory together with one hash per chunk of CSV lines, with chunk boundaries
+chosen by line content so that an edit only disturbs its own chunk. On `refresh()` it hashes the new file's
+chunks, splits only the chunks that changed, parses the lines that appeared or disappeared, and turns them
+into inserts, updates and deletes keyed by employee_id. Those are applied to the roster frame, the org index
+(headcount.org.update_org_index), the direct-report counts and every FeatureSet handed out so far
+(`update_features`); feature normalizers are only recomputed when a column maximum actually moves. A
+patched FeatureSet carries a `FeatureDelta`, which lets headcount.selection.get_ranking re-insert the
+changed rows into the previous ranking instead of sorting again.
+
+Records must be one per line (no newlines inside quoted fields), which is how HRIS exports are written.
+A changed header, duplicate employee IDs or a roster without employee IDs falls back to a full reload.
+"""
+import hashlib
+import io
+import os
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from headcount import disk_cache, engine, trace, values
+from headcount.org import OrgIndex, is_root_reference, org_index_for_roster, update_org_index
+
+# Kept FeatureSets per LiveRoster (one per equity setting the app has asked for)
+MAX_FEATURE_SETS = 4
+# About one line in 2**CHUNK_BITS starts a new chunk of the diffed file
+CHUNK_BITS = 8
+
+
+@dataclass(frozen=True)
+class RosterDelta:
+    """
+    One applied refresh. `inserted`/`updated`/`deleted` are employee IDs; `old_to_new` maps the previous
+    roster positions to the new ones (-1 for deleted rows) and `changed` holds the new positions of updated
+    and inserted rows. `report_positions`/`report_counts` are rows whose direct-report count changed, `org`
+    is the patched (or rebuilt) OrgIndex and `org_dirty` the rows whose org features may have moved.
+    """
+
+    base_fingerprint: str
+    inserted: np.ndarray
+    updated: np.ndarray
+    deleted: np.ndarray
+    old_to_new: np.ndarray
+    changed: np.ndarray
+    report_positions: np.ndarray
+    report_counts: np.ndarray
+    org: OrgIndex
+    org_dirty: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.inserted) + len(self.updated) + len(self.deleted)
+
+
+@dataclass(frozen=True)
+class FeatureDelta:
+    """
+    How a patched FeatureSet differs from the one it was derived from (`base_key`): `dirty` are the new
+    positions whose matrix row changed and `rescaled` the features whose whole column changed.
+    """
+
+    base_key: tuple
+    old_to_new: np.ndarray
+    dirty: np.ndarray
+    rescaled: frozenset
+
+
+_RAW_COLUMNS = {
+    "tenure": "tenure_years",
+    "level": "level_score",
+    "reports": "direct_reports",
+    "equity": "equity_pct",
+    "span": "transitive_reports",
+    "subtree_comp": "subtree_comp",
+}
+
+
+def _raw_column(comp, columns: dict, max_depth: float, name: str, rows=slice(None)) -> np.ndarray:
+    """One unscaled feature (see engine.build_features) for `rows`."""
+    if name == "comp":
+        return comp[rows]
+    if name == "depth":
+        return max_depth - columns["org_depth"][rows]
+    return columns[_RAW_COLUMNS[name]][rows].astype(float)
+
+
+def _feature_rows(comp, columns: dict, max_depth: float, rows) -> np.ndarray:
+    """Unscaled feature matrix rows, in FEATURE_NAMES order."""
+    return np.column_stack([_raw_column(comp, columns, max_depth, name, rows) for name in engine.FEATURE_NAMES])
+
+
+def update_features(previous: engine.FeatureSet, df: pd.DataFrame, delta: RosterDelta, key: tuple) -> engine.FeatureSet:
+    """
+    Patch `previous` (built for the roster before `delta`) into the FeatureSet for `df`.
+    Per-row features are recomputed for changed rows only; direct reports and org features come from the
+    delta. A column is rescaled only when its maximum changes (or, for org depth, the deepest level).
+    """
+    equity_format, total_shares_outstanding = key[1], key[2]
+    n = len(df)
+    old_to_new = delta.old_to_new
+    kept_old = np.flatnonzero(old_to_new >= 0)
+    kept_new = old_to_new[kept_old]
+    new_to_old = np.full(n, -1, dtype=np.int64)
+    new_to_old[kept_new] = kept_old
+    if len(kept_old) == len(old_to_new):
+        # No deletions: kept rows stay where they were, so slices copy them without a gather
+        kept_old = kept_new = slice(0, len(old_to_new))
+    changed = delta.changed
+
+    columns = {}
+    for name in previous.columns.columns:
+        column = np.zeros(n, dtype=previous.columns[name].dtype)
+        column[kept_new] = previous.columns[name].to_numpy()[kept_old]
+        columns[name] = column
+    rows = df.iloc[changed]
+    columns["tenure_years"][changed] = engine.compute_tenure_years(engine._blank(rows, "start_date")).to_numpy()
+    columns["level_score"][changed] = engine.map_level_to_score(engine._blank(rows, "level")).to_numpy()
+    rescaled = set()
+    if equity_format == "value":
+        # Grant values are scaled by the largest grant, so a new maximum changes every row
+        equity = engine.compute_equity_pct(df, equity_format, total_shares_outstanding).to_numpy(dtype=float)
+        equity_dirty = np.flatnonzero(equity != columns["equity_pct"])
+        if len(equity_dirty) > len(changed):
+            rescaled.add("equity")
+        columns["equity_pct"] = equity
+    else:
+        equity_dirty = changed
+        columns["equity_pct"][changed] = engine.compute_equity_pct(rows, equity_format, total_shares_outstanding).to_numpy()
+    columns["direct_reports"][delta.report_positions] = delta.report_counts
+    org = delta.org
+    columns["transitive_reports"] = org.transitive_reports
+    columns["org_depth"] = org.depth
+    columns["subtree_comp"] = org.subtree_comp
+
+    comp = df["comp_usd"].to_numpy(dtype=float)
+    max_depth = float(org.depth.max()) if n else 0.0
+    old_max_depth = float(previous.columns["org_depth"].max()) if len(previous) else 0.0
+    if max_depth != old_max_depth:
+        rescaled.add("depth")
+    dirty = np.unique(np.concatenate([changed, delta.report_positions, delta.org_dirty, equity_dirty])).astype(np.int64)
+    dirty_raw = _feature_rows(comp, columns, max_depth, dirty)
+
+    # A column maximum can only drop if a row holding it was removed or overwritten
+    old_scale = np.maximum(1.0, previous.raw_max)
+    overwritten = np.concatenate([np.flatnonzero(old_to_new < 0), new_to_old[dirty][new_to_old[dirty] >= 0]])
+    lost_max = (previous.matrix[overwritten] == previous.raw_max / old_scale).any(axis=0)
+    raw_max = np.maximum(previous.raw_max, dirty_raw.max(axis=0)) if len(dirty) else previous.raw_max.copy()
+    # Only columns whose maximum or scale moved are recomputed over every row
+    full = {}
+    for c, name in enumerate(engine.FEATURE_NAMES):
+        if lost_max[c] or name in rescaled:
+            full[name] = _raw_column(comp, columns, max_depth, name)
+            raw_max[c] = full[name].max() if n else 0.0
+    scale = np.maximum(1.0, raw_max)
+
+    matrix = np.empty((n, len(engine.FEATURE_NAMES)))
+    matrix[kept_new] = previous.matrix[kept_old]
+    matrix[dirty] = dirty_raw / scale
+    for c, name in enumerate(engine.FEATURE_NAMES):
+        if scale[c] != old_scale[c] or name in rescaled:
+            column = full[name] if name in full else _raw_column(comp, columns, max_depth, name)
+            matrix[:, c] = column / scale[c]
+            rescaled.add(name)
+    matrix.flags.writeable = False
+    comp.flags.writeable = False
+    return engine.FeatureSet(
+        key=key,
+        columns=pd.DataFrame(columns, index=df.index, copy=False),
+        matrix=matrix,
+        comp=comp,
+        org=org,
+        raw_max=raw_max,
+        delta=FeatureDelta(base_key=previous.key, old_to_new=old_to_new, dirty=dirty, rescaled=frozenset(rescaled)),
+    )
+
+
+def _column_values(values: pd.Series, dtype, array_dtype) -> np.ndarray:
+    """`values` as stored in a roster column of `dtype`: category codes, or the plain array."""
+    if isinstance(dtype, pd.CategoricalDtype):
+        return dtype.categories.get_indexer(values.astype(object)).astype(array_dtype)
+    return values.to_numpy(dtype=array_dtype)
+
+
+def _chunk_cuts(data: bytes, body_start: int) -> np.ndarray:
+    """
+    Byte offsets splitting data[body_start:] into chunks of whole lines, ending with len(data). A line starts
+    a chunk when a hash of its first eight bytes and its length has its top CHUNK_BITS bits clear, so
+    boundaries depend on content only: an inserted, deleted or edited line changes the chunks next to it and
+    no others.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    ends = np.flatnonzero(buf[body_start:] == 10) + body_start
+    starts = ends[:-1] + 1 if len(ends) and ends[-1] == len(data) - 1 else ends + 1
+    line_ends = np.append(ends[1:], len(data))[: len(starts)]
+    if len(starts) and len(data) >= 8:
+        windows = np.lib.stride_tricks.as_strided(buf, shape=(len(data) - 7, 8), strides=(1, 1))
+        head = windows[np.minimum(starts, len(data) - 8)].view(np.uint64).ravel()
+        mixed = (head ^ (line_ends - starts).astype(np.uint64)) * np.uint64(0x9E3779B97F4A7C15)
+        starts = starts[(mixed >> np.uint64(64 - CHUNK_BITS)) == 0]
+    return np.concatenate([[body_start], starts, [len(data)]]).astype(np.int64)
+
+
+def _chunk_lines(data: bytes, cuts: np.ndarray, chunks) -> list:
+    """The non-empty lines of the given chunks."""
+    lines = []
+    for i in chunks:
+        lines.extend(line for line in data[cuts[i] : cuts[i + 1]].split(b"\n") if line)
+    return lines
+
+
+class _IdPositions:
+    """
+    employee_id -> roster position without rehashing every ID after each refresh: a hashed base index, a
+    vectorized base-to-current position map (updated on deletes) and a small dict for rows appended since.
+    """
+
+    def __init__(self, employee_ids):
+        self.base = pd.Index(np.asarray(employee_ids, dtype=object))
+        self.base.get_indexer(self.base[:1])  # build the hash table now rather than on the first refresh
+        self.current = np.arange(len(self.base), dtype=np.int64)
+        self.appended = {}
+
+    def lookup(self, employee_ids) -> np.ndarray:
+        """Current positions (-1 when absent)."""
+        employee_ids = np.asarray(employee_ids, dtype=object)
+        found = self.base.get_indexer(employee_ids)
+        positions = np.where(found >= 0, self.current[np.maximum(found, 0)], -1) if len(self.current) else np.full(len(found), -1)
+        if self.appended:
+            extra = np.array([self.appended.get(i, -1) for i in employee_ids], dtype=np.int64)
+            positions = np.where(positions >= 0, positions, extra)
+        return positions
+
+    def apply(self, old_to_new: np.ndarray, inserted_ids, first_position: int) -> None:
+        self.current = np.where(self.current >= 0, old_to_new[np.maximum(self.current, 0)], -1) if len(self.current) else self.current
+        self.appended = {i: int(old_to_new[p]) for i, p in self.appended.items() if old_to_new[p] >= 0}
+        self.appended.update((i, first_position + k) for k, i in enumerate(inserted_ids))
+
+
+class LiveRoster:
+    """
+    A roster CSV held in memory and kept current by `refresh()`, shared by every session of the app.
+    `df` and `equity_info` are what `engine.load_roster` would return for the current file; `version`
+    increases with every applied change. Frames and FeatureSets handed out are never mutated afterwards.
+    """
+
+    def __init__(self, path, max_feature_sets=MAX_FEATURE_SETS):
+        self.path = Path(path)
+        self.max_feature_sets = max_feature_sets
+        self.version = 0
+        self.last_delta = None
+        self._lock = threading.RLock()
+        self._features = OrderedDict()
+        with self._lock:
+            self._reload(self.path.read_bytes(), os.stat(self.path))
+
+    def _split(self, data: bytes) -> tuple:
+        end = data.find(b"\n")
+        header = data if end < 0 else data[:end]
+        cuts = _chunk_cuts(data, len(data) if end < 0 else end + 1)
+        hashes = np.fromiter((hash(data[a:b]) for a, b in zip(cuts[:-1].tolist(), cuts[1:].tolist())), dtype=np.int64, count=len(cuts) - 1)
+        return header, cuts, hashes
+
+    def _reload(self, data: bytes, stat) -> None:
+        """Full parse (through the on-disk cache), used at start-up and whenever a delta cannot apply."""
+        df, self.equity_info = disk_cache.load_roster_cached(io.BytesIO(data))
+        # Plain object columns take row edits in place; Arrow-backed strings would rewrite the whole column
+        text = [c for c in df.columns if pd.api.types.is_string_dtype(df[c].dtype) and not isinstance(df[c].dtype, pd.CategoricalDtype)]
+        self.df = df.astype({c: object for c in text}) if text else df
+        self.df.attrs = df.attrs
+        self._data = data
+        self._header, self._cuts, self._hashes = self._split(data)
+        self._stat = (stat.st_mtime_ns, stat.st_size)
+        ids = self.df["employee_id"]
+        header_columns = pd.read_csv(io.BytesIO(self._header), nrows=0).columns
+        # Rosters without IDs get generated ones, which cannot be diffed
+        self._incremental = ids.is_unique and any(c in header_columns for c in ("employee_id", "id"))
+        # A generic "equity" column's format is inferred from its values, so it is re-checked after each delta
+        self._equity_inferred = engine.find_equity_column(header_columns) == (self.equity_info.get("column_name"), None)
+        self._ids = _IdPositions(ids.to_numpy(dtype=object))
+        reports_to = engine._blank(self.df, "reports_to").astype(str)
+        self._report_counts = Counter(reports_to.value_counts().to_dict())
+        self._org = org_index_for_roster(self.df)
+        self._features.clear()
+        self.last_delta = None
+        self.version += 1
+
+    def _parse_lines(self, lines) -> tuple:
+        return engine.load_roster(io.BytesIO(self._header + b"\n" + b"\n".join(lines)))
+
+    def reload(self) -> None:
+        """Parse the whole file again, e.g. after the column mapping remembered for its header changed."""
+        with self._lock:
+            self._reload(self.path.read_bytes(), os.stat(self.path))
+
+    def refresh(self, force=False):
+        """
+        Bring the roster up to date with the file. Returns the applied RosterDelta, or None when nothing
+        changed or the file had to be reloaded in full (check `version` to see whether anything happened).
+        """
+        with self._lock:
+            stat = os.stat(self.path)
+            if not force and (stat.st_mtime_ns, stat.st_size) == self._stat:
+                return None
+            with trace.stage("refresh.diff") as stage:
+                data = self.path.read_bytes()
+                header, cuts, hashes = self._split(data)
+                if header != self._header or not self._incremental:
+                    self._reload(data, stat)
+                    return None
+                added, removed = self._diff_lines(data, cuts, hashes)
+                stage.rows = len(added) + len(removed)
+            self._stat = (stat.st_mtime_ns, stat.st_size)
+            if not added and not removed:
+                self._data, self._cuts, self._hashes = data, cuts, hashes
+                return None
+            new_rows, new_info = self._parse_lines(added)
+            old_ids = self._parse_lines(removed)[0]["employee_id"].to_numpy(dtype=object) if removed else []
+            delta = self._apply(new_rows, new_info, old_ids, added + removed)
+            if delta is None:
+                self._reload(data, stat)
+                return None
+            self._data, self._cuts, self._hashes = data, cuts, hashes
+            return delta
+
+    def _diff_lines(self, data: bytes, cuts: np.ndarray, hashes: np.ndarray) -> tuple:
+        """Lines only in the new file and lines only in the old one, found by splitting the changed chunks."""
+        added = _chunk_lines(data, cuts, np.flatnonzero(~pd.Series(hashes).isin(self._hashes).to_numpy()))
+        removed = _chunk_lines(self._data, self._cuts, np.flatnonzero(~pd.Series(self._hashes).isin(hashes).to_numpy()))
+        new, old = set(added), set(removed)
+        return [line for line in added if line not in old], [line for line in removed if line not in new]
+
+    def _apply(self, new_rows: pd.DataFrame, new_info: dict, old_ids: np.ndarray, changed_lines: list):
+        """Apply parsed row changes; returns the RosterDelta, or None when a full reload is needed."""
+        df = self.df
+        new_ids = new_rows["employee_id"].to_numpy(dtype=object)
+        if not pd.Index(new_ids).is_unique or list(new_rows.columns) != list(df.columns):
+            return None
+        new_pos_old = self._ids.lookup(new_ids)
+        is_update = new_pos_old >= 0
+        gone = np.setdiff1d(np.asarray(old_ids, dtype=object).astype(str), new_ids.astype(str))
+        deleted_old = self._ids.lookup(gone)
+        deleted_old = deleted_old[deleted_old >= 0]
+        deleted_ids = df["employee_id"].iloc[deleted_old].to_numpy(dtype=object)
+
+        with trace.stage("refresh.apply", rows=len(new_ids) + len(deleted_old)):
+            keep = np.ones(len(df), dtype=bool)
+            keep[deleted_old] = False
+            old_to_new = np.cumsum(keep) - 1
+            old_to_new[~keep] = -1
+            kept = np.flatnonzero(keep)
+            updated_new = old_to_new[new_pos_old[is_update]]
+            updates = new_rows[is_update]
+            inserts = new_rows[~is_update]
+            # Column by column on plain arrays: one copy each, no block consolidation or concat
+            columns = {}
+            for column in df.columns:
+                dtype = df[column].dtype
+                if isinstance(dtype, pd.CategoricalDtype):
+                    # Edit the codes; labels not seen before are appended to the categories
+                    incoming = pd.concat([updates[column], inserts[column]]).astype(object)
+                    unseen = pd.Index(incoming.dropna().unique()).difference(dtype.categories)
+                    dtype = pd.CategoricalDtype(dtype.categories.append(unseen.astype(dtype.categories.dtype)))
+                    array = df[column].cat.codes.to_numpy().astype(np.int32)
+                else:
+                    array = df[column].to_numpy()
+                array = array[kept] if len(deleted_old) else array.copy()
+                if len(updates):
+                    array[updated_new] = _column_values(updates[column], dtype, array.dtype)
+                if len(inserts):
+                    array = np.concatenate([array, _column_values(inserts[column], dtype, array.dtype)])
+                if isinstance(dtype, pd.CategoricalDtype):
+                    columns[column] = pd.Series(pd.Categorical.from_codes(array, dtype=dtype))
+                else:
+                    columns[column] = pd.Series(array, dtype=dtype, copy=False)
+            frame = pd.DataFrame(columns, copy=False)
+            if self._equity_inferred and "equity_raw" in frame.columns:
+                if engine.infer_equity_format(frame["equity_raw"].max()) != self.equity_info.get("format"):
+                    return None
+            n = len(frame)
+            inserted_new = np.arange(n - len(inserts), n, dtype=np.int64)
+            changed = np.concatenate([updated_new, inserted_new])
+            source = np.concatenate([new_pos_old[is_update], np.full(len(inserts), -1, dtype=np.int64)])
+
+            # Direct-report counts: retract the old rows' managers, count the new rows' managers
+            old_rows = df.iloc[np.concatenate([new_pos_old[is_update], deleted_old])]
+            before = Counter(engine._blank(old_rows, "reports_to").astype(str))
+            after = Counter(engine._blank(new_rows, "reports_to").astype(str))
+            referenced_new_hires = [i for i in inserts["employee_id"] if self._report_counts.get(i, 0) > 0]
+            self._report_counts.subtract(before)
+            self._report_counts.update(after)
+            managers = np.array([m for m in set(before) | set(after) if before[m] != after[m]], dtype=object)
+            self._ids.apply(old_to_new, inserts["employee_id"].tolist(), n - len(inserts))
+            manager_positions = self._ids.lookup(managers) if len(managers) else np.empty(0, dtype=np.int64)
+            report_positions = np.concatenate([manager_positions[manager_positions >= 0], inserted_new])
+            report_ids = frame["employee_id"].iloc[report_positions].to_numpy(dtype=object)
+            report_counts = np.array([self._report_counts.get(i, 0) for i in report_ids], dtype=np.int64)
+
+            # Org tree: patch the affected chains, or rebuild when a manager leaves, moves or was referenced
+            changed_rows = frame.iloc[changed]
+            reports_to = engine._blank(changed_rows, "reports_to").to_numpy(dtype=object)
+            new_parent = self._ids.lookup(reports_to)
+            new_orphan = (new_parent < 0) & ~is_root_reference(reports_to)
+            patched = None
+            if not referenced_new_hires:
+                patched = update_org_index(
+                    self._org,
+                    old_to_new,
+                    changed,
+                    source,
+                    new_parent,
+                    new_orphan,
+                    frame["comp_usd"].to_numpy(dtype=float),
+                    df["comp_usd"].to_numpy(dtype=float),
+                )
+            if patched is not None:
+                org, org_dirty = patched
+            else:
+                org = org_index_for_roster(frame)
+                old_depth = np.full(n, -1, dtype=np.int64)
+                old_depth[old_to_new[keep]] = self._org.depth[keep]
+                old_size = np.zeros(n, dtype=np.int64)
+                old_size[old_to_new[keep]] = self._org.subtree_size[keep]
+                old_sub = np.full(n, np.nan)
+                old_sub[old_to_new[keep]] = self._org.subtree_comp[keep]
+                org_dirty = np.flatnonzero((org.depth != old_depth) | (org.subtree_size != old_size) | (org.subtree_comp != old_sub))
+
+        base_fingerprint = df.attrs.get("fingerprint")
+        fingerprint = hashlib.sha1(str(base_fingerprint).encode("utf-8"))
+        for line in sorted(changed_lines):
+            fingerprint.update(line + b"\n")
+        frame.attrs = {"fingerprint": fingerprint.hexdigest()}
+        equity_info = dict(self.equity_info)
+        equity_info["value_issues"] = values.merge_issues([self.equity_info.get("value_issues") or [], new_info.get("value_issues") or []])
+
+        delta = RosterDelta(
+            base_fingerprint=base_fingerprint,
+            inserted=inserts["employee_id"].to_numpy(dtype=object),
+            updated=updates["employee_id"].to_numpy(dtype=object),
+            deleted=deleted_ids,
+            old_to_new=old_to_new,
+            changed=changed,
+            report_positions=report_positions,
+            report_counts=report_counts,
+            org=org,
+            org_dirty=org_dirty,
+        )
+        today = pd.Timestamp.now().normalize()
+        with trace.stage("refresh.features", rows=len(changed)):
+            for settings, features in list(self._features.items()):
+                if features.key[3] != today:
+                    del self._features[settings]
+                    continue
+                key = (frame.attrs["fingerprint"], *settings, today)
+                self._features[settings] = update_features(features, frame, delta, key)
+        self.df, self.equity_info, self._org = frame, equity_info, org
+        self.last_delta = delta
+        self.version += 1
+        return delta
+
+    def features(self, equity_format=None, total_shares_outstanding=None) -> engine.FeatureSet:
+        """FeatureSet for the current roster and equity settings; kept up to date by later refreshes."""
+        with self._lock:
+            settings = (equity_format, total_shares_outstanding)
+            today = pd.Timestamp.now().normalize()
+            key = (self.df.attrs.get("fingerprint"), equity_format, total_shares_outstanding, today)
+            features = self._features.get(settings)
+            if features is None or features.key != key:
+                features = engine.build_features(self.df, equity_format, total_shares_outstanding, key=key)
+                self._features[settings] = features
+            self._features.move_to_end(settings)
+            while len(self._features) > self.max_feature_sets:
+                self._features.popitem(last=False)
+            return features
+
+    def watch(self, interval=2.0, on_change=None) -> threading.Event:
+        """
+        Poll the file every `interval` seconds in a daemon thread, calling `on_change(self)` after each
+        applied change. Set the returned event to stop watching.
+        """
+        stop = threading.Event()
+
+        def poll():
+            while not stop.wait(interval):
+                version = self.version
+                try:
+                    self.refresh()
+                except (OSError, ValueError, RuntimeError):
+                    continue  # a half-written file; try again on the next tick
+                if on_change is not None and self.version != version:
+                    on_change(self)
+
+        threading.Thread(target=poll, name="roster-watch", daemon=True).start()
+        return stop
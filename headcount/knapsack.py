@@ -0,0 +1,149 @@
+"""
+Budget-constrained selection: maximize total impact score subject to total compensation <= budget.
+
+This is a 0/1 knapsack. It is solved by:
+  1. the LP relaxation (items by score/comp ratio, one fractional "break" item), which gives an upper bound;
+  2. a greedy fill, which gives a feasible lower bound;
+  3. reduced-cost variable fixing: any item whose LP reduced profit is larger than the bound gap can
+     never change side in an optimal solution, which usually fixes all but a small core around the break item;
+  4. depth-first branch-and-bound over the remaining core with LP bounds (Horowitz-Sahni style).
+When the node budget runs out the best solution found is returned together with the proven gap to the
+LP upper bound, so the answer is always optimal or provably near-optimal.
+"""
+from bisect import bisect_right
+
+import numpy as np
+
+DEFAULT_NODE_LIMIT = 200_000
+
+
+def _lp_bound(cum_w, cum_p, ratio, start, cap_left):
+    """LP relaxation value of items start.. (sorted by ratio) within cap_left, via prefix sums."""
+    j = bisect_right(cum_w, cum_w[start] + cap_left) - 1
+    bound = cum_p[j] - cum_p[start]
+    if j < len(ratio):
+        bound += (cap_left - (cum_w[j] - cum_w[start])) * ratio[j]
+    return bound, j
+
+
+def _branch_and_bound(values, weights, capacity, lower_bound, node_limit):
+    """
+    Exact 0/1 knapsack over items already sorted by ratio (descending), as Python lists.
+    Returns (best profit, chosen item indices or None if lower_bound was never beaten, nodes, finished).
+    """
+    n = len(values)
+    cum_w = [0.0] * (n + 1)
+    cum_p = [0.0] * (n + 1)
+    for i in range(n):
+        cum_w[i + 1] = cum_w[i] + weights[i]
+        cum_p[i + 1] = cum_p[i] + values[i]
+    ratio = [v / w for v, w in zip(values, weights)]
+    eps = 1e-9 * max(1.0, abs(cum_p[n]))
+
+    best = lower_bound
+    best_set = None
+    taken = []
+    # Frames: (next item, capacity left, profit so far, len(taken) when pushed, item to record or -1)
+    stack = [(0, capacity, 0.0, 0, -1)]
+    nodes = 0
+    while stack:
+        if nodes >= node_limit:
+            return best, best_set, nodes, False
+        i, cap_left, profit, snapshot, add = stack.pop()
+        del taken[snapshot:]
+        if add >= 0:
+            taken.append(add)
+        nodes += 1
+        if profit > best + eps:
+            best, best_set = profit, list(taken)
+        if i == n:
+            continue
+        bound, j = _lp_bound(cum_w, cum_p, ratio, i, cap_left)
+        if profit + bound <= best + eps:
+            continue
+        if j == n:
+            # Everything left fits: the bound is attained by taking it all
+            best, best_set = profit + bound, taken + list(range(i, n))
+            continue
+        stack.append((i + 1, cap_left, profit, len(taken), -1))
+        if weights[i] <= cap_left:
+            stack.append((i + 1, cap_left - weights[i], profit + values[i], len(taken), i))
+    return best, best_set, nodes, True
+
+
+def select_within_budget(scores, comp, budget, node_limit=DEFAULT_NODE_LIMIT) -> dict:
+    """
+    Maximize sum(scores[selected]) subject to sum(comp[selected]) <= budget.
+
+    Returns a dict with 'positions' (roster positions, best score first), 'total_score', 'total_cost',
+    'upper_bound' (proven bound on the optimum: the LP bound, or total_score once proven optimal),
+    'gap' (upper_bound - total_score) and 'optimal' (True when the selection is proven optimal).
+    """
+    scores = np.asarray(scores, dtype=float)
+    comp = np.asarray(comp, dtype=float)
+    budget = float(budget)
+
+    useful = scores > 0
+    free = np.flatnonzero(useful & (comp <= 0))  # positive score at no cost: always take
+    candidates = np.flatnonzero(useful & (comp > 0) & (comp <= budget))
+
+    # LP relaxation over candidates ordered by score per dollar (ties in roster order)
+    ratio = scores[candidates] / comp[candidates]
+    order = candidates[np.argsort(-ratio, kind="stable")]
+    v, w = scores[order], comp[order]
+    cum_w = np.concatenate([[0.0], np.cumsum(w)])
+    cum_p = np.concatenate([[0.0], np.cumsum(v)])
+    brk = int(np.searchsorted(cum_w, budget, side="right")) - 1  # items [0, brk) fit entirely
+    upper = cum_p[brk]
+    if brk < len(order):
+        upper += (budget - cum_w[brk]) * v[brk] / w[brk]
+
+    # Greedy lower bound: the LP prefix plus anything later that still fits
+    chosen = np.zeros(len(order), dtype=bool)
+    chosen[:brk] = True
+    cap_left = budget - cum_w[brk]
+    for k in range(brk, len(order)):
+        if w[k] <= cap_left:
+            chosen[k] = True
+            cap_left -= w[k]
+    lower = float(v[chosen].sum())
+
+    optimal = np.isclose(lower, upper)
+    if not optimal and brk < len(order):
+        # Reduced-cost fixing: flipping item k away from its LP value costs at least |v_k - r * w_k|
+        dual = v[brk] / w[brk]
+        reduced = np.abs(v - dual * w)
+        lp_value = np.arange(len(order)) < brk
+        core = reduced < (upper - lower) + 1e-9 * max(1.0, upper)
+        core[brk] = True
+        fixed_in = lp_value & ~core
+        core_idx = np.flatnonzero(core)
+        core_cap = budget - float(w[fixed_in].sum())
+        core_lower = lower - float(v[fixed_in].sum()) if np.array_equal(chosen & ~core, fixed_in) else -np.inf
+        best, best_set, _, optimal = _branch_and_bound(
+            v[core_idx].tolist(), w[core_idx].tolist(), core_cap, max(core_lower, 0.0), node_limit
+        )
+        if best_set is not None and best + float(v[fixed_in].sum()) > lower:
+            chosen = fixed_in.copy()
+            chosen[core_idx[best_set]] = True
+            lower = float(v[chosen].sum())
+        optimal = optimal or np.isclose(lower, upper)
+
+    positions = np.concatenate([free, order[chosen]]).astype(np.intp)
+    positions = positions[np.lexsort((positions, -scores[positions]))]
+    total_score = float(scores[positions].sum())
+    # Once optimality is proven the selection itself is the tightest bound
+    upper_bound = total_score if optimal else max(float(upper) + float(scores[free].sum()), total_score)
+    return {
+        "positions": positions,
+        "total_score": total_score,
+        "total_cost": float(comp[positions].sum()),
+        "upper_bound": upper_bound,
+        "gap": upper_bound - total_score,
+        "optimal": bool(optimal),
+    }
+
+
+def greedy_within_budget(ranking, budget) -> int:
+    """Headcount of the top-by-impact prefix that fits `budget` (the 'whatever falls out' greedy answer)."""
+    return max(0, int(np.searchsorted(ranking.cost_curve, float(budget), side="right")) - 1)
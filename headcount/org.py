@@ -0,0 +1,245 @@
+"""
+Org-hierarchy index built once per roster from employee_id / reports_to.
+
+Managers are resolved to integer parent positions with one hash lookup. The tree is then peeled
+bottom-up in vectorized rounds (Kahn's algorithm on the parent-pointer graph), which yields subtree
+sizes and subtree compensation in O(n) total work plus one NumPy call per org level, instead of a
+per-employee recursive walk. Nodes that are never peeled sit on a reporting cycle; they are cut loose
+and treated as roots so every feature stays defined.
+
+`update_org_index` patches an existing index after a small roster change (compensation edits, new hires,
+leavers and moves of employees without reports) by walking only the affected ancestor chains.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# reports_to values (case-insensitive) that mean "top of the org" rather than a missing manager
+ROOT_TOKENS = frozenset({"", "board", "board of directors", "none", "n/a", "na", "-"})
+
+
+@dataclass(frozen=True)
+class OrgIndex:
+    """
+    Compact org tree over roster positions.
+    parent[i] is the roster position of i's manager (-1 for roots, orphans and cycle members);
+    children[child_offsets[i]:child_offsets[i + 1]] are i's direct reports.
+    """
+
+    parent: np.ndarray
+    child_offsets: np.ndarray
+    children: np.ndarray
+    depth: np.ndarray
+    subtree_size: np.ndarray
+    subtree_comp: np.ndarray
+    orphans: np.ndarray
+    cycle_members: np.ndarray
+
+    @property
+    def transitive_reports(self) -> np.ndarray:
+        """Everyone below each employee, direct or indirect."""
+        return self.subtree_size - 1
+
+    @property
+    def roots(self) -> np.ndarray:
+        return np.flatnonzero(self.parent < 0)
+
+    def children_of(self, position: int) -> np.ndarray:
+        return self.children[self.child_offsets[position] : self.child_offsets[position + 1]]
+
+
+def _resolve_parents(employee_ids: np.ndarray, reports_to: np.ndarray) -> tuple:
+    """Map each manager reference to a roster position with one joint hash pass; returns (parent, orphan mask)."""
+    n = len(employee_ids)
+    codes, uniques = pd.factorize(np.concatenate([employee_ids, reports_to]))
+    id_codes, manager_codes = codes[:n], codes[n:]
+    # First roster position of every distinct value (-1 for values that are never an employee_id)
+    position_of = np.full(len(uniques) + 1, -1, dtype=np.int64)
+    positions = np.flatnonzero(id_codes >= 0)[::-1]
+    position_of[id_codes[positions]] = positions
+    parent = position_of[manager_codes]
+    # Unknown managers are orphans unless they name the top of the org ("Board", blank, ...)
+    unknown = np.flatnonzero(position_of[: len(uniques)] < 0)
+    unknown_names = pd.Series(np.asarray(uniques, dtype=object)[unknown], dtype=object).astype(str).str.strip().str.lower()
+    is_root_value = np.zeros(len(uniques) + 1, dtype=bool)
+    is_root_value[unknown[unknown_names.isin(ROOT_TOKENS).to_numpy()]] = True
+    is_root_value[-1] = True  # factorize code -1: missing manager
+    orphans = (parent < 0) & ~is_root_value[manager_codes]
+    return parent, orphans
+
+
+def is_root_reference(reports_to) -> np.ndarray:
+    """True where a reports_to value names the top of the org rather than a manager."""
+    values = pd.Series(np.asarray(reports_to, dtype=object), dtype=object)
+    return values.isna().to_numpy() | values.astype(str).str.strip().str.lower().isin(ROOT_TOKENS).to_numpy()
+
+
+def build_org_index(employee_ids, reports_to, comp=None) -> OrgIndex:
+    """Build the OrgIndex in linear time. `comp` (per employee) feeds subtree_comp; defaults to zeros."""
+    employee_ids = np.asarray(employee_ids, dtype=object)
+    reports_to = np.asarray(reports_to, dtype=object)
+    n = len(employee_ids)
+    comp = np.zeros(n) if comp is None else np.asarray(comp, dtype=float)
+    parent, orphans = _resolve_parents(employee_ids, reports_to)
+    parent[parent == np.arange(n)] = -1  # self-managed: a root
+
+    # Bottom-up peel: leaves first, a manager once all of its reports are done
+    size = np.ones(n, dtype=np.int64)
+    sub_comp = comp.copy()
+    pending = np.bincount(parent[parent >= 0], minlength=n)
+    done = np.zeros(n, dtype=bool)
+    frontier = np.flatnonzero(pending == 0)
+    rounds = []
+    while len(frontier):
+        done[frontier] = True
+        rounds.append(frontier)
+        up = parent[frontier]
+        has_parent = up >= 0
+        managers = up[has_parent]
+        np.add.at(size, managers, size[frontier[has_parent]])
+        np.add.at(sub_comp, managers, sub_comp[frontier[has_parent]])
+        np.subtract.at(pending, managers, 1)
+        candidates = np.unique(managers)
+        frontier = candidates[(pending[candidates] == 0) & ~done[candidates]]
+
+    # Whatever was never peeled lies on a cycle: cut those links and treat each member as a root
+    cycle_members = np.flatnonzero(~done)
+    parent[cycle_members] = -1
+
+    # Top-down depths, replaying the peel rounds in reverse (a manager always precedes its reports)
+    depth = np.zeros(n, dtype=np.int64)
+    for frontier in reversed(rounds):
+        up = parent[frontier]
+        has_parent = up >= 0
+        depth[frontier[has_parent]] = depth[up[has_parent]] + 1
+
+    children, child_offsets = _adjacency(parent)
+    return OrgIndex(
+        parent=parent,
+        child_offsets=child_offsets,
+        children=children,
+        depth=depth,
+        subtree_size=size,
+        subtree_comp=sub_comp,
+        orphans=np.flatnonzero(orphans),
+        cycle_members=cycle_members,
+    )
+
+
+def _adjacency(parent: np.ndarray) -> tuple:
+    """CSR adjacency: reports grouped by manager, as (children, child_offsets)."""
+    n = len(parent)
+    with_parent = np.flatnonzero(parent >= 0)
+    children = with_parent[np.argsort(parent[with_parent], kind="stable")]
+    child_offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(parent[with_parent], minlength=n), out=child_offsets[1:])
+    return children, child_offsets
+
+
+def _add_up_chain(parent, start, size_delta, comp_delta, size, sub_comp, touched) -> None:
+    """Add size/comp deltas to every ancestor starting at `start` (inclusive), one NumPy call per level."""
+    keep = start >= 0
+    node, size_delta, comp_delta = start[keep], size_delta[keep], comp_delta[keep]
+    while len(node):
+        np.add.at(size, node, size_delta)
+        np.add.at(sub_comp, node, comp_delta)
+        touched.append(node)
+        node = parent[node]
+        keep = node >= 0
+        node, size_delta, comp_delta = node[keep], size_delta[keep], comp_delta[keep]
+
+
+def update_org_index(org: OrgIndex, old_to_new, changed, source, new_parent, new_orphan, comp, old_comp):
+    """
+    Patch `org` for a roster whose rows were deleted, edited or appended, without rebuilding it.
+    `old_to_new` maps old positions to new ones (-1 for deleted rows); `changed` are the new positions of
+    edited and appended rows, `source` their old positions (-1 when appended), `new_parent` their manager's
+    new position (-1 for roots and orphans) and `new_orphan` whether their manager is unknown. `comp` and
+    `old_comp` are the compensation arrays after and before the change. Appended employees must not be
+    referenced by any existing reports_to (they arrive without reports).
+
+    Returns (OrgIndex, positions whose transitive_reports, depth or subtree_comp may have changed), or None
+    when the change is structural beyond leaves (a manager leaves or moves, a cycle is touched), in which
+    case the caller rebuilds with `build_org_index`.
+    """
+    old_to_new = np.asarray(old_to_new, dtype=np.int64)
+    changed = np.asarray(changed, dtype=np.int64)
+    source = np.asarray(source, dtype=np.int64)
+    new_parent = np.where(np.asarray(new_parent, dtype=np.int64) == changed, -1, new_parent).astype(np.int64)
+    comp = np.asarray(comp, dtype=float)
+    n = len(comp)
+    deleted = np.flatnonzero(old_to_new < 0)
+    kept_old = np.flatnonzero(old_to_new >= 0)
+    kept_new = old_to_new[kept_old]
+
+    updated = source >= 0
+    old_parent = np.full(len(changed), -1, dtype=np.int64)
+    old_parent_old = org.parent[source[updated]]
+    old_parent[updated] = np.where(old_parent_old >= 0, old_to_new[np.maximum(old_parent_old, 0)], -1)
+    moved = updated & (old_parent != new_parent)
+    in_cycle = np.zeros(len(org.parent), dtype=bool)
+    in_cycle[org.cycle_members] = True
+    if (org.subtree_size[deleted] != 1).any() or in_cycle[deleted].any():
+        return None
+    if (org.subtree_size[source[moved]] != 1).any() or in_cycle[source[updated]].any():
+        return None
+    # A new manager that is itself being moved or appended would need its depth settled first
+    relinked = np.zeros(n, dtype=bool)
+    relinked[changed[moved | ~updated]] = True
+    if relinked[new_parent[new_parent >= 0]].any():
+        return None
+
+    parent = np.full(n, -1, dtype=np.int64)
+    parent_old = org.parent[kept_old]
+    parent[kept_new] = np.where(parent_old >= 0, old_to_new[np.maximum(parent_old, 0)], -1)
+    size = np.ones(n, dtype=np.int64)
+    size[kept_new] = org.subtree_size[kept_old]
+    sub_comp = comp.copy()
+    sub_comp[kept_new] = org.subtree_comp[kept_old]
+    depth = np.zeros(n, dtype=np.int64)
+    depth[kept_new] = org.depth[kept_old]
+    touched = [changed]
+
+    # Leavers and movers leave their old chain; movers and new hires join the new one
+    old_comp = np.asarray(old_comp, dtype=float)
+    deleted_parent = org.parent[deleted]
+    leaving_from = np.concatenate([np.where(deleted_parent >= 0, old_to_new[np.maximum(deleted_parent, 0)], -1), old_parent[moved]])
+    leaving_comp = np.concatenate([old_comp[deleted], old_comp[source[moved]]])
+    _add_up_chain(parent, leaving_from, -np.ones(len(leaving_from), dtype=np.int64), -leaving_comp, size, sub_comp, touched)
+    parent[changed] = new_parent
+    joining = moved | ~updated
+    sub_comp[changed[joining]] = comp[changed[joining]]
+    size[changed[joining]] = 1
+    _add_up_chain(parent, new_parent[joining], np.ones(int(joining.sum()), dtype=np.int64), comp[changed[joining]], size, sub_comp, touched)
+    # Compensation edits in place shift the employee's own subtree total and every ancestor's
+    stayed = changed[updated & ~moved]
+    comp_delta = comp[stayed] - old_comp[source[updated & ~moved]]
+    _add_up_chain(parent, stayed, np.zeros(len(stayed), dtype=np.int64), comp_delta, size, sub_comp, touched)
+    has_parent = new_parent >= 0
+    depth[changed] = np.where(has_parent, depth[np.maximum(new_parent, 0)] + 1, 0)
+
+    is_orphan = np.zeros(n, dtype=bool)
+    is_orphan[old_to_new[org.orphans][old_to_new[org.orphans] >= 0]] = True
+    is_orphan[changed] = np.asarray(new_orphan, dtype=bool)
+    if len(deleted) or len(changed) > int(updated.sum()) or moved.any():
+        children, child_offsets = _adjacency(parent)
+    else:
+        children, child_offsets = org.children, org.child_offsets
+    patched = OrgIndex(
+        parent=parent,
+        child_offsets=child_offsets,
+        children=children,
+        depth=depth,
+        subtree_size=size,
+        subtree_comp=sub_comp,
+        orphans=np.flatnonzero(is_orphan),
+        cycle_members=old_to_new[org.cycle_members],
+    )
+    return patched, np.unique(np.concatenate(touched))
+
+
+def org_index_for_roster(df: pd.DataFrame) -> OrgIndex:
+    """OrgIndex for a loaded roster (every employee is a root when there is no reports_to column)."""
+    reports_to = df["reports_to"].to_numpy(dtype=object) if "reports_to" in df.columns else np.full(len(df), "", dtype=object)
+    return build_org_index(df["employee_id"].to_numpy(dtype=object), reports_to, df["comp_usd"].to_numpy(dtype=float))
@@ -0,0 +1,44 @@
+"""
+The scoring pipeline shared by the app and every command: load a roster, build its FeatureSet, move equity
+and tenure to an as-of date, then dilute equity for future rounds.
+
+Each step caches its own result (disk_cache, engine.get_features, vesting.features_as_of,
+captable.features_diluted), so running the pipeline again with the same inputs returns the same FeatureSet
+and the rankings cached on it. The app, `select`, `sweep` and `compare` all go through `roster_features`,
+so a roster scores the same wherever it is scored.
+"""
+import pandas as pd
+
+from headcount import captable, disk_cache, engine, trace, vesting
+
+
+def roster_features(df: pd.DataFrame, equity_info: dict, total_shares_outstanding=None, as_of=None, equity_basis=None, dilution_factor=1.0, base=None) -> engine.FeatureSet:
+    """
+    The FeatureSet a loaded roster is scored on: `base` (default: engine.get_features) with equity and
+    tenure as of `as_of` (default today) on `equity_basis` (default: vesting.default_basis) when the roster
+    has vesting dates, and ownership scaled by `dilution_factor`. `total_shares_outstanding` only applies to
+    equity given in shares.
+    """
+    equity_format = equity_info.get("format")
+    shares = total_shares_outstanding if equity_format == "shares" else None
+    features = engine.get_features(df, equity_format, shares) if base is None else base
+    curves = vesting.get_curves(df)
+    if curves.has_dates:
+        as_of = pd.Timestamp.now() if as_of is None else as_of
+        equity_basis = vesting.default_basis(df) if equity_basis is None else equity_basis
+        features = vesting.features_as_of(features, curves, as_of, equity_format, shares, equity_basis)
+    return captable.features_diluted(features, dilution_factor)
+
+
+def load_features(roster, total_shares_outstanding=None, as_of=None, equity_basis=None, dilution_factor=1.0, cache=True) -> tuple:
+    """
+    Load `roster` (a path or file-like CSV) and run `roster_features` on it: (df, equity_info, FeatureSet).
+    `cache=False` parses the CSV instead of going through the on-disk roster cache.
+    """
+    if cache:
+        df, equity_info = disk_cache.load_roster_cached(roster)
+    else:
+        with trace.stage("load"):
+            df, equity_info = engine.load_roster(roster)
+    features = roster_features(df, equity_info, total_shares_outstanding, as_of, equity_basis, dilution_factor)
+    return df, equity_info, features
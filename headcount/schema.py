@@ -0,0 +1,198 @@
+"""
+Compiled read plans for roster CSVs, keyed by a fingerprint of the header line.
+
+Every export from one HRIS carries the same header, so the header-only work is done once per schema and
+cached in a `SchemaPlan`:
+- which columns to read (`usecols`)
+- how they are renamed to the roster schema
+- which column holds equity and in what format
+- which columns become categoricals
+A load of a known header then goes straight to `pd.read_csv(usecols=...)` without a detection pass.
+
+Column mappings chosen in the app's "Column mapping" panel are part of the plan. They are remembered per
+header in `schemas.json` under the cache directory, so the next export with that header loads already
+mapped instead of having columns copied on every rerun.
+
+The format of a generic `equity` column depends on its values, not the header. The loader still infers
+it on every load, using the already-parsed column, which costs one max().
+"""
+import csv
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from headcount import engine
+
+SCHEMA_FILE = Path(os.environ.get("HEADCOUNT_CACHE_DIR", Path.home() / ".cache" / "headcount")) / "schemas.json"
+_PLAN_CACHE_SIZE = 64
+_plans: "OrderedDict[tuple, SchemaPlan]" = OrderedDict()
+_mappings = None
+_lock = threading.Lock()
+
+
+def header_signature(header) -> str:
+    """Fingerprint of a header: the column names in order."""
+    return hashlib.blake2b("\x1f".join(map(str, header)).encode("utf-8"), digest_size=12).hexdigest()
+
+
+def parse_header_line(line) -> list:
+    """Column names from a raw CSV header line (bytes or str)."""
+    text = line.decode("utf-8-sig") if isinstance(line, bytes) else line
+    return next(csv.reader([text.strip("\r\n")]), [])
+
+
+@dataclass(frozen=True)
+class SchemaPlan:
+    """
+    How to read one CSV header into the roster schema. `usecols` are the header columns to parse, `rename`
+    maps each of them to its roster column, and `copies` lists (roster column, roster column it copies)
+    pairs for a source mapped onto two fields. `equity_format` is None when the values decide it, and
+    `mapping` holds the user's choices (roster column -> header column, or None for "not in this file").
+    """
+
+    signature: str
+    header: tuple
+    usecols: tuple
+    rename: dict
+    copies: tuple = ()
+    equity_column: str = None
+    equity_format: str = None
+    categories: tuple = ()
+    mapping: dict = field(default_factory=dict)
+
+    @property
+    def columns(self) -> list:
+        """Roster columns a load with this plan produces, in order."""
+        return [self.rename[c] for c in self.usecols] + [target for target, _ in self.copies]
+
+    def source_of(self, column: str):
+        """Header column that feeds roster `column`, or None."""
+        for source, target in self.rename.items():
+            if target == column:
+                return source
+        copied = dict(self.copies).get(column)
+        return None if copied is None else self.source_of(copied)
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Rename a frame read with `usecols` to roster columns and add the copied ones."""
+        df = df.rename(columns=self.rename)
+        for target, source in self.copies:
+            df[target] = df[source]
+        return df
+
+
+def compile_plan(header, mapping=None) -> SchemaPlan:
+    """
+    Work out the read plan for `header`: auto-detected renames (engine.normalize_columns and the equity
+    column), then the user's `mapping` on top. Columns that end up outside engine.ROSTER_COLUMNS are not read.
+    """
+    header = tuple(str(c) for c in header)
+    mapping = {target: source for target, source in (mapping or {}).items() if source is None or source in header}
+    equity_column, equity_format = engine.find_equity_column(header)
+    equity_info = {"column_name": equity_column}
+    rename = dict(zip(header, engine.normalize_columns(pd.DataFrame(columns=list(header)), equity_info).columns))
+    copies = []
+    for target, source in mapping.items():
+        # The chosen column replaces whatever was detected for `target`
+        for column, renamed in rename.items():
+            if renamed == target and column != source:
+                rename[column] = None
+        if source is None:
+            continue
+        current = rename[source]
+        if current in engine.ROSTER_COLUMNS and current != target and current not in mapping:
+            copies.append((target, current))  # still needed under its own name
+        else:
+            rename[source] = target
+    usecols = tuple(c for c in header if rename[c] in engine.ROSTER_COLUMNS)
+    rename = {c: rename[c] for c in usecols}
+    columns = set(rename.values()) | {target for target, _ in copies}
+    if equity_column is not None and rename.get(equity_column) != "equity_raw":
+        equity_column, equity_format = None, None  # the mapping took the equity column for another field
+    return SchemaPlan(
+        signature=header_signature(header),
+        header=header,
+        usecols=usecols,
+        rename=rename,
+        copies=tuple(copies),
+        equity_column=equity_column,
+        equity_format=equity_format,
+        categories=tuple(c for c in engine.CATEGORY_COLUMNS if c in columns),
+        mapping=mapping,
+    )
+
+
+def _load_mappings() -> dict:
+    global _mappings
+    if _mappings is None:
+        try:
+            _mappings = json.loads(SCHEMA_FILE.read_text())
+        except (OSError, ValueError):
+            _mappings = {}
+    return _mappings
+
+
+def remembered_mapping(header) -> dict:
+    """The column mapping saved for this header (empty when none was chosen)."""
+    with _lock:
+        return dict(_load_mappings().get(header_signature(header), {}))
+
+
+def plan_for_header(header, mapping=None) -> SchemaPlan:
+    """Compiled plan for `header`, built once per (header, mapping); `mapping=None` uses the remembered one."""
+    header = tuple(str(c) for c in header)
+    if mapping is None:
+        mapping = remembered_mapping(header)
+    key = (header_signature(header), tuple(sorted(mapping.items(), key=lambda item: item[0])))
+    with _lock:
+        plan = _plans.get(key)
+        if plan is not None:
+            _plans.move_to_end(key)
+            return plan
+    plan = compile_plan(header, mapping)
+    with _lock:
+        _plans[key] = plan
+        while len(_plans) > _PLAN_CACHE_SIZE:
+            _plans.popitem(last=False)
+    return plan
+
+
+def remember_mapping(header, mapping: dict) -> SchemaPlan:
+    """Save `mapping` for this header (an empty one forgets it) and return the resulting plan."""
+    global _mappings
+    signature = header_signature(header)
+    with _lock:
+        mappings = dict(_load_mappings())
+        if mapping:
+            mappings[signature] = dict(mapping)
+        else:
+            mappings.pop(signature, None)
+        try:
+            SCHEMA_FILE.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=SCHEMA_FILE.parent, suffix=".tmp")
+            with os.fdopen(fd, "w") as fh:
+                json.dump(mappings, fh, indent=1, sort_keys=True)
+            os.replace(tmp, SCHEMA_FILE)
+        except OSError:
+            pass  # still applies to this process
+        _mappings = mappings
+    return plan_for_header(header, mapping)
+
+
+def compact_dtypes(df: pd.DataFrame, plan: SchemaPlan) -> pd.DataFrame:
+    """Categoricals for the plan's low-cardinality text columns and int32 compensation when it fits."""
+    for column in plan.categories:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype("category")
+    comp = df["comp_usd"]
+    if len(comp) and comp.max() <= np.iinfo(np.int32).max and comp.min() >= np.iinfo(np.int32).min:
+        df["comp_usd"] = comp.astype(np.int32)
+    return df
@@ -0,0 +1,203 @@
+"""
+Ranked selection index: answers "what does the top N cost?" for every N without re-sorting.
+
+A RankedSelection is built once per weight vector. It keeps the ranking, the cumulative compensation
+(so total and average cost are O(1) lookups and the whole cost-vs-headcount curve is just an array)
+and a wavelet matrix over the ranked compensation, which gives the median of any top-N prefix in O(log n).
+When a roster is refreshed incrementally (headcount.incremental), the new ranking is derived from the
+previous one by re-inserting only the rows whose scores changed.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from headcount.engine import FEATURE_NAMES, score, weight_vector
+
+
+class _PrefixOrderStatistics:
+    """
+    Wavelet matrix over a sequence of integers, answering "k-th smallest among the first r items" in
+    O(log n) steps. Built with one stable partition per bit level, all vectorized.
+    """
+
+    def __init__(self, values: np.ndarray):
+        values = np.asarray(values)
+        n = len(values)
+        # Replace values by their (unique) ranks so the structure only needs log2(n) levels
+        self.sorted_values = np.sort(values, kind="stable")
+        ranks = np.empty(n, dtype=np.int64)
+        ranks[np.argsort(values, kind="stable")] = np.arange(n)
+        self.levels = max(1, int(n - 1).bit_length()) if n else 1
+        self.ones = []
+        self.zeros = []
+        cur = ranks
+        for level in range(self.levels):
+            bits = (cur >> (self.levels - 1 - level)) & 1
+            ones = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(bits, out=ones[1:])
+            self.ones.append(ones)
+            self.zeros.append(n - int(ones[-1]))
+            cur = np.concatenate([cur[bits == 0], cur[bits == 1]])
+
+    def kth_smallest(self, prefix_len, k) -> np.ndarray:
+        """Vectorized: the k-th smallest (0-based) value among the first `prefix_len` items."""
+        end = np.array(prefix_len, dtype=np.int64, copy=True)
+        k = np.array(k, dtype=np.int64, copy=True)
+        start = np.zeros_like(end)
+        rank = np.zeros_like(end)
+        for level in range(self.levels):
+            ones = self.ones[level]
+            ones_start = ones[start]
+            ones_end = ones[end]
+            zeros_in_range = (end - start) - (ones_end - ones_start)
+            go_left = k < zeros_in_range
+            k = np.where(go_left, k, k - zeros_in_range)
+            rank = np.where(go_left, rank, rank | (1 << (self.levels - 1 - level)))
+            start = np.where(go_left, start - ones_start, self.zeros[level] + ones_start)
+            end = np.where(go_left, end - ones_end, self.zeros[level] + ones_end)
+        return self.sorted_values[rank]
+
+    def median(self, prefix_len) -> np.ndarray:
+        """Median of the first `prefix_len` items (mean of the two middle values for even lengths; 0 when empty)."""
+        r = np.atleast_1d(np.asarray(prefix_len, dtype=np.int64))
+        safe = np.maximum(r, 1)
+        lower = self.kth_smallest(safe, (safe - 1) // 2)
+        upper = self.kth_smallest(safe, safe // 2)
+        return np.where(r > 0, (lower + upper) / 2.0, 0.0)
+
+
+class RankedSelection:
+    """
+    Every top-N selection for one weight vector.
+    `scores` are the impact scores in roster order, `order` is the full ranking (best first, ties in roster
+    order) and `cost_curve[k]` the total compensation of the top k employees, for k = 0..n.
+    """
+
+    def __init__(self, scores: np.ndarray, comp: np.ndarray, order: np.ndarray = None):
+        scores = np.asarray(scores, dtype=float)
+        comp = np.asarray(comp)
+        self.scores = scores
+        self.order = np.argsort(-scores, kind="stable") if order is None else order
+        self.ranked_comp = comp[self.order]
+        self.cost_curve = np.zeros(len(comp) + 1, dtype=self.ranked_comp.dtype if len(comp) else float)
+        np.cumsum(self.ranked_comp, out=self.cost_curve[1:])
+        self._stats = None
+        self._curve = None
+
+    @property
+    def stats(self) -> _PrefixOrderStatistics:
+        """Median index over the ranked compensation, built on first use."""
+        if self._stats is None:
+            self._stats = _PrefixOrderStatistics(self.ranked_comp)
+        return self._stats
+
+    def updated(self, scores: np.ndarray, comp: np.ndarray, delta) -> "RankedSelection":
+        """
+        Ranking for a refreshed roster (see headcount.incremental.FeatureDelta) without a full sort.
+        Rows outside `delta.dirty` keep their scores and relative order, so only the dirty rows are placed
+        again, each with two binary searches into the surviving order. Only valid when no feature with a
+        non-zero weight was rescaled.
+        """
+        scores = np.asarray(scores, dtype=float)
+        dirty = np.asarray(delta.dirty, dtype=np.int64)
+        is_dirty = np.zeros(len(scores), dtype=bool)
+        is_dirty[dirty] = True
+        kept = delta.old_to_new[self.order]
+        kept = kept[kept >= 0]
+        kept = kept[~is_dirty[kept]]
+        moved = dirty[np.lexsort((dirty, -scores[dirty]))]
+        kept_keys = -scores[kept]
+        lo = np.searchsorted(kept_keys, -scores[moved], side="left")
+        hi = np.searchsorted(kept_keys, -scores[moved], side="right")
+        # Among equal scores the roster position decides, as in the stable full sort
+        at = np.array([a + np.searchsorted(kept[a:b], p) for a, b, p in zip(lo, hi, moved)], dtype=np.int64)
+        order = np.insert(kept, at, moved)
+        # A surviving row's score can differ in the last bit from its previous value (the matrix product
+        # may round differently once rows shift), which breaks the merge's assumptions; one linear check
+        # catches it, and such a refresh falls back to the full stable sort
+        ranked = scores[order]
+        if ((ranked[1:] > ranked[:-1]) | ((ranked[1:] == ranked[:-1]) & (order[1:] < order[:-1]))).any():
+            return RankedSelection(scores, comp)
+        return RankedSelection(scores, comp, order=order)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def _clip(self, n: int) -> int:
+        return max(0, min(int(n), len(self.order)))
+
+    def positions(self, n: int) -> np.ndarray:
+        """Roster positions of the top `n` employees, best first."""
+        return self.order[: self._clip(n)]
+
+    def total(self, n: int) -> float:
+        return self.cost_curve[self._clip(n)]
+
+    def average(self, n: int) -> float:
+        n = self._clip(n)
+        return self.cost_curve[n] / n if n else 0.0
+
+    def median(self, n: int) -> float:
+        n = self._clip(n)
+        if self._stats is None:
+            # One prefix median is a linear-time selection; the index only pays off for repeated queries
+            return float(np.median(self.ranked_comp[:n])) if n else 0.0
+        return float(self._stats.median(n)[0])
+
+    def summary(self, n: int) -> dict:
+        """Total, average and median compensation of the top `n`, as shown on the KPI cards."""
+        n = self._clip(n)
+        return {"headcount": n, "total": self.total(n), "average": self.average(n), "median": self.median(n)}
+
+    def median_curve(self) -> np.ndarray:
+        """Median compensation for every headcount 0..n, computed in one vectorized pass."""
+        return self.stats.median(np.arange(len(self.order) + 1))
+
+    def curve_frame(self) -> pd.DataFrame:
+        """Cost-vs-headcount curve (total, average, median) indexed by headcount, ready to plot; built once."""
+        if self._curve is not None:
+            return self._curve
+        headcount = np.arange(len(self.order) + 1)
+        total = self.cost_curve.astype(float)
+        average = np.divide(total, headcount, out=np.zeros_like(total), where=headcount > 0)
+        self._curve = pd.DataFrame(
+            {"total": total, "average": average, "median": self.median_curve()},
+            index=pd.Index(headcount, name="headcount"),
+        )
+        return self._curve
+
+
+_RANKING_CACHE_SIZE = 16
+# Above this share of changed rows a full sort beats re-inserting them into the previous ranking
+MAX_REINSERT_SHARE = 1 / 16
+_ranking_cache: "OrderedDict[tuple, RankedSelection]" = OrderedDict()
+_ranking_cache_lock = threading.Lock()
+
+
+def get_ranking(features, weights: dict) -> RankedSelection:
+    """
+    Return the RankedSelection for a FeatureSet and weight vector, building it only on a cache miss.
+    A FeatureSet patched from an earlier one (features.delta) reuses that set's cached ranking when no
+    weighted feature was rescaled.
+    """
+    vector = weight_vector(weights)
+    key = (features.key, tuple(vector))
+    delta = features.delta
+    with _ranking_cache_lock:
+        cached = _ranking_cache.get(key)
+        if cached is not None:
+            _ranking_cache.move_to_end(key)
+            return cached
+        base = _ranking_cache.get((delta.base_key, key[1])) if delta is not None else None
+    weighted = {name for name, w in zip(FEATURE_NAMES, vector) if w != 0}
+    if base is not None and not weighted & delta.rescaled and len(delta.dirty) <= len(features) * MAX_REINSERT_SHARE:
+        ranking = base.updated(score(features, weights), features.comp, delta)
+    else:
+        ranking = RankedSelection(score(features, weights), features.comp)
+    with _ranking_cache_lock:
+        _ranking_cache[key] = ranking
+        while len(_ranking_cache) > _RANKING_CACHE_SIZE:
+            _ranking_cache.popitem(last=False)
+    return ranking
@@ -0,0 +1,111 @@
+"""
+Process-wide store of parsed rosters shared by every app session.
+
+`st.cache_data` pickles its return value and gives every rerun of every session its own copy, so 40
+analysts meant 40+ roster copies and a deserialization per rerun. A `RosterStore` keeps one parsed roster
+per source content (keyed like headcount.disk_cache) and hands out shallow views. A view shares every
+column with the stored frame, and with pandas copy-on-write a column is copied only if a session writes to
+it. Derived data is shared the same way: FeatureSets and rankings live in the process-wide caches of
+headcount.engine and headcount.selection. What a session owns is its weight vector and selection positions.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from headcount import disk_cache, trace
+
+# Rosters kept per process; the least recently used is dropped first
+MAX_ROSTERS = 8
+
+
+def enable_copy_on_write() -> None:
+    """Turn on pandas copy-on-write where it is not yet the default (pandas < 3), so views stay isolated."""
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
+
+
+def shared_view(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    A view of a shared roster for one session: no data is copied, and assigning to a column (or to cells)
+    of the view copies that column instead of changing the shared frame.
+    """
+    view = df.copy(deep=False)
+    view.attrs = dict(df.attrs)
+    return view
+
+
+def _source_token(csv_source, load_kwargs: dict):
+    """
+    Cheap identity of a source whose content cannot change under the same token: a path with its mtime and
+    size, or an uploaded file's id. None when the content has to be hashed.
+    """
+    options = tuple(sorted((k, str(v)) for k, v in load_kwargs.items()))
+    if isinstance(csv_source, (str, os.PathLike)):
+        stat = os.stat(csv_source)
+        return ("path", os.path.abspath(csv_source), stat.st_mtime_ns, stat.st_size, options)
+    file_id = getattr(csv_source, "file_id", None)
+    return None if file_id is None else ("upload", file_id, options)
+
+
+class RosterStore:
+    """Parsed rosters keyed by source content, loaded once per process and shared read-only."""
+
+    def __init__(self, max_rosters=MAX_ROSTERS):
+        self.max_rosters = max_rosters
+        self._rosters: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}
+        self._keys = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._rosters)
+
+    def get(self, csv_source, **load_kwargs) -> tuple[pd.DataFrame, dict]:
+        """
+        (view, equity_info) for `csv_source`, parsing it (or reading the on-disk cache) only the first time
+        this content is seen. Sessions asking for the same new file at once wait for a single load.
+        """
+        # Hashing the content costs a pass over the file, so it is remembered per path/upload identity
+        token = _source_token(csv_source, load_kwargs)
+        with self._lock:
+            key = self._keys.get(token) if token is not None else None
+        if key is None:
+            with trace.stage("store.key"):
+                key = disk_cache.cache_key(csv_source, **load_kwargs)
+            if token is not None:
+                with self._lock:
+                    self._keys[token] = key
+                    while len(self._keys) > 4 * self.max_rosters:
+                        self._keys.popitem(last=False)
+        with self._lock:
+            entry = self._rosters.get(key)
+            if entry is None:
+                loading = self._loading.setdefault(key, threading.Lock())
+        if entry is None:
+            with loading:
+                with self._lock:
+                    entry = self._rosters.get(key)
+                if entry is None:
+                    try:
+                        entry = disk_cache.load_roster_cached(csv_source, key=key, **load_kwargs)
+                        with self._lock:
+                            self._rosters[key] = entry
+                            while len(self._rosters) > self.max_rosters:
+                                self._rosters.popitem(last=False)
+                    finally:
+                        # A failed load must not leave its lock behind: the next request retries from scratch
+                        with self._lock:
+                            if self._loading.get(key) is loading:
+                                del self._loading[key]
+        with self._lock:
+            if key in self._rosters:
+                self._rosters.move_to_end(key)
+        df, equity_info = entry
+        return shared_view(df), dict(equity_info)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rosters.clear()
+            self._keys.clear()
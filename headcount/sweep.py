@@ -0,0 +1,188 @@
+"""
+Batch scenario sweeps: every weight vector in a grid times every target headcount.
+
+The grid is scored as one float32 matrix product against the normalized feature matrix, a block of weight
+vectors at a time. Each block keeps only the top max(headcounts) rows per scenario: the employees that can
+still make the cut are rescored exactly and sorted, the rest never are. After that every headcount's
+total/average/median is a prefix lookup. Large grids are
+split across a process pool. Results come back as one compact table with one row per
+(weight vector, headcount).
+"""
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from headcount.engine import DEFAULT_WEIGHTS, FEATURE_NAMES, weight_vector
+from headcount.export import write_export
+
+# Scenarios scored per matrix product; bounds the (employees x block) score matrix held in memory.
+BLOCK_SIZE = 256
+
+
+def weight_grid(step=0.5, max_weight=5.0, features=tuple(DEFAULT_WEIGHTS), fixed=None) -> np.ndarray:
+    """
+    Every combination of weights 0, step, ..., max_weight for `features` (by default the five original
+    sidebar weights), as a (k, len(FEATURE_NAMES)) array. Features not listed take their value from `fixed`
+    (default 0).
+    """
+    fixed = fixed or {}
+    levels = np.round(np.arange(0.0, max_weight + step / 2, step), 10)
+    grid = np.array(list(itertools.product(levels, repeat=len(features))), dtype=float).reshape(-1, len(features))
+    weights = np.tile([float(fixed.get(name, 0.0)) for name in FEATURE_NAMES], (len(grid), 1))
+    for col, name in enumerate(features):
+        weights[:, FEATURE_NAMES.index(name)] = grid[:, col]
+    return weights
+
+
+def _top_block(matrix: np.ndarray, matrix32: np.ndarray, weights: np.ndarray, k: int, pool: np.ndarray) -> np.ndarray:
+    """
+    Row-wise top-k employee positions for a block of m weight vectors, best first; ties are broken by
+    roster order, as in engine.select_top. Returns an (m, k) int array.
+
+    The block is first scored in float32, which halves the memory traffic of the (m, n) score matrix.
+    `pool` is a set of at least k employees likely to score well in this block: the k-th best pool score
+    is a lower bound on each scenario's cut-off, so, widened by the float32 rounding error, it leaves only
+    a few more than k candidates per scenario. Those are rescored in float64 as engine.score does
+    (`matrix @ w`) and sorted, so the result is the one engine.select_top gives for that scenario.
+    """
+    m, n = len(weights), len(matrix)
+    if k >= len(pool):
+        pool = np.arange(n)
+    weights32 = weights.astype(np.float32)
+    scores = weights32 @ matrix32.T
+    # Rounding the inputs, each product and each of the d - 1 sums moves a float32 score by at most
+    # (d + 2) * 2**-24 * sum(|w| * |x|); twice that covers the bound's own error, doubled again for slack.
+    error = (matrix.shape[1] + 2) * 2.0**-22 * (np.abs(weights) @ np.abs(matrix).max(axis=0))
+    bound = np.partition(weights32 @ matrix32[pool].T, len(pool) - k, axis=1)[:, len(pool) - k]
+    flat = np.flatnonzero(scores >= (bound - error).astype(np.float32)[:, None])
+    rows = flat // n
+    cols = flat - rows * n
+    starts = np.searchsorted(flat, np.arange(m) * n)
+    ends = np.append(starts[1:], len(flat))
+    width = int((ends - starts).max())
+    # Candidates laid out left to right in roster order, padded with +inf so they sort last
+    position = np.arange(len(flat)) - starts[rows]
+    candidates = np.full((m, width), np.inf)
+    exact = np.concatenate([matrix[cols[lo:hi]] @ w for lo, hi, w in zip(starts, ends, weights)])
+    candidates[rows, position] = -exact
+    columns = np.zeros((m, width), dtype=np.intp)
+    columns[rows, position] = cols
+    order = np.argsort(candidates, axis=1)
+    ranked = np.take_along_axis(candidates, order[:, : k + 1], axis=1)
+    # The quicksort leaves equal scores in arbitrary order. Rows tied across the cut-off may have kept the
+    # wrong members, so they are re-sorted stably; rows tied only inside the top k just reorder those ties.
+    cut = np.flatnonzero(ranked[:, k - 1] == ranked[:, k]) if k < width else np.empty(0, dtype=np.intp)
+    order[cut] = np.argsort(candidates[cut], axis=1, kind="stable")
+    order = order[:, :k]
+    inner = np.setdiff1d(np.flatnonzero((ranked[:, 1:k] == ranked[:, : k - 1]).any(axis=1)), cut)
+    if len(inner):
+        order[inner] = np.take_along_axis(order[inner], np.lexsort((order[inner], ranked[inner, :k]), axis=1), axis=1)
+    return np.take_along_axis(columns, order, axis=1)
+
+
+def _evaluate_block(matrix, matrix32, comp, weights, headcounts, with_ids):
+    m = len(weights)
+    max_n = int(headcounts.max()) if len(headcounts) else 0
+    if max_n:
+        # Pool: the best 4 * max_n employees under the block's mean weights
+        mean_scores = matrix @ weights.mean(axis=0)
+        size = min(len(mean_scores), 4 * max_n)
+        pool = np.argpartition(-mean_scores, size - 1)[:size]
+        top = _top_block(matrix, matrix32, weights, max_n, pool)
+    else:
+        top = np.empty((m, 0), dtype=np.intp)
+    top_comp = comp[top]
+    cum = np.cumsum(top_comp, axis=1)
+    rows = {"scenario": [], "headcount": [], "total": [], "average": [], "median": []}
+    selected = []
+    for n in headcounts:
+        n = int(n)
+        if n:
+            total = cum[:, n - 1]
+            middle = np.partition(top_comp[:, :n], [(n - 1) // 2, n // 2], axis=1)
+            median = (middle[:, (n - 1) // 2] + middle[:, n // 2]) / 2.0
+            average = total / n
+        else:
+            total = median = average = np.zeros(m)
+        rows["scenario"].append(np.arange(m))
+        rows["headcount"].append(np.full(m, n))
+        rows["total"].append(total)
+        rows["average"].append(average)
+        rows["median"].append(median)
+        if with_ids:
+            selected.extend(top[:, :n])
+    columns = {key: np.concatenate(parts) for key, parts in rows.items()}
+    return columns, (selected if with_ids else None)
+
+
+def _evaluate_chunk(args):
+    matrix, comp, weights, headcounts, with_ids = args
+    matrix32 = matrix.astype(np.float32)
+    parts = []
+    for start in range(0, len(weights), BLOCK_SIZE):
+        columns, selected = _evaluate_block(matrix, matrix32, comp, weights[start : start + BLOCK_SIZE], headcounts, with_ids)
+        columns["scenario"] = columns["scenario"] + start
+        parts.append((columns, selected))
+    return parts
+
+
+def run_sweep(features, weights, headcounts, employee_ids=None, workers=None, chunk_scenarios=4096) -> pd.DataFrame:
+    """
+    Evaluate every weight vector in `weights` (a (k, len(FEATURE_NAMES)) array or list of dicts) at every
+    target in `headcounts` against a FeatureSet.
+
+    Returns a DataFrame with one row per (scenario, headcount): the scenario index, its weights, the headcount
+    and the total/average/median compensation of the selection (the KPI card values). When `employee_ids` is
+    given, a `selected_ids` column holds the selected IDs joined by spaces, best first.
+    `workers` > 1 splits the grid into `chunk_scenarios`-sized chunks over a process pool.
+    """
+    if len(weights) and isinstance(weights[0], dict):
+        weights = np.array([weight_vector(w) for w in weights])
+    weights = np.asarray(weights, dtype=float).reshape(-1, len(FEATURE_NAMES))
+    n_employees = len(features)
+    headcounts = np.clip(np.unique(np.asarray(headcounts, dtype=int)), 0, n_employees)
+    matrix = np.ascontiguousarray(features.matrix, dtype=float)
+    comp = np.asarray(features.comp)
+    with_ids = employee_ids is not None
+
+    chunks = [
+        (matrix, comp, weights[start : start + chunk_scenarios], headcounts, with_ids)
+        for start in range(0, len(weights), chunk_scenarios)
+    ]
+    workers = workers if workers is not None else 1
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            results = list(pool.map(_evaluate_chunk, chunks))
+    else:
+        results = [_evaluate_chunk(chunk) for chunk in chunks]
+
+    frames = []
+    all_selected = []
+    for chunk_index, parts in enumerate(results):
+        offset = chunk_index * chunk_scenarios
+        for columns, selected in parts:
+            columns = dict(columns)
+            columns["scenario"] = columns["scenario"] + offset
+            frames.append(pd.DataFrame(columns))
+            if with_ids:
+                all_selected.extend(selected)
+    if not frames:
+        return pd.DataFrame(columns=["scenario", *FEATURE_NAMES, "headcount", "total", "average", "median"])
+    result = pd.concat(frames, ignore_index=True)
+    for col, name in enumerate(FEATURE_NAMES):
+        result.insert(1 + col, name, weights[result["scenario"].to_numpy(), col])
+    if with_ids:
+        ids = np.asarray(employee_ids, dtype=object)
+        result["selected_ids"] = [" ".join(ids[positions]) for positions in all_selected]
+    result = result.sort_values(["scenario", "headcount"], kind="stable", ignore_index=True)
+    return result
+
+
+def write_sweep(result: pd.DataFrame, path) -> None:
+    """Stream sweep results to `path` as CSV, gzip CSV or Parquet, chosen by the file suffix."""
+    write_export(result, path)
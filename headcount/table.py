@@ -0,0 +1,86 @@
+"""
+Server-side paging, sorting, filtering and formatting for the "Selected employees" table.
+
+Only the visible page is ever formatted, and the formatting is done with whole-column string
+operations rather than per-cell lambdas, so a 20k-row selection costs the same to render as a 50-row one.
+"""
+import numpy as np
+import pandas as pd
+
+# Roster column -> readable label, in display order
+DISPLAY_COLUMNS = {
+    "employee_id": "ID",
+    "name": "Name",
+    "role": "Title",
+    "department": "Department",
+    "location": "Location",
+    "comp_usd": "Compensation (USD)",
+    "equity_pct": "Equity %",
+    "impact_score": "Impact score",
+}
+# Columns searched by the free-text filter
+FILTER_COLUMNS = ("employee_id", "name", "role", "department", "location")
+PAGE_SIZES = (25, 50, 100, 500)
+
+
+def filter_rows(df: pd.DataFrame, text: str) -> pd.DataFrame:
+    """Rows where any text column contains `text` (case-insensitive); all rows for an empty filter."""
+    text = (text or "").strip()
+    if not text:
+        return df
+    mask = np.zeros(len(df), dtype=bool)
+    for column in FILTER_COLUMNS:
+        if column in df.columns:
+            mask |= df[column].astype(str).str.contains(text, case=False, regex=False).to_numpy()
+    return df[mask]
+
+
+def sort_rows(df: pd.DataFrame, column: str, ascending: bool) -> pd.DataFrame:
+    """Stable sort on one display column, so ties keep their impact-score order."""
+    if column not in df.columns:
+        return df
+    return df.sort_values(column, ascending=ascending, kind="stable")
+
+
+def page_count(n_rows: int, page_size: int) -> int:
+    return max(1, -(-n_rows // page_size))
+
+
+def page_slice(df: pd.DataFrame, page: int, page_size: int) -> pd.DataFrame:
+    """Rows of the 1-based `page`, clamped to the last page."""
+    page = min(max(1, int(page)), page_count(len(df), page_size))
+    start = (page - 1) * page_size
+    return df.iloc[start : start + page_size]
+
+
+def format_usd(values) -> pd.Series:
+    """Whole dollars with thousands separators, e.g. 185000 -> "$185,000"."""
+    digits = pd.Series(np.asarray(values, dtype=float).round().astype(np.int64)).astype(str)
+    return "$" + digits.str.replace(r"\B(?=(\d{3})+(?!\d))", ",", regex=True)
+
+
+def _format_float(values: pd.Series, spec: str, suffix: str = "") -> pd.Series:
+    numbers = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+    formatted = pd.Series(np.char.mod(spec, numbers), index=values.index) + suffix
+    return formatted.where(~np.isnan(numbers), "")
+
+
+def format_page(page: pd.DataFrame, equity_format=None) -> pd.DataFrame:
+    """
+    Display frame for one page: readable column labels, "$185,000" compensation, 3-decimal impact score,
+    and equity as "0.4000%" (or a 0-100 "Equity Score" for grant values). Missing columns show as blanks.
+    """
+    out = page.reindex(columns=list(DISPLAY_COLUMNS)).reset_index(drop=True)
+    for column in FILTER_COLUMNS:
+        out[column] = out[column].astype(object).where(out[column].notna(), "")
+    out["comp_usd"] = format_usd(out["comp_usd"]) if len(out) else out["comp_usd"]
+    out["impact_score"] = _format_float(out["impact_score"], "%.3f")
+    if equity_format == "value":
+        # Grant values are already normalized to a relative 0-100 score
+        out["equity_pct"] = _format_float(out["equity_pct"], "%.1f")
+        labels = dict(DISPLAY_COLUMNS, equity_pct="Equity Score")
+    else:
+        # For shares (converted) or native percentages, show as percentage
+        out["equity_pct"] = _format_float(out["equity_pct"], "%.4f", "%")
+        labels = DISPLAY_COLUMNS
+    return out.rename(columns=labels)
@@ -0,0 +1,217 @@
+"""
+Per-stage instrumentation for app reruns and batch jobs: wall time, row counts and peak memory.
+
+A `Tracer` collects one `StageRecord` per `with tracer.stage(name):` block. Library code reports its own
+sub-stages through the module-level `stage()`, which goes to whichever tracer is active in the current
+thread/context (see `Tracer.start`). With no active tracer, or a disabled one, `stage()` returns a shared
+no-op context manager, so the instrumentation costs one context-variable lookup per stage.
+
+Peak memory is measured with tracemalloc (NumPy and pandas buffers included) only when the tracer is
+created with `track_memory=True`, since tracing allocations slows the traced code down noticeably.
+Records can be appended to a JSON-lines log or written as a Prometheus node_exporter textfile.
+"""
+import contextvars
+import json
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+_active = contextvars.ContextVar("headcount_tracer", default=None)
+# tracemalloc is process-wide; count the tracers using it so the last one out stops it
+_tracemalloc_users = 0
+_tracemalloc_lock = threading.Lock()
+
+
+@dataclass
+class StageRecord:
+    """One finished stage. `peak_bytes` is the peak traced allocation above the stage's starting point."""
+
+    name: str
+    seconds: float
+    rows: int = None
+    peak_bytes: int = None
+    depth: int = 0
+
+
+class _NullStage:
+    """Stand-in for a stage when tracing is off; accepts and discards `.rows`."""
+
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, tracer, name, rows):
+        self.tracer = tracer
+        self.name = name
+        self.rows = rows
+        self.child_peak = 0
+
+    def __enter__(self):
+        tracer = self.tracer
+        self.depth = len(tracer._open)
+        tracer._open.append(self)
+        # Reserve the slot now so records stay in start order (a parent before its nested stages)
+        self.slot = len(tracer.records)
+        tracer.records.append(None)
+        if tracer.track_memory:
+            self.mem_start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        tracer = self.tracer
+        tracer._open.pop()
+        peak_bytes = None
+        if tracer.track_memory:
+            # reset_peak() in nested stages hides their peaks from us; they hand them up on exit instead
+            peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+            peak_bytes = max(0, peak - self.mem_start)
+            if tracer._open:
+                parent = tracer._open[-1]
+                parent.child_peak = max(parent.child_peak, peak)
+        rows = None if self.rows is None else int(self.rows)
+        tracer.records[self.slot] = StageRecord(self.name, seconds, rows, peak_bytes, self.depth)
+        return False
+
+
+class Tracer:
+    """Collects StageRecords for one run (an app rerun, a CLI command)."""
+
+    def __init__(self, enabled=True, track_memory=False, run_id=None):
+        self.enabled = bool(enabled)
+        self.track_memory = bool(enabled and track_memory)
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        self.records = []
+        self._open = []
+        self._owns_tracemalloc = False
+
+    def stage(self, name, rows=None):
+        """Context manager timing one named stage; set `.rows` on the yielded object if the count is known later."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, rows)
+
+    def start(self):
+        """Begin memory tracking (if requested) and make this the active tracer for `stage()` calls."""
+        global _tracemalloc_users
+        previous = _active.get()
+        if previous is not None and previous is not self:
+            # A run that died before stop() (e.g. st.stop()) must not keep tracemalloc alive
+            previous.stop()
+        if self.track_memory and not self._owns_tracemalloc:
+            with _tracemalloc_lock:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                _tracemalloc_users += 1
+            self._owns_tracemalloc = True
+        self._token = _active.set(self)
+        return self
+
+    def stop(self):
+        global _tracemalloc_users
+        token = getattr(self, "_token", None)
+        if token is not None:
+            _active.reset(token)
+            self._token = None
+        if self._owns_tracemalloc:
+            with _tracemalloc_lock:
+                _tracemalloc_users -= 1
+                if _tracemalloc_users == 0:
+                    tracemalloc.stop()
+            self._owns_tracemalloc = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def finished(self) -> list:
+        """Records of the stages that have completed, in the order they started."""
+        return [r for r in self.records if r is not None]
+
+    def total_seconds(self) -> float:
+        """Wall time of the top-level stages."""
+        return sum(r.seconds for r in self.finished() if r.depth == 0)
+
+    def as_rows(self) -> list:
+        return [asdict(r) for r in self.finished()]
+
+    def write_jsonl(self, path) -> None:
+        """Append one JSON object per stage to `path`."""
+        lines = [
+            json.dumps(dict(record, run_id=self.run_id, timestamp=round(self.started_at, 3)))
+            for record in self.as_rows()
+        ]
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.write("".join(line + "\n" for line in lines))
+
+    def write_prometheus(self, path, job="headcount") -> None:
+        """Write the latest run as a node_exporter textfile (replaced atomically, as the collector expects)."""
+        metrics = (
+            ("headcount_stage_seconds", "Wall time of the stage in the last run", "seconds"),
+            ("headcount_stage_rows", "Rows processed by the stage in the last run", "rows"),
+            ("headcount_stage_peak_bytes", "Peak traced memory above the stage's start in the last run", "peak_bytes"),
+        )
+        # One sample per stage name: repeated stages add up their time and keep their largest rows/peak
+        merged = {}
+        for r in self.finished():
+            seen = merged.setdefault(r.name, {"seconds": 0.0, "rows": None, "peak_bytes": None})
+            seen["seconds"] += r.seconds
+            for field in ("rows", "peak_bytes"):
+                value = getattr(r, field)
+                if value is not None:
+                    seen[field] = value if seen[field] is None else max(seen[field], value)
+        lines = []
+        for metric, help_text, field in metrics:
+            samples = [(name, values[field]) for name, values in merged.items() if values[field] is not None]
+            if not samples:
+                continue
+            lines += ["# HELP {} {}".format(metric, help_text), "# TYPE {} gauge".format(metric)]
+            lines += ['{}{{job="{}",stage="{}"}} {}'.format(metric, job, name, value) for name, value in samples]
+        lines.append('headcount_run_timestamp_seconds{{job="{}"}} {:.3f}'.format(job, self.started_at))
+        path = Path(path)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write("\n".join(lines) + "\n")
+        os.replace(tmp, path)
+
+    def export(self, path) -> None:
+        """Write to `path` as a Prometheus textfile when it ends in .prom, else append JSON lines."""
+        if str(path).endswith(".prom"):
+            self.write_prometheus(path)
+        else:
+            self.write_jsonl(path)
+
+
+def stage(name, rows=None):
+    """Time `name` on the active tracer, or do nothing when no enabled tracer is active."""
+    tracer = _active.get()
+    if tracer is None or not tracer.enabled:
+        return _NULL_STAGE
+    return _Stage(tracer, name, rows)
+
+
+def active_tracer():
+    return _active.get()
@@ -0,0 +1,199 @@
+"""
+Vectorized parsing of messy roster values: amounts, percentages, dates and currencies.
+
+Exports carry values like `$280000`, `~175000`, `19.0%`, `1.2M`, `TBD - hourly` and dates in several
+layouts. Every parser here works on the *distinct* strings of a column (`pd.factorize`), so a million-row
+roster with a few thousand distinct salaries or start dates costs a few thousand parses, and the result is
+gathered back to the rows by code. Values that are present but cannot be parsed come back as NaN/NaT with a
+`bad` mask, and `normalize_values` turns those masks into an issue report instead of dropping them quietly.
+"""
+import numpy as np
+import pandas as pd
+
+# Units of local currency -> USD. A fixed local table keeps scenario results reproducible; pass `fx_rates`
+# to `normalize_values` to use other rates.
+FX_TO_USD = {
+    "USD": 1.0,
+    "EUR": 1.08,
+    "GBP": 1.27,
+    "CAD": 0.73,
+    "AUD": 0.66,
+    "CHF": 1.13,
+    "JPY": 0.0067,
+    "CNY": 0.14,
+    "INR": 0.012,
+    "SGD": 0.74,
+}
+DEFAULT_CURRENCY = "USD"
+
+# Tried in order of how many distinct strings they parse; ambiguous day/month layouts are decided by the data
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y/%m/%d",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%d.%m.%Y",
+    "%Y%m%d",
+    "%b %d, %Y",
+    "%B %d, %Y",
+    "%d %b %Y",
+    "%d %B %Y",
+)
+
+# Optional approximation mark and currency symbol, the number (thousands separators allowed), then an
+# optional k/M/B multiplier and percent sign
+_NUMBER_PATTERN = r"^[~≈]?\s*[$€£¥]?\s*([-+]?(?:\d[\d,_ ]*)?\.?\d+)\s*([kKmMbB]?)\s*%?$"
+_MULTIPLIERS = {"": 1.0, "k": 1e3, "m": 1e6, "b": 1e9}
+# Examples kept per (column, reason) in the issue report
+MAX_ISSUE_EXAMPLES = 5
+
+
+def _distinct(series: pd.Series) -> tuple:
+    """(codes, stripped distinct strings); blank strings share the code -1 with missing values."""
+    codes, uniques = pd.factorize(series)
+    text = pd.Series(uniques, dtype=object).astype(str).str.strip()
+    blank = (text == "").to_numpy()
+    if blank.any():
+        codes = np.where(blank[codes] & (codes >= 0), -1, codes)
+    return codes, text
+
+
+def _gather(values: np.ndarray, codes: np.ndarray, missing) -> np.ndarray:
+    return np.append(values, np.array([missing], dtype=values.dtype))[codes]
+
+
+def parse_numbers(series: pd.Series) -> tuple:
+    """
+    Parse amounts and percentages (`$280,000`, `~175000`, `19.0%`, `1.2M`) to floats.
+    Returns (values, bad): blanks are NaN and not bad; text that is not a number is NaN and flagged bad.
+    """
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        values = series.to_numpy(dtype=float, na_value=np.nan)
+        return values, np.zeros(len(values), dtype=bool)
+    codes, text = _distinct(series)
+    # Plain numbers go through the C parser; only the rest pay for the regex
+    number = pd.to_numeric(text, errors="coerce").to_numpy(dtype=float, copy=True)
+    messy = np.flatnonzero(np.isnan(number))
+    if len(messy):
+        parts = text.iloc[messy].str.extract(_NUMBER_PATTERN)
+        cleaned = pd.to_numeric(parts[0].str.replace(r"[,_ ]", "", regex=True), errors="coerce").to_numpy(dtype=float)
+        number[messy] = cleaned * parts[1].fillna("").str.lower().map(_MULTIPLIERS).to_numpy(dtype=float)
+    values = _gather(number, codes, np.nan)
+    bad = np.isnan(values) & (codes >= 0)
+    return values, bad
+
+
+def parse_dates(series: pd.Series) -> tuple:
+    """
+    Parse date strings to datetime64 with formats detected from the data, one parse per distinct string.
+    Each pass applies the format (from DATE_FORMATS) that matches most of the strings still unparsed; the
+    few left after that are parsed one by one. Returns (values, bad) like `parse_numbers`.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        values = series.to_numpy(dtype="datetime64[ns]")
+        return values, np.zeros(len(values), dtype=bool)
+    codes, text = _distinct(series)
+    parsed = pd.Series(pd.NaT, index=text.index, dtype="datetime64[ns]")
+    pending = text.index[(text != "").to_numpy()]  # blanks are already missing (code -1)
+    formats = list(DATE_FORMATS)
+    while len(pending) and formats:
+        attempts = {}
+        for fmt in formats:
+            attempts[fmt] = pd.to_datetime(text[pending], format=fmt, errors="coerce")
+            if attempts[fmt].notna().all():
+                break  # one layout covers everything left; no need to try the others
+        fmt, best = max(attempts.items(), key=lambda item: item[1].notna().sum())
+        if not best.notna().any():
+            break
+        parsed[best.index[best.notna()]] = best[best.notna()]
+        pending = best.index[best.isna()]
+        formats.remove(fmt)
+    for position in pending:
+        try:
+            parsed[position] = pd.Timestamp(text[position])
+        except (ValueError, TypeError, OverflowError):
+            pass
+    values = _gather(parsed.to_numpy(dtype="datetime64[ns]"), codes, np.datetime64("NaT", "ns"))
+    bad = np.isnat(values) & (codes >= 0)
+    return values, bad
+
+
+def to_usd(amounts: np.ndarray, currency: pd.Series, fx_rates=None) -> tuple:
+    """
+    Convert local-currency `amounts` to USD using one rate lookup per currency code (categorical codes).
+    Blank currencies count as USD. Returns (usd, bad) where `bad` marks currencies missing from the rate table.
+    """
+    rates_table = FX_TO_USD if fx_rates is None else fx_rates
+    currency = currency if isinstance(currency.dtype, pd.CategoricalDtype) else currency.astype("category")
+    categories = pd.Series(currency.cat.categories, dtype=object).astype(str).str.strip().str.upper()
+    categories = categories.where(categories != "", DEFAULT_CURRENCY)
+    rates = np.append(categories.map(rates_table).to_numpy(dtype=float), rates_table[DEFAULT_CURRENCY])
+    per_row = rates[currency.cat.codes.to_numpy()]
+    bad = np.isnan(per_row) & ~np.isnan(amounts)
+    return amounts * per_row, bad
+
+
+def _report(issues: list, df: pd.DataFrame, column: str, reason: str, bad: np.ndarray, raw: pd.Series) -> None:
+    count = int(bad.sum())
+    if not count:
+        return
+    rows = np.flatnonzero(bad)[:MAX_ISSUE_EXAMPLES]
+    ids = df["employee_id"].iloc[rows].astype(str).tolist() if "employee_id" in df.columns else [str(r) for r in rows]
+    issues.append(
+        {
+            "column": column,
+            "reason": reason,
+            "count": count,
+            "examples": [{"employee_id": i, "value": str(v)} for i, v in zip(ids, raw.iloc[rows])],
+        }
+    )
+
+
+def merge_issues(reports) -> list:
+    """Combine issue reports (e.g. one per streamed chunk), summing counts and keeping the first examples."""
+    merged = {}
+    for report in reports:
+        for issue in report:
+            key = (issue["column"], issue["reason"])
+            if key not in merged:
+                merged[key] = {**issue, "examples": list(issue["examples"])}
+                continue
+            merged[key]["count"] += issue["count"]
+            merged[key]["examples"] = (merged[key]["examples"] + issue["examples"])[:MAX_ISSUE_EXAMPLES]
+    return list(merged.values())
+
+
+def normalize_values(df: pd.DataFrame, fx_rates=None, equity_format=None) -> tuple[pd.DataFrame, list]:
+    """
+    Parse the value columns of a roster whose columns are already normalized (see engine.normalize_columns).
+    comp_usd becomes float USD (converted through `currency` when present), equity_raw and equity_refreshes
+    floats (also converted to USD when `equity_format` is "value": grant values are money, shares and
+    percentages are not), start_date and vesting_start_date datetime64. Returns (DataFrame, issues), one
+    issue dict per (column, reason) with a count and a few example rows; unparseable values are NaN/NaT.
+    """
+    df = df.copy()
+    issues = []
+    # Amounts in local currency, converted together so a missing rate is reported once per row
+    money = ["comp_usd"] + (["equity_raw", "equity_refreshes"] if equity_format == "value" else [])
+    no_rate = np.zeros(len(df), dtype=bool)
+    for column in ("comp_usd", "equity_raw", "equity_refreshes"):
+        if column not in df.columns:
+            continue
+        raw = df[column]
+        parsed, bad = parse_numbers(raw)
+        _report(issues, df, column, "not a number", bad, raw)
+        if column in money and "currency" in df.columns:
+            parsed, bad_currency = to_usd(parsed, df["currency"], fx_rates)
+            no_rate |= bad_currency
+        df[column] = parsed
+    if "currency" in df.columns:
+        _report(issues, df, "currency", "no exchange rate", no_rate, df["currency"])
+    if "start_date" in df.columns:
+        dates, bad = parse_dates(df["start_date"])
+        _report(issues, df, "start_date", "not a date", bad, df["start_date"])
+        df["start_date"] = dates
+    if "vesting_start_date" in df.columns:
+        dates, bad = parse_dates(df["vesting_start_date"])
+        _report(issues, df, "vesting_start_date", "not a date", bad, df["vesting_start_date"])
+        df["vesting_start_date"] = dates
+    return df, issues
@@ -0,0 +1,239 @@
+"""
+Vesting schedules and as-of-date scoring.
+
+Every grant on a roster follows the same schedule shape (cliff, duration, vesting frequency), so the fraction
+vested after k months is one shared table, `VestingSchedule.curve()`. An employee's vesting curve is that
+table shifted to their vesting start month and scaled by their grant. `VestingCurves` precomputes, once per
+roster, the start month and day, the grant and the refresh grant as flat arrays. The vested amount of every
+employee as of a date is then a single gather: `grant * curve[month - start]`.
+
+Refresh grants (`equity_refreshes`) vest on their own schedule, starting `refresh_delay_months` after the
+original grant. Grants are dated by `vesting_start_date`, else by the employee's `start_date`. Employees with
+neither count as fully vested, which is how the static equity score has always treated them.
+
+`features_as_of` derives the FeatureSet for an as-of date from the roster's base FeatureSet. Only the tenure
+and equity columns of the matrix are recomputed, so moving an as-of slider costs O(n) lookups, not a
+feature rebuild.
+"""
+import dataclasses
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from headcount import engine, trace, values
+
+BASES = ("vested", "unvested", "total")
+_CURVE_CACHE_SIZE = 8
+_AS_OF_CACHE_SIZE = 64
+_curve_cache: "OrderedDict[tuple, VestingCurves]" = OrderedDict()
+_as_of_cache: "OrderedDict[tuple, engine.FeatureSet]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class VestingSchedule:
+    """
+    Grants vest `cliff_months / duration_months` at the cliff, then every `frequency_months` until fully
+    vested after `duration_months`. Refresh grants start `refresh_delay_months` after the original grant and
+    follow their own cliff and duration.
+    """
+
+    cliff_months: int = 12
+    duration_months: int = 48
+    frequency_months: int = 1
+    refresh_delay_months: int = 12
+    refresh_cliff_months: int = 0
+    refresh_duration_months: int = 48
+
+    def curve(self) -> tuple:
+        """(grant, refresh) vested fractions by months since vesting start, flat after the last entry."""
+        length = max(self.duration_months, self.refresh_delay_months + self.refresh_duration_months) + 1
+        months = np.arange(length)
+        return (
+            _fractions(months, self.cliff_months, self.duration_months, self.frequency_months),
+            _fractions(months - self.refresh_delay_months, self.refresh_cliff_months, self.refresh_duration_months, self.frequency_months),
+        )
+
+
+def _fractions(months: np.ndarray, cliff: int, duration: int, frequency: int) -> np.ndarray:
+    if duration <= 0:
+        return (months >= 0).astype(float)
+    steps = np.floor_divide(np.maximum(months, 0), max(1, frequency)) * max(1, frequency)
+    vested = np.minimum(steps, duration) / duration
+    return np.where((months < cliff) | (months < 0), 0.0, vested)
+
+
+def month_index(dates) -> np.ndarray:
+    """Months since 1970-01 for datetime64 values (-1 for NaT)."""
+    dates = np.asarray(dates, dtype="datetime64[M]")
+    months = dates.astype(np.int64)
+    return np.where(np.isnat(dates), -1, months)
+
+
+@dataclass(frozen=True)
+class VestingCurves:
+    """
+    Per-employee vesting inputs for one roster, aligned with its rows: vesting start month (-1 when unknown),
+    start day for tenure (days since epoch, -1 when unknown), original grant and refresh grant amounts, plus
+    the schedule's shared `grant_curve` / `refresh_curve` tables.
+    """
+
+    schedule: VestingSchedule
+    start_month: np.ndarray
+    start_day: np.ndarray
+    grant: np.ndarray
+    refresh: np.ndarray
+    grant_curve: np.ndarray
+    refresh_curve: np.ndarray
+
+    @property
+    def has_dates(self) -> bool:
+        return bool((self.start_month >= 0).any())
+
+    @property
+    def earliest_start(self):
+        """First month any grant starts vesting, as a Timestamp (None without dates)."""
+        known = self.start_month[self.start_month >= 0]
+        return pd.Timestamp(np.datetime64(int(known.min()), "M")) if len(known) else None
+
+    def vested(self, as_of) -> np.ndarray:
+        """Vested amount per employee on `as_of`: one gather per grant kind."""
+        month = int(month_index(np.datetime64(pd.Timestamp(as_of), "D")))
+        offset = month - self.start_month
+        known = self.start_month >= 0
+        last = len(self.grant_curve) - 1
+        at = np.clip(offset, 0, last)
+        grant_share = np.where(known, np.where(offset >= 0, self.grant_curve[at], 0.0), 1.0)
+        refresh_share = np.where(known, np.where(offset >= 0, self.refresh_curve[at], 0.0), 1.0)
+        return self.grant * grant_share + self.refresh * refresh_share
+
+    def amount(self, as_of, basis="vested") -> np.ndarray:
+        """Equity counted for scoring: vested or unvested on `as_of`, or the total granted."""
+        if basis not in BASES:
+            raise ValueError("Unknown vesting basis {!r} (expected one of: {})".format(basis, ", ".join(BASES)))
+        total = self.grant + self.refresh
+        if basis == "total":
+            return total
+        vested = self.vested(as_of)
+        return vested if basis == "vested" else total - vested
+
+    def tenure_years(self, as_of) -> np.ndarray:
+        """Years since start on `as_of` (0 when the start is unknown or later)."""
+        day = np.datetime64(pd.Timestamp(as_of).normalize(), "D").astype(np.int64)
+        years = (day - self.start_day) / 365.25
+        return np.where(self.start_day >= 0, np.maximum(years, 0.0), 0.0)
+
+
+def _days(series: pd.Series) -> np.ndarray:
+    dates = values.parse_dates(series)[0].astype("datetime64[D]")
+    return np.where(np.isnat(dates), -1, dates.astype(np.int64))
+
+
+def build_curves(df: pd.DataFrame, schedule: VestingSchedule = VestingSchedule()) -> VestingCurves:
+    """Vesting inputs for every roster row (see VestingCurves)."""
+    n = len(df)
+    with trace.stage("vesting.curves", rows=n):
+        start_day = _days(df["start_date"]) if "start_date" in df.columns else np.full(n, -1, dtype=np.int64)
+        vest_day = _days(df["vesting_start_date"]) if "vesting_start_date" in df.columns else np.full(n, -1, dtype=np.int64)
+        vest_day = np.where(vest_day >= 0, vest_day, start_day)
+        start_month = np.where(vest_day >= 0, month_index(vest_day.astype("datetime64[D]")), -1)
+        grant = np.nan_to_num(values.parse_numbers(df["equity_raw"])[0]) if "equity_raw" in df.columns else np.zeros(n)
+        refresh = np.nan_to_num(values.parse_numbers(df["equity_refreshes"])[0]) if "equity_refreshes" in df.columns else np.zeros(n)
+        grant_curve, refresh_curve = schedule.curve()
+    return VestingCurves(schedule, start_month, start_day, grant, refresh, grant_curve, refresh_curve)
+
+
+def get_curves(df: pd.DataFrame, schedule: VestingSchedule = VestingSchedule()) -> VestingCurves:
+    """`build_curves`, cached per roster content and schedule."""
+    key = (df.attrs.get("fingerprint") or engine.roster_fingerprint(df), schedule)
+    with _cache_lock:
+        cached = _curve_cache.get(key)
+        if cached is not None:
+            _curve_cache.move_to_end(key)
+            return cached
+    curves = build_curves(df, schedule)
+    with _cache_lock:
+        _curve_cache[key] = curves
+        while len(_curve_cache) > _CURVE_CACHE_SIZE:
+            _curve_cache.popitem(last=False)
+    return curves
+
+
+def default_basis(df: pd.DataFrame) -> str:
+    """
+    The equity basis to score on unless one is chosen: "vested" when the roster maps vesting_start_date,
+    else "total". Vesting from start_date alone would leave recent hires with no equity at all.
+    """
+    dated = "vesting_start_date" in df.columns and df["vesting_start_date"].notna().any()
+    return "vested" if dated else "total"
+
+
+def equity_score(amount: np.ndarray, equity_format, total_shares_outstanding=None) -> np.ndarray:
+    """Equity amounts to the equity_pct feature, like engine.compute_equity_pct does for the raw grant."""
+    if equity_format == "shares" and total_shares_outstanding:
+        return amount / total_shares_outstanding * 100
+    if equity_format == "value":
+        largest = amount.max() if len(amount) else 0.0
+        return amount / largest * 100 if largest > 0 else np.zeros(len(amount))
+    return amount
+
+
+def features_as_of(base: engine.FeatureSet, curves: VestingCurves, as_of, equity_format=None, total_shares_outstanding=None, basis="vested") -> engine.FeatureSet:
+    """
+    The FeatureSet for `as_of`: `base` with tenure measured to that date and equity counted on `basis`
+    from the vesting curves. Cached per (base set, schedule, day, basis). When `base` was patched by a
+    roster refresh, the result carries the matching delta (see `_as_of_delta`).
+    """
+    day = pd.Timestamp(as_of).normalize()
+    key = (base.key, curves.schedule, day, basis)
+    with _cache_lock:
+        cached = _as_of_cache.get(key)
+        if cached is not None:
+            _as_of_cache.move_to_end(key)
+            return cached
+    with trace.stage("vesting.as_of", rows=len(base)):
+        tenure = curves.tenure_years(day)
+        equity = equity_score(curves.amount(day, basis), equity_format, total_shares_outstanding)
+        columns = base.columns.copy(deep=False)
+        columns["tenure_years"] = tenure
+        columns["equity_pct"] = equity
+        matrix = np.array(base.matrix)
+        raw_max = np.array(base.raw_max, dtype=float)
+        for name, column in (("tenure", tenure), ("equity", equity)):
+            c = engine.FEATURE_NAMES.index(name)
+            raw_max[c] = column.max() if len(column) else 0.0
+            matrix[:, c] = column / max(1.0, raw_max[c])
+        matrix.flags.writeable = False
+        delta = _as_of_delta(base, matrix, curves.schedule, day, basis) if base.delta is not None else None
+        features = engine.FeatureSet(key=key, columns=columns, matrix=matrix, comp=base.comp, org=base.org, raw_max=raw_max, delta=delta)
+    with _cache_lock:
+        _as_of_cache[key] = features
+        while len(_as_of_cache) > _AS_OF_CACHE_SIZE:
+            _as_of_cache.popitem(last=False)
+    return features
+
+
+def _as_of_delta(base: engine.FeatureSet, matrix: np.ndarray, schedule: VestingSchedule, day, basis):
+    """
+    `base.delta` for the as-of set: relative to the as-of set of the set `base` was patched from. Tenure and
+    equity rows that moved are added to the dirty rows when that set is still cached; otherwise both columns
+    count as rescaled, so rankings weighting them are sorted again.
+    """
+    delta = base.delta
+    base_key = (delta.base_key, schedule, day, basis)
+    with _cache_lock:
+        previous = _as_of_cache.get(base_key)
+    columns = [engine.FEATURE_NAMES.index("tenure"), engine.FEATURE_NAMES.index("equity")]
+    rescaled = set(delta.rescaled) - {"tenure", "equity"}
+    dirty = delta.dirty
+    if previous is None or len(previous) != len(delta.old_to_new):
+        rescaled |= {"tenure", "equity"}
+    else:
+        kept_old = np.flatnonzero(delta.old_to_new >= 0)
+        kept_new = delta.old_to_new[kept_old]
+        moved = (matrix[np.ix_(kept_new, columns)] != previous.matrix[np.ix_(kept_old, columns)]).any(axis=1)
+        dirty = np.union1d(dirty, kept_new[moved]).astype(np.int64)
+    return dataclasses.replace(delta, base_key=base_key, dirty=dirty, rescaled=frozenset(rescaled))
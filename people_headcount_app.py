@@ -1,8 +1,31 @@
+import os
+
 import streamlit as st
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
+from headcount import captable, compare, engine, export, forecast, incremental, pipeline, schema, store, table, trace, vesting
+from headcount.knapsack import greedy_within_budget, select_within_budget
+from headcount.selection import get_ranking
+
 CSV_PATH = Path(__file__).parent / "data_room/people/employee_roster.csv"
+# Quarterly hires and departures used to fit the forecast's attrition and hiring rates
+ATTRITION_PATH = Path(__file__).parent / "data_room/people/attrition_history.csv"
+# Share counts for converting equity in shares to ownership, and the base for dilution scenarios
+CAP_TABLE_PATH = Path(__file__).parent / "data_room/financials/cap_table.json"
+# Rosters shipped with the app that can be picked for a side-by-side comparison
+BUNDLED_ROSTERS = [
+    CSV_PATH,
+    Path(__file__).parent / "employee_roster_seed_startup.csv",
+    Path(__file__).parent / "employee_roster_seed_startup_refreshes.csv",
+    Path(__file__).parent / "employee_roster_series_e.csv",
+]
+# HEADCOUNT_TRACE=1 times every rerun without the debug panel; HEADCOUNT_TRACE_FILE appends the stage records
+# to a JSON-lines log (or rewrites a Prometheus textfile when it ends in .prom)
+TRACE_FILE = os.environ.get("HEADCOUNT_TRACE_FILE")
+# Seconds between checks of the default roster file for HRIS updates while a session is open (0 turns polling off)
+LIVE_POLL_SECONDS = float(os.environ.get("HEADCOUNT_LIVE_POLL_SECONDS", "5"))
 
 st.set_page_config(page_title="People Headcount Scenarios", layout="wide")
 
@@ -47,154 +70,136 @@ st.markdown('<div class="app-sub">Set a target headcount and prioritize hires by
 st.markdown('<div class="harvard-hr"></div>', unsafe_allow_html=True)
 
 
-def detect_equity_format(df: pd.DataFrame) -> dict:
+# Per-stage instrumentation for this rerun; a disabled tracer hands out a shared no-op for every stage
+tracer = trace.Tracer(
+    enabled=st.session_state.get("debug_trace", False) or bool(os.environ.get("HEADCOUNT_TRACE")) or bool(TRACE_FILE),
+    track_memory=st.session_state.get("debug_trace_memory", False),
+).start()
+
+
+# Sessions share parsed rosters and only get views of them; a column a session writes to is copied for it
+store.enable_copy_on_write()
+
+
+@st.cache_resource
+def roster_store() -> store.RosterStore:
+    """Uploaded rosters, parsed once per process and shared by every session (see headcount.store)."""
+    return store.RosterStore()
+
+
+def load_roster(csv_source) -> tuple[pd.DataFrame, dict]:
     """
-    Detect the equity column and its format (percentage vs shares).
-    Returns dict with keys: 'column_name', 'format' ('pct', 'shares', 'value', or None), 'raw_values'
+    Load roster CSV and detect equity format (see headcount.engine.load_roster).
+    Returns (DataFrame view, equity_info dict). Large files go through the chunked, column-pruned reader.
+    Results are also cached on disk across processes (see headcount.disk_cache).
     """
-    result = {"column_name": None, "format": None, "raw_values": None}
-    
-    # Priority order for equity column detection
-    equity_col_candidates = [
-        # Percentage columns (highest priority if named explicitly)
-        ("equity_pct", "pct"),
-        ("equity_percent", "pct"),
-        ("ownership_pct", "pct"),
-        ("ownership_percent", "pct"),
-        # Share columns
-        ("equity_shares", "shares"),
-        ("shares", "shares"),
-        ("stock_options", "shares"),
-        ("options", "shares"),
-        # Value columns (RSU grants, etc.)
-        ("rsu_grant_value", "value"),
-        ("equity_value", "value"),
-        ("grant_value", "value"),
-        # Generic equity column - need to infer format
-        ("equity", None),
-    ]
-    
-    cols_lower = {c.lower(): c for c in df.columns}
-    
-    for candidate, fmt in equity_col_candidates:
-        if candidate in cols_lower:
-            actual_col = cols_lower[candidate]
-            result["column_name"] = actual_col
-            
-            # Parse numeric values
-            raw_values = pd.to_numeric(df[actual_col], errors="coerce")
-            result["raw_values"] = raw_values
-            
-            if fmt is not None:
-                result["format"] = fmt
-            else:
-                # Infer format from values for generic "equity" column
-                max_val = raw_values.max()
-                if pd.isna(max_val):
-                    result["format"] = "pct"  # default to pct if no valid values
-                elif max_val <= 100:
-                    # Values are <= 100, likely percentages
-                    result["format"] = "pct"
-                else:
-                    # Values > 100, likely shares
-                    result["format"] = "shares"
-            return result
-    
-    return result
-
-
-@st.cache_data
-def load_roster(csv_source) -> tuple[pd.DataFrame, dict]:
+    size = csv_source.stat().st_size if isinstance(csv_source, Path) else getattr(csv_source, "size", 0)
+    load_kwargs = {"chunksize": engine.STREAM_CHUNK_ROWS} if size > engine.STREAM_THRESHOLD_BYTES else {}
+    return roster_store().get(csv_source, **load_kwargs)
+
+
+@st.cache_resource
+def live_roster(csv_path: Path) -> incremental.LiveRoster:
     """
-    Load roster CSV and detect equity format.
-    Returns (DataFrame, equity_info dict).
+    The default roster, shared by all sessions. Each rerun applies only the rows the HRIS changed since
+    the last check (see headcount.incremental), and the cached features are patched rather than rebuilt.
     """
-    # Read CSV; file contains a "Summary Statistics" section at the bottom, so coerce comp_usd and drop non-employee rows.
-    df = pd.read_csv(csv_source, dtype=str, keep_default_na=False)
-    
-    # Detect equity format BEFORE normalization (to preserve original column names)
-    equity_info = detect_equity_format(df)
-    
-    # Normalize columns
-    # map common alternative column names to expected schema
-    def normalize_columns(df: pd.DataFrame, equity_info: dict) -> pd.DataFrame:
-        mapping = {}
-        if "employee_name" in df.columns and "name" not in df.columns:
-            mapping["employee_name"] = "name"
-        if "title" in df.columns and "role" not in df.columns:
-            mapping["title"] = "role"
-        if "position" in df.columns and "role" not in df.columns:
-            mapping["position"] = "role"
-        if "dept" in df.columns and "department" not in df.columns:
-            mapping["dept"] = "department"
-        if "team" in df.columns and "department" not in df.columns:
-            mapping["team"] = "department"
-        if "manager" in df.columns and "reports_to" not in df.columns:
-            mapping["manager"] = "reports_to"
-        if "manager_id" in df.columns and "reports_to" not in df.columns:
-            mapping["manager_id"] = "reports_to"
-        if "salary" in df.columns and "comp_usd" not in df.columns:
-            mapping["salary"] = "comp_usd"
-        if "total_comp" in df.columns and "comp_usd" not in df.columns:
-            mapping["total_comp"] = "comp_usd"
-        # Map detected equity column to equity_raw (we'll convert later)
-        if equity_info["column_name"] is not None and equity_info["column_name"] != "equity_raw":
-            mapping[equity_info["column_name"]] = "equity_raw"
-        if "employee_id" not in df.columns:
-            # try common id column names
-            if "id" in df.columns:
-                mapping["id"] = "employee_id"
-        if mapping:
-            df = df.rename(columns=mapping)
-        return df
-
-    df = normalize_columns(df, equity_info)
-
-    if "comp_usd" not in df.columns:
-        raise RuntimeError("Expected column 'comp_usd' in roster CSV (found: {})".format(", ".join(df.columns)))
-    df["comp_usd"] = pd.to_numeric(df["comp_usd"], errors="coerce")
-    # Keep rows that have an employee_id and a numeric compensation
-    if "employee_id" in df.columns:
-        df = df[df["employee_id"].str.startswith("E", na=False)]
-    else:
-        # if no employee_id, keep any non-empty row and create an index-based id
-        df = df[df["comp_usd"].notna()]
-        df = df.reset_index(drop=True)
-        df["employee_id"] = ["U{:04d}".format(i + 1) for i in range(len(df))]
-    df = df.dropna(subset=["comp_usd"])
-    # Convert comp to integer
-    df["comp_usd"] = df["comp_usd"].astype(int)
-    return df, equity_info
+    return incremental.LiveRoster(csv_path)
 
 
+live = None
 try:
     # Allow user to upload an alternate roster CSV
     uploaded = st.sidebar.file_uploader("Upload employee roster CSV", type=["csv"])
-    source = uploaded if uploaded is not None else CSV_PATH
-    roster_df, equity_info = load_roster(source)
+    with tracer.stage("load") as load_stage:
+        if uploaded is None:
+            live = live_roster(CSV_PATH)
+            live.refresh()
+            roster_df, equity_info = store.shared_view(live.df), dict(live.equity_info)
+        else:
+            roster_df, equity_info = load_roster(uploaded)
+        load_stage.rows = len(roster_df)
 except Exception as exc:
     st.error(f"Could not load roster: {exc}")
     st.stop()
 
 total_employees = int(roster_df.shape[0])
 
+# Pick up HRIS rewrites of the default roster without waiting for a widget change
+if live is not None and LIVE_POLL_SECONDS > 0:
+    st.session_state["roster_version"] = live.version
+
+    @st.fragment(run_every=LIVE_POLL_SECONDS)
+    def follow_roster():
+        live.refresh()
+        if live.version != st.session_state.get("roster_version"):
+            st.rerun()
+
+    follow_roster()
+
 st.sidebar.header("Scenario inputs")
 
+# Values the loader could not parse (e.g. "TBD - hourly" salaries, unknown currencies) are listed, not silently dropped
+value_issues = equity_info.get("value_issues") or []
+if value_issues:
+    with st.sidebar.expander(f"Data issues ({sum(i['count'] for i in value_issues)} value(s) not parsed)", expanded=False):
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    {"column": i["column"], "problem": i["reason"], "rows": i["count"], "examples": ", ".join(f"{e['employee_id']}: {e['value']}" for e in i["examples"])}
+                    for i in value_issues
+                ]
+            ),
+            hide_index=True,
+            use_container_width=True,
+        )
+        st.caption("Rows without a usable compensation are left out of the scenario; other bad values count as missing.")
+
 # Handle equity format detection and conversion
 equity_format_detected = equity_info.get("format")
 equity_col_name = equity_info.get("column_name")
 total_shares_outstanding = None
+cap_table = None
+dilution_events = []
+dilution_factor = 1.0
 
 if equity_format_detected == "shares":
     st.sidebar.markdown("---")
     st.sidebar.markdown(f"**Equity detected as shares** (from `{equity_col_name}`)")
-    total_shares_outstanding = st.sidebar.number_input(
-        "Total shares outstanding",
-        min_value=1,
-        value=50_000_000,  # Default value; user should adjust
-        step=1_000_000,
-        help="Enter total shares outstanding to convert share counts to ownership percentages."
-    )
+    if CAP_TABLE_PATH.exists():
+        # Parsed once per cap-table version; every dilution derived from it is cached under that version too
+        cap_table = captable.load_cap_table(CAP_TABLE_PATH)
+    if cap_table is not None:
+        share_basis = st.sidebar.radio("Ownership measured against", ["Shares outstanding", "Fully diluted shares"], index=0)
+        total_shares_outstanding = cap_table.shares("fully_diluted" if share_basis == "Fully diluted shares" else "outstanding")
+        st.sidebar.markdown(
+            f"<span class='small-note'>{total_shares_outstanding:,} shares from the cap table as of {cap_table.as_of_date} ({cap_table.last_round})</span>",
+            unsafe_allow_html=True,
+        )
+        with st.sidebar.expander("Dilution scenario", expanded=False):
+            future_rounds = int(st.number_input("Future rounds", min_value=0, max_value=4, value=0, step=1, key="dilution_rounds"))
+            last_raise = float(cap_table.last_raise or 10_000_000)
+            last_post = float(cap_table.post_money_valuation or 100_000_000)
+            for i in range(future_rounds):
+                amount = st.number_input(f"Round {i + 1} raise (USD)", min_value=0, value=int(last_raise * 1.5 ** (i + 1)), step=1_000_000, key=f"dilution_raise_{i}")
+                pre_money = st.number_input(f"Round {i + 1} pre-money valuation (USD)", min_value=1, value=int(last_post * 2 ** (i + 1)), step=10_000_000, key=f"dilution_pre_{i}")
+                topup = st.number_input(f"Round {i + 1} option pool top-up (% of post)", min_value=0.0, max_value=30.0, value=0.0, step=0.5, key=f"dilution_pool_{i}")
+                dilution_events.append(captable.DilutionEvent.round(f"Round {i + 1}", amount, pre_money, topup / 100))
+            try:
+                dilution_factor = float(captable.retained(dilution_events)[-1])
+            except ValueError as exc:
+                st.error(str(exc))
+                dilution_events, dilution_factor = [], 1.0
+            if dilution_events:
+                st.markdown(f"<span class='small-note'>Existing holders keep {dilution_factor:.1%} of their ownership</span>", unsafe_allow_html=True)
+    else:
+        total_shares_outstanding = st.sidebar.number_input(
+            "Total shares outstanding",
+            min_value=1,
+            value=50_000_000,  # No cap table found; user should adjust
+            step=1_000_000,
+            help="Enter total shares outstanding to convert share counts to ownership percentages."
+        )
     st.sidebar.markdown(f"<span class='small-note'>Shares will be converted to % ownership</span>", unsafe_allow_html=True)
     st.sidebar.markdown("---")
 elif equity_format_detected == "value":
@@ -202,6 +207,9 @@ elif equity_format_detected == "value":
     st.sidebar.markdown(f"**Equity detected as grant value** (from `{equity_col_name}`)")
     st.sidebar.markdown("<span class='small-note'>Grant values will be used for relative comparison (not % ownership)</span>", unsafe_allow_html=True)
     st.sidebar.markdown("---")
+SELECT_TOP_N = "Top N by impact score"
+SELECT_BUDGET = "Max impact within a budget cap"
+selection_mode = st.sidebar.radio("Selection mode", [SELECT_TOP_N, SELECT_BUDGET], index=0)
 target_headcount = st.sidebar.slider(
     "Target headcount",
     min_value=0,
@@ -209,6 +217,15 @@ target_headcount = st.sidebar.slider(
     value=min(10, total_employees),
     step=1,
 )
+budget_cap = None
+if selection_mode == SELECT_BUDGET:
+    budget_cap = st.sidebar.number_input(
+        "Budget cap (total compensation, USD)",
+        min_value=0,
+        value=int(roster_df["comp_usd"].sum() // 10),
+        step=100_000,
+        help="Select the set of employees with the highest total impact score whose compensation fits this cap (the headcount slider is ignored).",
+    )
 
 st.sidebar.markdown("Prioritization: **Impact score** (configurable weights)")
 
@@ -218,119 +235,140 @@ tenure_weight = st.sidebar.slider("Tenure (years) weight", min_value=0.0, max_va
 level_weight = st.sidebar.slider("Seniority (level) weight", min_value=0.0, max_value=5.0, value=1.0, step=0.1)
 reports_weight = st.sidebar.slider("Direct reports weight", min_value=0.0, max_value=5.0, value=0.5, step=0.1)
 equity_weight = st.sidebar.slider("Equity % weight", min_value=0.0, max_value=5.0, value=0.2, step=0.1)
+# Vesting: equity and tenure are scored as of the chosen month, from curves precomputed once per roster
+vesting_curves = vesting.get_curves(roster_df)
+as_of_date = pd.Timestamp.now().normalize()
+equity_basis = vesting.default_basis(roster_df)
+if vesting_curves.has_dates:
+    this_month = as_of_date.to_period("M")
+    first_month = min(vesting_curves.earliest_start.to_period("M"), this_month)
+    months = pd.period_range(first_month, this_month + vesting_curves.schedule.duration_months, freq="M")
+    as_of_month = st.sidebar.select_slider(
+        "Equity and tenure as of",
+        options=list(months),
+        value=this_month,
+        format_func=lambda p: p.strftime("%b %Y"),
+        help="Moving this re-scores vested equity and tenure for the whole roster at that month.",
+    )
+    if as_of_month != this_month:
+        as_of_date = as_of_month.to_timestamp()
+    equity_basis = {"Vested": "vested", "Unvested": "unvested", "Total granted": "total"}[
+        st.sidebar.radio(
+            "Equity counted",
+            ["Vested", "Unvested", "Total granted"],
+            index=0 if equity_basis == "vested" else 2,
+            help="Defaults to vested only when the roster has a vesting start date; vesting from start dates alone would zero out recent hires.",
+        )
+    ]
+# Org-tree weights: everyone below an employee (not just direct reports), the payroll they manage, and how close they sit to the top
+span_weight = st.sidebar.slider("Transitive span of control weight", min_value=0.0, max_value=5.0, value=0.0, step=0.1)
+subtree_comp_weight = st.sidebar.slider("Managed payroll (org subtree) weight", min_value=0.0, max_value=5.0, value=0.0, step=0.1)
+depth_weight = st.sidebar.slider("Org depth (closer to the top) weight", min_value=0.0, max_value=5.0, value=0.0, step=0.1)
+# Monte Carlo forecast of the selected team (0 quarters turns it off)
+forecast_quarters = st.sidebar.slider("Forecast quarters ahead", min_value=0, max_value=12, value=4, step=1)
+forecast_hiring = st.sidebar.checkbox("Forecast hiring at the historical rate", value=True)
 # Column mapping UI: allow users to map uploaded CSV columns to expected fields
-with st.sidebar.expander("Column mapping (if uploader mis-detects)", expanded=False):
-    st.write("If any expected columns are missing you can map them here.")
-    expected = {
-        "employee_id": "Employee ID",
-        "name": "Name",
-        "role": "Title / Role",
-        "department": "Department",
-        "location": "Location",
-        "comp_usd": "Compensation (USD)",
-        "reports_to": "Reports To",
-        "start_date": "Start Date",
-        "level": "Level",
-    }
-    mapping_choices = {}
-    cols_list = list(roster_df.columns)
-    none_opt = "(none)"
-    for key, label in expected.items():
-        if key in roster_df.columns:
-            # show current mapping but allow change
-            default = key
-        else:
-            default = none_opt
-        opts = [none_opt] + cols_list
-        mapping_choices[key] = st.selectbox(f"Map {label}", opts, index=opts.index(default) if default in opts else 0, key=f"map_{key}")
-
-    # Apply mappings where user specified a column
-    for key, chosen in mapping_choices.items():
-        if chosen != none_opt:
-            # copy mapped column into expected name
-            roster_df[key] = roster_df[chosen]
-        else:
-            # ensure column exists (fill with empty values) to avoid later KeyErrors
-            if key not in roster_df.columns:
-                roster_df[key] = ""
+with tracer.stage("mapping", rows=total_employees):
+    with st.sidebar.expander("Column mapping (if uploader mis-detects)", expanded=False):
+        st.write("If any expected columns are missing you can map them here.")
+        expected = {
+            "employee_id": "Employee ID",
+            "name": "Name",
+            "role": "Title / Role",
+            "department": "Department",
+            "location": "Location",
+            "comp_usd": "Compensation (USD)",
+            "reports_to": "Reports To",
+            "start_date": "Start Date",
+            "level": "Level",
+            "vesting_start_date": "Vesting Start Date",
+            "equity_refreshes": "Refresh Grants",
+        }
+        # Choices are saved into the compiled read plan for this header (see headcount.schema), so this
+        # file and later exports with the same header load already mapped
+        header = equity_info.get("header") or list(roster_df.columns)
+        plan = schema.plan_for_header(header)
+        detected = schema.plan_for_header(header, {})
+        none_opt = "(none)"
+        opts = [none_opt] + list(header)
+        mapping = {}
+        for key, label in expected.items():
+            current = plan.source_of(key) or none_opt
+            chosen = st.selectbox(f"Map {label}", opts, index=opts.index(current) if current in opts else 0, key=f"map_{key}")
+            if chosen != (detected.source_of(key) or none_opt):
+                mapping[key] = None if chosen == none_opt else chosen
+        if mapping != plan.mapping:
+            schema.remember_mapping(header, mapping)
+            # Shared rosters read with the old plan are dropped; the next load of this file applies the new one
+            roster_store().clear()
+            if live is not None:
+                live.reload()
+            st.rerun()
 
 # end mapping UI
-def compute_tenure_years(start_date_series: pd.Series) -> pd.Series:
-    parsed = pd.to_datetime(start_date_series, errors="coerce")
-    now = pd.Timestamp.now()
-    years = (now - parsed).dt.days / 365.25
-    years = years.fillna(0.0).clip(lower=0.0)
-    return years
-
-def compute_direct_reports_count(df: pd.DataFrame) -> pd.Series:
-    if "reports_to" not in df.columns:
-        return pd.Series([0] * len(df))
-    reports = df["reports_to"].fillna("").astype(str)
-    counts = reports.value_counts()
-    return df["employee_id"].map(counts).fillna(0).astype(int)
-
-def map_level_to_score(level_series: pd.Series) -> pd.Series:
-    mapping = {
-        "C-Level": 5.0,
-        "VP": 4.0,
-        "Director": 3.0,
-        "Manager": 2.0,
-        "Staff": 3.0,
-        "Senior": 3.0,
-        "Mid": 1.5,
-        "Junior": 1.0,
-    }
-    return level_series.map(lambda v: mapping.get(v, 1.0)).astype(float)
-
-# (department/skill scoring removed per user request)
-
-# Compute additional features for scoring
-roster_df["tenure_years"] = compute_tenure_years(roster_df.get("start_date", pd.Series([""] * len(roster_df))))
-roster_df["direct_reports"] = compute_direct_reports_count(roster_df)
-roster_df["level_score"] = map_level_to_score(roster_df.get("level", pd.Series([""] * len(roster_df))))
-# equity: convert to percentage based on detected format
-if "equity_raw" in roster_df.columns:
-    equity_raw = pd.to_numeric(roster_df["equity_raw"], errors="coerce").fillna(0.0)
-    
-    if equity_format_detected == "shares" and total_shares_outstanding is not None and total_shares_outstanding > 0:
-        # Convert shares to percentage: (shares / total_shares_outstanding) * 100
-        roster_df["equity_pct"] = (equity_raw / total_shares_outstanding) * 100
-    elif equity_format_detected == "value":
-        # For grant values, normalize to a 0-100 scale for relative comparison
-        max_value = equity_raw.max()
-        if max_value > 0:
-            roster_df["equity_pct"] = (equity_raw / max_value) * 100
-        else:
-            roster_df["equity_pct"] = 0.0
+
+# Features only depend on the roster, the column mapping and the equity settings, so they are built once
+# and reused across reruns; moving a weight slider only re-runs the weighted sum and the top-N pick.
+with tracer.stage("features", rows=total_employees):
+    # The live roster patches its base features on refresh instead of rebuilding them
+    base_features = live.features(equity_format_detected, total_shares_outstanding) if live is not None else None
+    # As of the sidebar month, then diluted: dilution scales every holder alike, so only equity is rescaled
+    features = pipeline.roster_features(
+        roster_df, equity_info, total_shares_outstanding, as_of_date, equity_basis, dilution_factor, base=base_features
+    )
+weights = {
+    "comp": comp_weight,
+    "tenure": tenure_weight,
+    "level": level_weight,
+    "reports": reports_weight,
+    "equity": equity_weight,
+    "span": span_weight,
+    "subtree_comp": subtree_comp_weight,
+    "depth": depth_weight,
+}
+org = features.org
+if len(org.orphans) or len(org.cycle_members):
+    st.sidebar.markdown(
+        f"<span class='small-note'>Org tree: {len(org.orphans)} employee(s) report to an unknown manager and "
+        f"{len(org.cycle_members)} sit on a reporting cycle; they are treated as top-level.</span>",
+        unsafe_allow_html=True,
+    )
+# The ranking (and its cumulative cost / median index) is built once per weight vector, so moving the
+# headcount slider is a lookup rather than a re-sort.
+with tracer.stage("ranking", rows=total_employees):
+    ranking = get_ranking(features, weights)
+
+with tracer.stage("selection") as selection_stage:
+    budget_result = None
+    if budget_cap is not None:
+        # Knapsack: highest total impact with total compensation <= budget cap
+        budget_result = select_within_budget(ranking.scores, features.comp, budget_cap)
+        top_positions = budget_result["positions"]
+        greedy_positions = ranking.positions(greedy_within_budget(ranking, budget_cap))
+        greedy_score = float(ranking.scores[greedy_positions].sum())
     else:
-        # Already percentage or unknown format - use as-is
-        roster_df["equity_pct"] = equity_raw
-elif "equity_pct" in roster_df.columns:
-    roster_df["equity_pct"] = pd.to_numeric(roster_df["equity_pct"], errors="coerce").fillna(0.0)
+        # Select the top N by impact score (descending)
+        top_positions = ranking.positions(target_headcount)
+    selected = pd.concat(
+        [
+            roster_df.iloc[top_positions].drop(columns=list(features.columns.columns), errors="ignore"),
+            features.columns.iloc[top_positions],
+        ],
+        axis=1,
+    )
+    selected["impact_score"] = ranking.scores[top_positions]
+    selection_stage.rows = len(selected)
+
+if budget_result is not None:
+    selected_comp = features.comp[top_positions]
+    total_cost = int(selected_comp.sum())
+    average_cost = int(selected_comp.mean()) if len(selected_comp) else 0
+    median_cost = int(np.median(selected_comp)) if len(selected_comp) else 0
 else:
-    roster_df["equity_pct"] = 0.0
-# Compute additional features for scoring (department/skill omitted)
-# Normalize components to 0..1
-comp_norm = roster_df["comp_usd"] / max(1.0, roster_df["comp_usd"].max())
-tenure_norm = roster_df["tenure_years"] / max(1.0, roster_df["tenure_years"].max())
-level_norm = roster_df["level_score"] / max(1.0, roster_df["level_score"].max())
-reports_norm = roster_df["direct_reports"] / max(1.0, roster_df["direct_reports"].max())
-equity_norm = roster_df["equity_pct"] / max(1.0, roster_df["equity_pct"].max())
-# Compute final impact score (weighted sum)
-roster_df["impact_score"] = (
-    comp_weight * comp_norm
-    + tenure_weight * tenure_norm
-    + level_weight * level_norm
-    + reports_weight * reports_norm
-    + equity_weight * equity_norm
-)
-
-# Sort by impact score (descending) and select top N
-selected = roster_df.sort_values("impact_score", ascending=False).head(target_headcount)
-
-total_cost = int(selected["comp_usd"].sum()) if not selected.empty else 0
-average_cost = int(selected["comp_usd"].mean()) if not selected.empty else 0
-median_cost = int(selected["comp_usd"].median()) if not selected.empty else 0
+    cost_summary = ranking.summary(target_headcount)
+    total_cost = int(cost_summary["total"])
+    average_cost = int(cost_summary["average"])
+    median_cost = int(cost_summary["median"])
 
 def _fmt(x: int) -> str:
     return f"${x:,.0f}"
@@ -342,10 +380,73 @@ k1.markdown(card_template.format(label="Selected headcount", value=f"{selected.s
 k2.markdown(card_template.format(label="Total compensation", value=_fmt(total_cost)), unsafe_allow_html=True)
 k3.markdown(card_template.format(label="Average compensation", value=_fmt(average_cost) if selected.shape[0] else "$0"), unsafe_allow_html=True)
 k4.markdown(card_template.format(label="Median compensation", value=_fmt(median_cost) if selected.shape[0] else "$0"), unsafe_allow_html=True)
+if budget_result is not None:
+    # Compare against the greedy answer: take employees by impact score until the next one busts the budget
+    gain = budget_result["total_score"] - greedy_score
+    gain_pct = f" ({gain / greedy_score:+.1%})" if greedy_score > 0 else ""
+    g1, g2, g3 = st.columns([1, 1, 2])
+    g1.markdown(card_template.format(label="Total impact (budget-optimal)", value=f"{budget_result['total_score']:.2f}"), unsafe_allow_html=True)
+    g2.markdown(card_template.format(label="Total impact (greedy by score)", value=f"{greedy_score:.2f} / {len(greedy_positions)} people"), unsafe_allow_html=True)
+    g3.markdown(card_template.format(label="Gain vs. greedy", value=f"{gain:+.2f}{gain_pct}"), unsafe_allow_html=True)
+    if budget_result["optimal"]:
+        st.caption(f"Proven optimal selection within {_fmt(int(budget_cap))}.")
+    else:
+        st.caption(f"Best selection found within {_fmt(int(budget_cap))}; at most {budget_result['gap']:.3f} impact below the optimum.")
+
+
+
+@st.cache_resource
+def attrition_rates(path: Path) -> forecast.QuarterlyRates:
+    """Rates fitted from the attrition history (see headcount.forecast.fit_rates)."""
+    return forecast.fit_rates(forecast.load_attrition_history(path))
+
+
+@st.cache_data(max_entries=32)
+def forecast_bands(comp: np.ndarray, quarters: int, hire_scale: float) -> pd.DataFrame:
+    return forecast.forecast(comp, attrition_rates(ATTRITION_PATH), quarters=quarters, hire_scale=hire_scale)
+
+
+if forecast_quarters and len(top_positions) and ATTRITION_PATH.exists():
+    # Percentile bands over 100k simulated futures of the selected team
+    with tracer.stage("forecast", rows=len(top_positions)):
+        bands = forecast_bands(features.comp[top_positions], forecast_quarters, 1.0 if forecast_hiring else 0.0)
+    end = bands.iloc[-1]
+    f1, f2, f3 = st.columns([1, 1, 2])
+    f1.markdown(
+        card_template.format(
+            label=f"Headcount in {bands.index[-1]} (median, 5-95%)",
+            value=f"{end['headcount_p50']:.0f} ({end['headcount_p5']:.0f}-{end['headcount_p95']:.0f})",
+        ),
+        unsafe_allow_html=True,
+    )
+    f2.markdown(
+        card_template.format(
+            label=f"Payroll in {bands.index[-1]} (median, 5-95%)",
+            value=f"{_fmt(end['payroll_p50'])} ({_fmt(end['payroll_p5'])}-{_fmt(end['payroll_p95'])})",
+        ),
+        unsafe_allow_html=True,
+    )
+    with f3:
+        st.line_chart(bands[["payroll_p5", "payroll_p50", "payroll_p95"]])
 
 # Show equity format info if shares were converted
 if equity_format_detected == "shares" and total_shares_outstanding:
-    st.info(f"**Equity conversion:** Share counts from `{equity_col_name}` converted to ownership % using {total_shares_outstanding:,} total shares outstanding.")
+    source = f"the cap table ({cap_table.as_of_date})" if cap_table is not None else "the sidebar"
+    diluted = f", then diluted through {len(dilution_events)} future round(s) to {dilution_factor:.1%} of today's ownership" if dilution_events else ""
+    st.info(f"**Equity conversion:** Share counts from `{equity_col_name}` converted to ownership % using {total_shares_outstanding:,} shares from {source}{diluted}.")
+    if cap_table is not None:
+        with st.expander("Dilution sweep: next round size", expanded=False):
+            # Every round size is scored at once from one (employees x sizes) score matrix
+            sweep_pre_money = float(cap_table.post_money_valuation or 100_000_000) * 2
+            sweep_amounts = np.linspace(0, 3 * float(cap_table.last_raise or 10_000_000), 25)
+            with tracer.stage("dilution_sweep", rows=total_employees):
+                undiluted_features = pipeline.roster_features(roster_df, equity_info, total_shares_outstanding, as_of_date, equity_basis, base=base_features)
+                sweep = captable.sweep_round_sizes(undiluted_features, weights, target_headcount, sweep_amounts, sweep_pre_money, base_factor=dilution_factor)
+            st.line_chart(sweep["team_equity_pct"])
+            st.caption(
+                f"Ownership % of the top {target_headcount} after a next round of each size at a {_fmt(sweep_pre_money)} pre-money valuation "
+                f"(on top of the scenario above). Up to {int(sweep['selection_changes'].max())} of them change with the round size."
+            )
 elif equity_format_detected == "value":
     st.info(f"**Equity format:** Grant values from `{equity_col_name}` normalized to relative scores (0-100) for comparison.")
 
@@ -353,48 +454,134 @@ st.markdown("### Selected employees")
 if selected.empty:
     st.info("No employees selected for the current headcount.")
 else:
-    display_cols = ["employee_id", "name", "role", "department", "location", "comp_usd", "equity_pct", "impact_score"]
-    # reindex to avoid KeyError if some columns are missing; missing columns will be filled with empty strings
-    display_df = selected.reindex(columns=display_cols).fillna("").copy().reset_index(drop=True)
-    # Rename columns to readable English
-    display_df = display_df.rename(
-        columns={
-            "employee_id": "ID",
-            "name": "Name",
-            "role": "Title",
-            "department": "Department",
-            "location": "Location",
-            "comp_usd": "Compensation (USD)",
-            "equity_pct": "Equity %",
-            "impact_score": "Impact score",
-        }
-    )
-    # Show compensation as positive amounts (no negative signs)
-    display_df["Compensation (USD)"] = display_df["Compensation (USD)"].map(lambda x: _fmt(int(x)))
-    # Format impact score as a rounded float for display
-    display_df["Impact score"] = display_df["Impact score"].map(lambda x: f"{float(x):.3f}" if x not in (None, "") else "")
-    # Format equity based on detected format
-    if equity_format_detected == "value":
-        # For grant values, show as relative score (already normalized to 0-100)
-        display_df = display_df.rename(columns={"Equity %": "Equity Score"})
-        display_df["Equity Score"] = display_df["Equity Score"].map(lambda x: f"{float(x):.1f}" if x not in (None, "") and x != "" else "")
+    # Server-side filter, sort and paging: only the visible page is formatted and sent to the browser
+    sort_labels = {label: column for column, label in table.DISPLAY_COLUMNS.items()}
+    t1, t2, t3, t4 = st.columns([3, 2, 1, 1])
+    with t1:
+        filter_text = st.text_input("Filter (ID, name, title, department, location)", value="", key="table_filter")
+    with t2:
+        sort_label = st.selectbox("Sort by", list(sort_labels), index=list(sort_labels).index("Impact score"), key="table_sort")
+    with t3:
+        sort_descending = st.checkbox("Descending", value=True, key="table_desc")
+    with t4:
+        page_size = st.selectbox("Rows per page", list(table.PAGE_SIZES), index=1, key="table_page_size")
+    with tracer.stage("table.filter_sort", rows=len(selected)):
+        view = table.sort_rows(table.filter_rows(selected, filter_text), sort_labels[sort_label], ascending=not sort_descending)
+    n_pages = table.page_count(len(view), page_size)
+    page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1, key="table_page") if n_pages > 1 else 1
+    with tracer.stage("table.format") as format_stage:
+        display_df = table.format_page(table.page_slice(view, page, page_size), equity_format_detected)
+        format_stage.rows = len(display_df)
+    with tracer.stage("table.render", rows=len(display_df)):
+        st.dataframe(
+            display_df,
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "ID": st.column_config.TextColumn(width="small"),
+                "Compensation (USD)": st.column_config.TextColumn(width="small"),
+                "Impact score": st.column_config.TextColumn(width="small"),
+            },
+        )
+    first_row = (min(max(1, int(page)), n_pages) - 1) * page_size
+    st.caption(f"Showing {min(first_row + 1, len(view))}-{min(first_row + page_size, len(view))} of {len(view)} matching rows ({selected.shape[0]} selected)")
+
+def discard_prepared_export() -> None:
+    """Delete this session's prepared export file (after its download, or once the settings change)."""
+    prepared = st.session_state.pop("prepared_export", None)
+    if prepared is not None:
+        Path(prepared[1]).unlink(missing_ok=True)
+
+
+with st.expander("Export", expanded=False):
+    # Nothing is serialized until "Prepare download" is clicked; the file is then streamed chunk by chunk to a
+    # temporary file, so the session keeps a path rather than the whole export in memory
+    EXPORT_SCOPES = ["Selected employees", "Full scored roster", "Cost curve (every headcount)"]
+    e1, e2 = st.columns([2, 1])
+    with e1:
+        export_scope = st.selectbox("Rows to export", EXPORT_SCOPES, index=0, key="export_scope")
+    with e2:
+        export_format = st.selectbox("Format", list(export.EXPORT_FORMATS), index=0, key="export_format")
+    export_key = (features.key, tuple(weights.items()), budget_cap, target_headcount, export_scope, export_format)
+    prepared_export = st.session_state.get("prepared_export")
+    if prepared_export is not None and (prepared_export[0] != export_key or not Path(prepared_export[1]).exists()):
+        discard_prepared_export()
+    if st.button("Prepare download", key="export_prepare"):
+        discard_prepared_export()
+        with tracer.stage("export") as export_stage:
+            if export_scope == "Selected employees":
+                export_frame = selected.reindex(columns=list(table.DISPLAY_COLUMNS))
+            elif export_scope == "Full scored roster":
+                export_frame = export.scored_roster(roster_df, features, ranking.scores)
+            else:
+                export_frame = ranking.curve_frame().reset_index()
+            st.session_state["prepared_export"] = (export_key, export.write_temp_export(export_frame, export_format))
+            export_stage.rows = len(export_frame)
+    prepared_export = st.session_state.get("prepared_export")
+    if prepared_export is not None:
+        suffix, mime = export.EXPORT_FORMATS[export_format]
+        file_stem = {"Selected employees": "selected_employees", "Full scored roster": "scored_roster"}.get(export_scope, "cost_curve")
+        with open(prepared_export[1], "rb") as export_file:
+            st.download_button(
+                f"Download {export_scope.lower()}", export_file, file_name=file_stem + suffix, mime=mime, on_click=discard_prepared_export
+            )
+    st.caption("Weight-grid sweeps are exported from the command line: `python -m headcount sweep ROSTER.csv --out sweep.parquet`.")
+
+with st.expander("Cost vs. headcount curve", expanded=False):
+    # Every headcount's total/average/median comes from the same ranking index, so the curve is free.
+    with tracer.stage("curve", rows=total_employees):
+        st.line_chart(ranking.curve_frame())
+
+with st.expander("Compare rosters", expanded=False):
+    # Every roster is loaded and featurized on its own worker, then scored under the sidebar weights
+    bundled = {path.name: path for path in BUNDLED_ROSTERS if path.exists()}
+    compare_names = st.multiselect("Bundled rosters", list(bundled), default=[], key="compare_bundled")
+    compare_uploads = st.file_uploader("Add roster CSVs", type=["csv"], accept_multiple_files=True, key="compare_uploads") or []
+    compare_sources = [bundled[name] for name in compare_names] + list(compare_uploads)
+    if len(compare_sources) < 2:
+        st.caption("Pick or upload two or more rosters to compare their top-N selections.")
     else:
-        # For shares (converted) or native percentages, show as percentage
-        display_df["Equity %"] = display_df["Equity %"].map(lambda x: f"{float(x):.4f}%" if x not in (None, "") and x != "" else "")
-    # nicer table
-    st.markdown('<div class="data-table">', unsafe_allow_html=True)
-    st.table(display_df)
-    st.markdown("</div>", unsafe_allow_html=True)
-    st.download_button(
-        "Download selected as CSV",
-        selected[display_cols].to_csv(index=False).encode("utf-8"),
-        file_name="selected_employees.csv",
-        mime="text/csv",
-    )
-
-# (Graph removed — selection table and KPIs provide the required information)
+        with tracer.stage("compare", rows=len(compare_sources)):
+            # A roster with equity in shares uses the sidebar's share count, or the cap table's when the main
+            # roster has none (its equity is a percentage or a value)
+            scenarios = compare.compare_rosters(
+                compare_sources,
+                weights,
+                target_headcount,
+                total_shares_outstanding,
+                as_of=as_of_date,
+                equity_basis=equity_basis,
+                cap_table=CAP_TABLE_PATH if CAP_TABLE_PATH.exists() else None,
+            )
+            kpis = compare.kpi_table(scenarios)
+            overlap = compare.overlap_table(scenarios)
+        for column in ("payroll", "total", "average", "median"):
+            kpis[column] = table.format_usd(kpis[column])
+        st.dataframe(kpis, hide_index=True, use_container_width=True)
+        overlap["jaccard"] = overlap["jaccard"].map("{:.0%}".format)
+        st.dataframe(overlap, hide_index=True, use_container_width=True)
+        st.caption(f"Top {target_headcount} by impact score in each roster; overlap is by employee ID.")
 
 st.markdown("---")
 source_label = uploaded.name if uploaded is not None else str(CSV_PATH)
 st.caption(f"Roster source: `{source_label}` — total employees in roster: {total_employees}")
 
+
+# Debug panel: the widgets' session-state keys switch tracing on for the *next* rerun, which is then timed end to end
+with st.sidebar.expander("Debug: stage timings", expanded=False):
+    st.checkbox("Record stage timings", value=False, key="debug_trace")
+    st.checkbox("Track peak memory (slower)", value=False, key="debug_trace_memory")
+    tracer.stop()
+    if tracer.enabled:
+        trace_rows = pd.DataFrame(tracer.as_rows())
+        if not trace_rows.empty:
+            trace_rows["stage"] = ["  " * depth + name for depth, name in zip(trace_rows["depth"], trace_rows["name"])]
+            trace_rows["ms"] = (trace_rows["seconds"] * 1000).round(2)
+            trace_rows["peak MB"] = (trace_rows["peak_bytes"].astype(float) / 2**20).round(2)
+            st.dataframe(trace_rows[["stage", "ms", "rows", "peak MB"]], hide_index=True, use_container_width=True)
+            st.caption(f"Rerun `{tracer.run_id}`: {tracer.total_seconds() * 1000:.1f} ms in timed stages.")
+if tracer.enabled and TRACE_FILE:
+    try:
+        tracer.export(TRACE_FILE)
+    except OSError as exc:
+        st.sidebar.markdown(f"<span class='small-note'>Could not write stage trace: {exc}</span>", unsafe_allow_html=True)
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Make the `headcount` package importable no matter where pytest is launched from.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+# Keep the on-disk roster cache out of the user's home directory during tests.
+os.environ.setdefault("HEADCOUNT_CACHE_DIR", tempfile.mkdtemp(prefix="headcount-cache-"))
@@ -0,0 +1,47 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from headcount import batch
+from headcount.__main__ import main
+
+REPO = Path(__file__).resolve().parents[1]
+ROSTER = REPO / "data_room/people/employee_roster.csv"
+
+
+def test_select_roster_ranks_like_the_engine():
+    selected = batch.select_roster(ROSTER, headcount=5, weights=batch.parse_weights("tenure=2,equity=0"), cache=False)
+    assert len(selected) == 5 and list(selected["rank"]) == [1, 2, 3, 4, 5]
+    assert selected["impact_score"].is_monotonic_decreasing
+    within = batch.select_roster(ROSTER, budget=1_000_000)
+    assert within["comp_usd"].sum() <= 1_000_000 and within["impact_score"].is_monotonic_decreasing
+    with pytest.raises(ValueError):
+        batch.parse_weights("charisma=3")
+
+
+def test_select_command_writes_csv(tmp_path):
+    out = tmp_path / "top.csv"
+    assert main(["select", str(ROSTER), "--headcount", "3", "--weights", "comp=2", "--out", str(out)]) == 0
+    written = pd.read_csv(out)
+    expected = batch.select_roster(ROSTER, headcount=3, weights=batch.parse_weights("comp=2"))
+    assert list(written["employee_id"]) == list(expected["employee_id"])
+
+
+def test_package_import_is_light():
+    code = (
+        "import sys, headcount, headcount.__main__ as cli; cli.build_parser().parse_args(['select', 'x.csv']);"
+        "assert 'pandas' not in sys.modules and 'streamlit' not in sys.modules;"
+        "headcount.load_roster; assert 'pandas' in sys.modules and 'streamlit' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=REPO, check=True)
+
+
+def test_select_roster_takes_shares_from_the_cap_table():
+    seed = REPO / "employee_roster_seed_startup.csv"
+    cap_table = REPO / "data_room/financials/cap_table.json"
+    from_table = batch.select_roster(seed, headcount=5, cap_table=cap_table, share_basis="fully_diluted")
+    by_hand = batch.select_roster(seed, headcount=5, total_shares_outstanding=55_000_000)
+    pd.testing.assert_frame_equal(from_table, by_hand)
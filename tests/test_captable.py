@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from headcount import captable, engine
+from headcount.selection import get_ranking
+
+REPO = Path(__file__).resolve().parents[1]
+CAP_TABLE = REPO / "data_room/financials/cap_table.json"
+
+
+def _roster(n=40, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "employee_id": ["E{:03d}".format(i) for i in range(n)],
+            "comp_usd": rng.integers(80_000, 300_000, n),
+            "equity_raw": rng.integers(0, 2_000_000, n).astype(float),
+            "reports_to": [""] * n,
+        }
+    )
+
+
+def test_cap_table_share_counts_and_version():
+    table = captable.load_cap_table(CAP_TABLE)
+    assert table.shares() == 50_000_000 and table.shares("fully_diluted") == 55_000_000
+    assert table.option_pool_shares == 5_000_000 and table.last_round == "Series B"
+    assert captable.load_cap_table(CAP_TABLE) is table
+    derived = captable.parse_cap_table({"holders": [{"shares": 900, "share_class": "Common"}, {"shares": 100, "share_class": "Options"}]})
+    assert (derived.total_shares_outstanding, derived.fully_diluted_shares) == (900, 1000)
+    with pytest.raises(ValueError):
+        table.shares("authorized")
+
+
+def test_ownership_across_rounds_is_one_outer_product():
+    events = [captable.DilutionEvent.round("C", 100, 300), captable.DilutionEvent("pool", pool_topup_pct=0.1)]
+    assert captable.retained(events) == pytest.approx([1.0, 0.75, 0.675])
+    table = captable.ownership([1_000, 2_000], 10_000, events)
+    assert table.shape == (2, 3)
+    assert table[:, 2] == pytest.approx([6.75, 13.5])
+    with pytest.raises(ValueError):
+        captable.retained([captable.DilutionEvent("all", new_money_pct=0.9, pool_topup_pct=0.1)])
+
+
+def test_diluted_features_match_a_rebuild_with_more_shares():
+    df = _roster()
+    base = engine.get_features(df, "shares", 1_000_000)
+    diluted = captable.features_diluted(base, 0.8)
+    rebuilt = engine.get_features(df, "shares", 1_250_000)
+    np.testing.assert_allclose(diluted.matrix, rebuilt.matrix)
+    assert captable.features_diluted(base, 0.8) is diluted and captable.features_diluted(base, 1.0) is base
+    scores = captable.diluted_scores(base, engine.DEFAULT_WEIGHTS, [1.0, 0.8])
+    np.testing.assert_allclose(scores[:, 1], get_ranking(rebuilt, engine.DEFAULT_WEIGHTS).scores)
+
+
+def test_round_size_sweep_scores_every_size_at_once():
+    df = _roster(200, seed=3)
+    base = engine.get_features(df, "shares", 50_000_000)
+    amounts = [0, 50e6, 200e6]
+    sweep = captable.sweep_round_sizes(base, engine.DEFAULT_WEIGHTS, 20, amounts, 400e6)
+    assert list(sweep.index) == amounts and sweep["retained"].is_monotonic_decreasing
+    assert sweep["selection_changes"].iloc[0] == 0
+    for amount, row in sweep.iterrows():
+        features = engine.get_features(df, "shares", 50_000_000 / row["retained"])
+        top = get_ranking(features, engine.DEFAULT_WEIGHTS).positions(20)
+        assert row["team_equity_pct"] == pytest.approx(features.columns["equity_pct"].to_numpy()[top].sum())
+
+
+def test_round_size_sweep_breaks_ties_in_roster_order():
+    df = _roster(300, seed=5)
+    # Three salary bands and a comp-only score: most of the cut-off is ties, and equity differs within them
+    df["comp_usd"] = np.random.default_rng(5).choice([100_000, 150_000, 200_000], len(df))
+    base = engine.get_features(df, "shares", 50_000_000)
+    weights = {"comp": 1.0}
+    sweep = captable.sweep_round_sizes(base, weights, 45, [0, 80e6], 400e6)
+    top = engine.select_top(engine.score(base, weights), 45)
+    equity = base.columns["equity_pct"].to_numpy()
+    np.testing.assert_allclose(sweep["team_equity_pct"], equity[top].sum() * sweep["retained"])
+    assert (sweep["selection_changes"] == 0).all()
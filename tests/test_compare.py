@@ -0,0 +1,69 @@
+import io
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from headcount import compare, engine, pipeline
+
+ROOT = Path(__file__).resolve().parents[1]
+SEED = ROOT / "employee_roster_seed_startup.csv"
+REFRESHES = ROOT / "employee_roster_seed_startup_refreshes.csv"
+SERIES_E = ROOT / "employee_roster_series_e.csv"
+DATED = ROOT / "data_room/people/employee_roster.csv"
+CAP_TABLE = ROOT / "data_room/financials/cap_table.json"
+
+
+def test_rosters_load_concurrently_in_input_order():
+    upload = io.BytesIO(SEED.read_bytes())
+    upload.name = SEED.name
+    rosters = compare.load_rosters([SERIES_E, SEED, upload], workers=3)
+    assert list(rosters) == [SERIES_E.name, SEED.name, SEED.name + " (2)"]
+    df, info, features = rosters[SERIES_E.name]
+    expected, expected_info = engine.load_roster(SERIES_E)
+    assert info["format"] == expected_info["format"]
+    assert df["employee_id"].tolist() == expected["employee_id"].tolist()
+    assert len(features) == len(df)
+
+
+def test_rosters_are_scored_as_of_a_date_like_the_app():
+    as_of = pd.Timestamp("2023-06-01")
+    df, info, features = compare.load_rosters([DATED], as_of=as_of, equity_basis="total")[DATED.name]
+    assert features is pipeline.roster_features(df, info, as_of=as_of, equity_basis="total")
+    today = engine.get_features(df, info["format"])
+    assert (features.columns["tenure_years"] < today.columns["tenure_years"]).any()
+
+
+def test_share_counts_come_from_the_cap_table_for_rosters_in_shares():
+    rosters = compare.load_rosters([DATED, SEED], cap_table=CAP_TABLE, share_basis="fully_diluted")
+    df, info, features = rosters[SEED.name]
+    assert info["format"] == "shares"
+    expected = engine.get_features(df, "shares", 55_000_000)
+    np.testing.assert_allclose(features.columns["equity_pct"], expected.columns["equity_pct"])
+    assert features.columns["equity_pct"].max() > 0
+    df, info, features = rosters[DATED.name]
+    assert info["format"] == "pct"
+    np.testing.assert_allclose(features.columns["equity_pct"], compare.load_rosters([DATED])[DATED.name][2].columns["equity_pct"])
+
+
+def test_selections_are_compared_by_employee_id():
+    scenarios = compare.compare_rosters([SEED, REFRESHES, SEED], engine.DEFAULT_WEIGHTS, 5, workers=2)
+    for scenario in scenarios:
+        ranking = scenario.ranking
+        assert scenario.headcount == 5
+        assert list(scenario.selected_ids) == scenario.df["employee_id"].astype(str).to_numpy()[ranking.positions(5)].tolist()
+
+    kpis = compare.kpi_table(scenarios)
+    assert kpis["selected"].tolist() == [5, 5, 5]
+    assert kpis.loc[0, "total"] == kpis.loc[2, "total"]
+
+    overlap = compare.overlap_table(scenarios).set_index(["roster_a", "roster_b"])
+    same = overlap.loc[(SEED.name, SEED.name + " (2)")]
+    assert same["selected_in_both"] == 5 and same["jaccard"] == 1.0
+    pair = overlap.loc[(SEED.name, REFRESHES.name)]
+    both = np.intersect1d(scenarios[0].selected_ids, scenarios[1].selected_ids)
+    assert pair["selected_in_both"] == len(both)
+    assert pair["selected_only_a"] == 5 - len(both) and pair["selected_only_b"] == 5 - len(both)
+
+    matrix = compare.selection_matrix(scenarios)
+    assert matrix.sum().tolist() == [5, 5, 5]
@@ -19,6 +19,16 @@ def make_streamlit_stub():
     stub.caption = lambda *a, **k: None
     stub.download_button = lambda *a, **k: None
     stub.error = lambda *a, **k: None
+    stub.line_chart = lambda *a, **k: None
+    stub.dataframe = lambda *a, **k: None
+    stub.text_input = lambda *a, **k: k.get("value", "")
+    stub.checkbox = lambda *a, **k: k.get("value", False)
+    stub.number_input = lambda *a, **k: k.get("value", 0)
+    stub.column_config = types.SimpleNamespace(TextColumn=lambda *a, **k: None)
+    stub.button = lambda *a, **k: False
+    stub.multiselect = lambda *a, **k: k.get("default", [])
+    stub.file_uploader = lambda *a, **k: None
+    stub.session_state = {}
     # Provide a no-op cache_data decorator compatible with usage as @st.cache_data
     def cache_data(func=None, **kwargs):
         if func is None:
@@ -29,11 +39,20 @@ def make_streamlit_stub():
             return func
 
     stub.cache_data = cache_data
+    stub.cache_resource = cache_data
+    # @st.fragment(run_every=...) runs the function once, like a plain call
+    stub.fragment = lambda *a, **k: (lambda f: f)
 
     class _Col:
         def markdown(self, *a, **k):
             return None
 
+        def __enter__(self):
+            return self
+
+        def __exit__(self, exc_type, exc, tb):
+            return False
+
     def columns(spec):
         # return as many column-like objects as requested
         n = len(spec) if hasattr(spec, "__len__") else 1
@@ -52,12 +71,17 @@ def make_streamlit_stub():
 
         return _Ctx()
 
+    stub.expander = _expander
+
     sidebar = types.SimpleNamespace()
     sidebar.file_uploader = lambda *a, **k: None
     sidebar.number_input = lambda *a, **k: k.get("value", 50_000_000)
     sidebar.markdown = lambda *a, **k: None
     sidebar.header = lambda *a, **k: None
     sidebar.slider = lambda *a, **k: k.get("value", 1)
+    sidebar.radio = lambda label, options, index=0, **k: options[index]
+    sidebar.select_slider = lambda *a, **k: k.get("value")
+    sidebar.checkbox = lambda *a, **k: k.get("value", False)
     sidebar.expander = _expander
     stub.sidebar = sidebar
 
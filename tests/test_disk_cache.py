@@ -0,0 +1,62 @@
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from headcount import disk_cache
+from headcount.engine import get_features, load_roster
+
+pytest.importorskip("pyarrow")
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_second_load_is_served_from_disk(tmp_path, monkeypatch):
+    source = tmp_path / "roster.csv"
+    shutil.copy(ROOT / "employee_roster_seed_startup.csv", source)
+    first, info = disk_cache.load_roster_cached(source, cache_dir=tmp_path / "cache")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("roster was parsed again")
+
+    monkeypatch.setattr(disk_cache, "load_roster", fail)
+    second, cached_info = disk_cache.load_roster_cached(source, cache_dir=tmp_path / "cache")
+    assert second["employee_id"].tolist() == first["employee_id"].tolist()
+    assert second["comp_usd"].tolist() == first["comp_usd"].tolist()
+    assert second.attrs["fingerprint"] == first.attrs["fingerprint"]
+    assert cached_info["format"] == info["format"] == "shares"
+
+
+def test_changed_bytes_miss_and_lru_eviction(tmp_path):
+    cache_dir = tmp_path / "cache"
+    keys = []
+    for name in ["employee_roster_seed_startup.csv", "employee_roster_series_e.csv"]:
+        disk_cache.load_roster_cached(ROOT / name, cache_dir=cache_dir)
+        keys.append(disk_cache.cache_key(ROOT / name))
+    assert keys[0] != keys[1]
+    assert {e["key"] for e in disk_cache.list_entries(cache_dir)} == set(keys)
+
+    newest = disk_cache.list_entries(cache_dir)[0]
+    disk_cache.evict(cache_dir, max_bytes=newest["bytes"])
+    assert [e["key"] for e in disk_cache.list_entries(cache_dir)] == [newest["key"]]
+    assert disk_cache.invalidate(cache_dir=cache_dir) == 1
+    assert disk_cache.list_entries(cache_dir) == []
+
+
+def test_fresh_load_and_cache_hit_share_features(tmp_path):
+    # Series E drops a "TBD - hourly" salary row; both paths must still line up with the shared FeatureSet
+    source = tmp_path / "series_e.csv"
+    shutil.copy(ROOT / "employee_roster_series_e.csv", source)
+    disk_cache.load_roster_cached(source, cache_dir=tmp_path / "cache")
+    cached, info = disk_cache.load_roster_cached(source, cache_dir=tmp_path / "cache")
+    fresh, _ = load_roster(source)
+    assert cached.attrs["fingerprint"] == fresh.attrs["fingerprint"]
+    features = get_features(cached, info["format"])
+    assert get_features(fresh, info["format"]) is features
+    for df in (fresh, cached):
+        assert df.index.equals(features.columns.index)
+        positions = np.arange(len(df))[::-7]
+        selected = pd.concat([df.iloc[positions], features.columns.iloc[positions]], axis=1)
+        assert len(selected) == len(positions) and selected["employee_id"].notna().all()
@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from headcount import engine
+
+ROSTER = Path(__file__).resolve().parents[1] / "data_room/people/employee_roster.csv"
+
+
+def test_features_are_cached_per_roster_and_equity_settings():
+    df, equity_info = engine.load_roster(ROSTER)
+    engine.clear_feature_cache()
+    first = engine.get_features(df, equity_info["format"])
+    assert engine.get_features(df, equity_info["format"]) is first
+    # Different equity settings produce a different feature set
+    assert engine.get_features(df, "shares", 1_000_000) is not first
+
+
+def test_score_is_weighted_sum_of_normalized_features():
+    df, equity_info = engine.load_roster(ROSTER)
+    features = engine.build_features(df, equity_info["format"])
+    scores = engine.score(features, {"comp": 2.0, "level": 1.0})
+
+    comp_norm = df["comp_usd"] / max(1.0, df["comp_usd"].max())
+    level = features.columns["level_score"]
+    expected = 2.0 * comp_norm + level / max(1.0, level.max())
+    np.testing.assert_allclose(scores, expected.to_numpy())
+
+
+def test_select_top_returns_best_first():
+    scores = np.array([0.1, 0.9, 0.5, 0.9])
+    assert engine.select_top(scores, 3).tolist() == [1, 3, 2]
+    assert engine.select_top(scores, 10).tolist() == [1, 3, 2, 0]
+
+
+def test_streaming_load_matches_eager_load():
+    root = Path(__file__).resolve().parents[1]
+    for csv_path in [ROSTER, root / "employee_roster_series_e.csv"]:
+        eager, eager_info = engine.load_roster(csv_path)
+        streamed, streamed_info = engine.load_roster(csv_path, chunksize=7)
+        assert streamed_info["format"] == eager_info["format"]
+        assert streamed["employee_id"].tolist() == eager["employee_id"].tolist()
+        assert streamed["comp_usd"].tolist() == eager["comp_usd"].tolist()
+        assert set(streamed.columns) <= set(engine.ROSTER_COLUMNS)
+        assert isinstance(streamed["role"].dtype, pd.CategoricalDtype)
+
+
+def test_pyarrow_streaming_skips_short_trailer_rows():
+    pytest.importorskip("pyarrow")
+    eager, _ = engine.load_roster(ROSTER)
+    streamed, _ = engine.load_roster(ROSTER, csv_engine="pyarrow")
+    assert streamed["employee_id"].tolist() == eager["employee_id"].tolist()
@@ -0,0 +1,50 @@
+import gzip
+import io
+
+import pandas as pd
+import pytest
+
+from headcount import export
+
+
+def _frame(n=1234):
+    return pd.DataFrame({"employee_id": [f"E{i:05d}" for i in range(n)], "comp_usd": range(n)})
+
+
+def test_csv_chunks_concatenate_to_a_single_csv():
+    df = _frame()
+    chunks = list(export.iter_csv(df, chunk_rows=100))
+    assert len(chunks) == 13
+    assert b"".join(chunks).decode("utf-8") == df.to_csv(index=False)
+
+
+def test_gzip_csv_round_trips():
+    df = _frame()
+    data = export.export_bytes(df, "csv.gz")
+    assert gzip.decompress(data).decode("utf-8") == df.to_csv(index=False)
+
+
+def test_parquet_row_groups_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    df = _frame()
+    path = tmp_path / "out.parquet"
+    export.write_export(df, path)
+    pd.testing.assert_frame_equal(pd.read_parquet(path), df)
+    assert pd.read_parquet(io.BytesIO(export.export_bytes(df.head(0), "parquet"))).empty
+
+
+def test_temp_export_is_streamed_to_a_file():
+    df = _frame()
+    path = export.write_temp_export(df, "csv.gz")
+    try:
+        assert path.name.endswith(".csv.gz")
+        assert gzip.decompress(path.read_bytes()).decode("utf-8") == df.to_csv(index=False)
+    finally:
+        path.unlink()
+
+
+def test_format_for_path():
+    assert export.format_for_path("a.CSV.gz") == "csv.gz"
+    assert export.format_for_path("a.csv") == "csv"
+    with pytest.raises(ValueError):
+        export.format_for_path("a.xlsx")
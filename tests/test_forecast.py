@@ -0,0 +1,43 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from headcount import forecast
+
+HISTORY = Path(__file__).resolve().parents[1] / "data_room/people/attrition_history.csv"
+
+
+def test_rates_are_pooled_over_the_recent_window():
+    history = forecast.load_attrition_history(HISTORY)
+    assert history["period"].iloc[0] == "2022-Q1" and history["period"].iloc[-1] == "2026-Q1"
+    recent = history.tail(4)
+    rates = forecast.fit_rates(history, window=4)
+    departures = (recent["voluntary_departures"] + recent["involuntary_departures"]).sum()
+    assert rates.departure_probability == pytest.approx((departures + 1) / (recent["headcount_start"].sum() + 2))
+    assert rates.hires_per_head == pytest.approx((recent["hires"].sum() + 1) / recent["headcount_start"].sum())
+    assert forecast.next_periods(rates.last_period, 3) == ["2026-Q2", "2026-Q3", "2026-Q4"]
+
+
+def test_attrition_only_forecast_never_grows():
+    rates = forecast.fit_rates(forecast.load_attrition_history(HISTORY))
+    comp = np.array([100_000.0, 150_000.0, 200_000.0, 250_000.0] * 10)
+    headcount, payroll = forecast.simulate(comp, rates, quarters=6, trials=20_000, hire_scale=0.0)
+    assert headcount.shape == payroll.shape == (20_000, 7)
+    assert (np.diff(headcount, axis=1) <= 0).all()
+    assert (payroll <= comp.sum() + 1).all() and (payroll >= 0).all()
+    assert (payroll[headcount == 0] == 0).all()
+
+
+def test_bands_are_ordered_and_independent_of_workers(monkeypatch):
+    monkeypatch.setattr(forecast, "SHARD_TRIALS", 5_000)
+    rates = forecast.fit_rates(forecast.load_attrition_history(HISTORY))
+    comp = np.linspace(80_000, 300_000, 25)
+    bands = forecast.forecast(comp, rates, quarters=4, trials=12_000, seed=7)
+    assert list(bands.index) == ["now", "2026-Q2", "2026-Q3", "2026-Q4", "2027-Q1"]
+    assert bands.loc["now", "payroll_p5"] == bands.loc["now", "payroll_p95"] == pytest.approx(comp.sum())
+    for kind in ("headcount", "payroll"):
+        values = bands[[f"{kind}_p{p}" for p in forecast.PERCENTILES]].to_numpy()
+        assert (np.diff(values, axis=1) >= 0).all()
+    pooled = forecast.forecast(comp, rates, quarters=4, trials=12_000, seed=7, workers=2)
+    np.testing.assert_array_equal(bands.to_numpy(), pooled.to_numpy())
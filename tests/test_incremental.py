@@ -0,0 +1,141 @@
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from headcount import captable, engine, incremental, vesting
+from headcount.selection import RankedSelection, get_ranking
+
+ROSTER = Path(__file__).resolve().parents[1] / "data_room/people/employee_roster.csv"
+
+
+def _live_copy(tmp_path: Path) -> tuple:
+    path = tmp_path / "roster.csv"
+    shutil.copy(ROSTER, path)
+    return path, incremental.LiveRoster(path)
+
+
+def _edit(path: Path) -> None:
+    """Raise one salary, drop the last employee and add a new hire under the first one."""
+    header, *lines = path.read_text().rstrip("\n").split("\n")
+    columns = header.split(",")
+    comp, reports_to = columns.index("comp_usd"), columns.index("reports_to")
+    fields = lines[3].split(",")
+    fields[comp] = str(int(fields[comp]) + 40_000)
+    lines[3] = ",".join(fields)
+    # The export ends with summary rows; the last employee is the last line with an E-id
+    last = max(i for i, line in enumerate(lines) if line[:1] == "E" and line[1:2].isdigit())
+    hire = lines.pop(last).split(",")
+    hire[0], hire[reports_to] = "E9999", lines[0].split(",")[0]
+    lines.insert(1, ",".join(hire))
+    path.write_text("\n".join([header, *lines]) + "\n")
+
+
+def _by_id(df: pd.DataFrame, matrix: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame(matrix, index=df["employee_id"].to_numpy()).sort_index()
+
+
+def test_refresh_matches_a_full_rebuild(tmp_path):
+    path, live = _live_copy(tmp_path)
+    before = live.features(live.equity_info["format"])
+    rows_before = len(live.df)
+    _edit(path)
+    delta = live.refresh(force=True)
+    assert delta is not None
+    assert list(delta.inserted) == ["E9999"] and len(delta.updated) == 1 and len(delta.deleted) == 1
+
+    features = live.features(live.equity_info["format"])
+    assert features is not before and features.delta is not None
+    full_df, info = engine.load_roster(path)
+    full = engine.build_features(full_df, info["format"])
+    pd.testing.assert_frame_equal(_by_id(live.df, features.matrix), _by_id(full_df, full.matrix))
+    # The earlier FeatureSet is left as it was
+    assert len(before) == rows_before and not before.matrix.flags.writeable
+
+
+def test_patched_ranking_matches_a_fresh_sort(tmp_path):
+    path, live = _live_copy(tmp_path)
+    weights = engine.DEFAULT_WEIGHTS
+    get_ranking(live.features(live.equity_info["format"]), weights)
+    _edit(path)
+    live.refresh(force=True)
+    features = live.features(live.equity_info["format"])
+    ranking = get_ranking(features, weights)
+    assert (ranking.order == RankedSelection(engine.score(features, weights), features.comp).order).all()
+
+
+def test_refresh_with_small_chunks_finds_every_changed_line(tmp_path, monkeypatch):
+    # About one line in four starts a chunk, so the edits land in different chunks
+    monkeypatch.setattr(incremental, "CHUNK_BITS", 2)
+    path, live = _live_copy(tmp_path)
+    assert len(live._cuts) > 10
+    _edit(path)
+    delta = live.refresh(force=True)
+    assert list(delta.inserted) == ["E9999"] and len(delta.updated) == 1 and len(delta.deleted) == 1
+    full_df, _ = engine.load_roster(path)
+    patched = live.df.sort_values("employee_id", ignore_index=True)
+    full = full_df.sort_values("employee_id", ignore_index=True)
+    pd.testing.assert_frame_equal(patched, full, check_dtype=False, check_categorical=False)
+
+
+def test_as_of_features_keep_the_refresh_delta(tmp_path):
+    path, live = _live_copy(tmp_path)
+    as_of, weights = pd.Timestamp("2024-03-01"), engine.DEFAULT_WEIGHTS
+    equity_format = live.equity_info["format"]
+    before = vesting.features_as_of(live.features(equity_format), vesting.get_curves(live.df), as_of, equity_format)
+    get_ranking(before, weights)
+    _edit(path)
+    live.refresh(force=True)
+    features = vesting.features_as_of(live.features(equity_format), vesting.get_curves(live.df), as_of, equity_format)
+    assert features.delta is not None and features.delta.base_key == before.key
+    # The same as-of date gives unchanged rows the same tenure, so only the edited rows are re-placed
+    assert not features.delta.rescaled & {"tenure", "equity"}
+    ranking = get_ranking(features, weights)
+    assert (ranking.order == RankedSelection(engine.score(features, weights), features.comp).order).all()
+
+
+def test_diluted_features_keep_the_refresh_delta(tmp_path):
+    path, live = _live_copy(tmp_path)
+    weights = engine.DEFAULT_WEIGHTS
+    before = captable.features_diluted(live.features(live.equity_info["format"]), 0.8)
+    get_ranking(before, weights)
+    _edit(path)
+    live.refresh(force=True)
+    features = captable.features_diluted(live.features(live.equity_info["format"]), 0.8)
+    assert features.delta is not None and features.delta.base_key == before.key
+    ranking = get_ranking(features, weights)
+    assert (ranking.order == RankedSelection(engine.score(features, weights), features.comp).order).all()
+
+
+def test_unchanged_file_and_changed_header(tmp_path):
+    path, live = _live_copy(tmp_path)
+    version = live.version
+    assert live.refresh(force=True) is None and live.version == version
+    text = path.read_text()
+    path.write_text(text.replace("comp_usd", "salary", 1))
+    # A new header cannot be diffed line by line, so the roster is reloaded in full
+    assert live.refresh(force=True) is None
+    assert live.version == version + 1 and "comp_usd" in live.df.columns
+
+
+def test_patched_ranking_keeps_ties_in_roster_order():
+    # Few distinct scores, random deletes, updates and appended inserts, as LiveRoster produces them
+    for seed in range(40):
+        rng = np.random.default_rng(seed)
+        n = 200
+        scores = rng.integers(0, 5, n).astype(float)
+        ranking = RankedSelection(scores, rng.integers(1, 10, n))
+        keep = rng.random(n) > 0.1
+        old_to_new = np.where(keep, np.cumsum(keep) - 1, -1)
+        kept, inserted = int(keep.sum()), int(rng.integers(0, 10))
+        new_scores = np.concatenate([scores[keep], rng.integers(0, 5, inserted).astype(float)])
+        updated = rng.choice(kept, 10, replace=False)
+        new_scores[updated] = rng.integers(0, 5, 10)
+        # One surviving row off by the last bit, as a re-run matrix product can leave it
+        nudged = int(rng.integers(0, kept))
+        new_scores[nudged] = np.nextafter(new_scores[nudged], np.inf)
+        dirty = np.unique(np.concatenate([updated, np.arange(kept, kept + inserted)]))
+        delta = incremental.FeatureDelta(base_key=(), old_to_new=old_to_new, dirty=dirty, rescaled=frozenset())
+        patched = ranking.updated(new_scores, np.ones(len(new_scores)), delta)
+        assert (patched.order == np.argsort(-new_scores, kind="stable")).all(), seed
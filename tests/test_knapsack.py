@@ -0,0 +1,48 @@
+import numpy as np
+
+from headcount.knapsack import greedy_within_budget, select_within_budget
+from headcount.selection import RankedSelection
+
+
+def _exact(scores, comp, budget):
+    # Dynamic program over integer compensation, fine for tiny instances
+    best = np.zeros(int(budget) + 1)
+    for s, c in zip(scores, comp):
+        c = int(c)
+        if c <= budget:
+            best[c:] = np.maximum(best[c:], best[: len(best) - c] + s)
+    return best[int(budget)]
+
+
+def test_budget_selection_is_optimal_on_small_instances():
+    rng = np.random.default_rng(3)
+    for _ in range(200):
+        n = int(rng.integers(1, 20))
+        scores = np.round(rng.random(n) * 3, 2)
+        comp = rng.integers(1, 30, n).astype(float)
+        budget = int(rng.integers(0, comp.sum() + 1))
+        result = select_within_budget(scores, comp, budget)
+        assert result["total_cost"] <= budget
+        assert result["optimal"]
+        assert abs(result["total_score"] - _exact(scores, comp, budget)) < 1e-9
+
+
+def test_budget_selection_beats_greedy_prefix():
+    scores = np.array([10.0, 6.0, 6.0])
+    comp = np.array([100.0, 50.0, 50.0])
+    ranking = RankedSelection(scores, comp)
+    # Greedy by score takes the 10-point employee and stops; the optimum takes the two 6-point ones
+    assert greedy_within_budget(ranking, 100) == 1
+    result = select_within_budget(scores, comp, 100)
+    assert sorted(result["positions"].tolist()) == [1, 2]
+    assert result["total_score"] == 12.0
+
+
+def test_large_roster_stays_within_bounds():
+    rng = np.random.default_rng(0)
+    scores = rng.random(20_000)
+    comp = rng.integers(50, 300, 20_000) * 1000.0
+    result = select_within_budget(scores, comp, 50_000_000)
+    assert result["total_cost"] <= 50_000_000
+    assert result["total_score"] <= result["upper_bound"]
+    assert result["gap"] == result["upper_bound"] - result["total_score"]
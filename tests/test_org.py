@@ -0,0 +1,27 @@
+import numpy as np
+
+from headcount.org import build_org_index
+
+
+def test_transitive_span_depth_and_subtree_comp():
+    ids = ["E1", "E2", "E3", "E4", "E5"]
+    reports_to = ["Board", "E1", "E2", "E2", "E1"]
+    org = build_org_index(ids, reports_to, [100, 50, 10, 10, 20])
+    # A VP with one direct report who manages two people outranks a peer with none
+    assert org.transitive_reports.tolist() == [4, 2, 0, 0, 0]
+    assert org.depth.tolist() == [0, 1, 2, 2, 1]
+    assert org.subtree_comp.tolist() == [190, 70, 10, 10, 20]
+    assert org.children_of(1).tolist() == [2, 3]
+    assert org.roots.tolist() == [0]
+
+
+def test_orphans_cycles_and_board_roots():
+    ids = ["E1", "E2", "E3", "E4", "E5", "E6"]
+    reports_to = ["BOARD", "Board of Directors", "E99", "E5", "E4", "E4"]
+    org = build_org_index(ids, reports_to)
+    assert org.orphans.tolist() == [2]
+    assert org.cycle_members.tolist() == [3, 4]
+    # Cycle members become roots; their other reports still roll up
+    assert org.parent[[3, 4]].tolist() == [-1, -1]
+    assert org.subtree_size[3] == 2  # E4 plus E6
+    assert np.all(org.depth[[0, 1, 2]] == 0)
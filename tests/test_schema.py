@@ -0,0 +1,68 @@
+import io
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from headcount import disk_cache, engine, schema
+
+ROOT = Path(__file__).resolve().parents[1]
+SERIES_E = ROOT / "employee_roster_series_e.csv"
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema, "SCHEMA_FILE", tmp_path / "schemas.json")
+    monkeypatch.setattr(schema, "_mappings", None)
+    monkeypatch.setattr(schema, "_plans", type(schema._plans)())
+    return tmp_path / "schemas.json"
+
+
+def _header(path: Path) -> list:
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def test_plan_reads_only_roster_columns(registry):
+    plan = schema.plan_for_header(_header(SERIES_E))
+    assert plan is schema.plan_for_header(_header(SERIES_E))
+    assert "email" not in plan.usecols and "performance_rating" not in plan.usecols
+    assert plan.rename["id"] == "employee_id" and plan.rename["salary"] == "comp_usd"
+    assert (plan.equity_column, plan.equity_format) == ("rsu_grant_value", "value")
+    assert set(plan.categories) == {"role", "department", "level", "currency"}
+
+
+def test_load_uses_compact_dtypes(registry):
+    df, info = engine.load_roster(SERIES_E)
+    assert set(df.columns) <= set(engine.ROSTER_COLUMNS)
+    assert isinstance(df["department"].dtype, pd.CategoricalDtype)
+    assert df["comp_usd"].dtype == np.int32
+    assert info["format"] == "value" and info["schema"] == schema.header_signature(_header(SERIES_E))
+
+
+def test_generic_equity_format_still_follows_the_values(registry):
+    header = "employee_id,comp_usd,equity\n"
+    pct, pct_info = engine.load_roster(io.StringIO(header + "E1,100000,1.5\nE2,90000,0.5\n"))
+    shares, shares_info = engine.load_roster(io.StringIO(header + "E1,100000,15000\nE2,90000,500\n"))
+    assert (pct_info["format"], shares_info["format"]) == ("pct", "shares")
+
+
+def test_remembered_mapping_applies_to_later_loads(registry):
+    header = _header(SERIES_E)
+    before, _ = engine.load_roster(SERIES_E)
+    assert "start_date" not in before.columns and "location" not in before.columns
+    key_before = disk_cache.cache_key(SERIES_E)
+
+    plan = schema.remember_mapping(header, {"start_date": "hire_date", "location": "office_location", "level": None})
+    assert plan.source_of("start_date") == "hire_date" and plan.source_of("level") is None
+    assert registry.exists()
+    assert disk_cache.cache_key(SERIES_E) != key_before
+
+    # A fresh process reads the mapping back from disk
+    schema._mappings = None
+    mapped, _ = engine.load_roster(SERIES_E)
+    assert pd.api.types.is_datetime64_any_dtype(mapped["start_date"])
+    assert isinstance(mapped["location"].dtype, pd.CategoricalDtype)
+    assert "level" not in mapped.columns
+    streamed, _ = engine.load_roster(SERIES_E, chunksize=7)
+    assert streamed["start_date"].tolist() == mapped["start_date"].tolist()
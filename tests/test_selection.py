@@ -0,0 +1,28 @@
+import numpy as np
+
+from headcount.selection import RankedSelection
+
+
+def test_summary_matches_sorting_for_every_headcount():
+    rng = np.random.default_rng(7)
+    scores = rng.integers(0, 10, 101).astype(float)  # plenty of ties
+    comp = rng.integers(50, 300, 101) * 1000
+    ranking = RankedSelection(scores, comp)
+    medians = ranking.median_curve()
+
+    order = np.argsort(-scores, kind="stable")
+    for n in range(len(scores) + 1):
+        top = comp[order[:n]]
+        summary = ranking.summary(n)
+        assert summary["total"] == top.sum()
+        assert summary["median"] == (np.median(top) if n else 0)
+        assert medians[n] == summary["median"]
+        assert ranking.positions(n).tolist() == order[:n].tolist()
+
+
+def test_curve_frame_covers_all_headcounts():
+    ranking = RankedSelection(np.array([0.2, 0.9, 0.5]), np.array([100, 300, 200]))
+    curve = ranking.curve_frame()
+    assert curve["total"].tolist() == [0, 300, 500, 600]
+    assert curve["median"].tolist() == [0, 300, 250, 200]
+    assert ranking.summary(99)["headcount"] == 3
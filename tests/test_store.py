@@ -0,0 +1,62 @@
+import io
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from headcount import store
+
+ROOT = Path(__file__).resolve().parents[1]
+ROSTER = ROOT / "data_room/people/employee_roster.csv"
+
+
+def _upload(path: Path) -> io.BytesIO:
+    upload = io.BytesIO(path.read_bytes())
+    upload.name = path.name
+    return upload
+
+
+def test_sessions_share_one_parsed_roster():
+    rosters = store.RosterStore()
+    first, info = rosters.get(_upload(ROSTER))
+    second, _ = rosters.get(_upload(ROSTER))
+    assert len(rosters) == 1
+    assert first is not second
+    assert np.shares_memory(first["comp_usd"].to_numpy(), second["comp_usd"].to_numpy())
+    assert first.attrs["fingerprint"] == second.attrs["fingerprint"]
+    info["format"] = "changed"
+    assert rosters.get(_upload(ROSTER))[1]["format"] != "changed"
+
+
+def test_writes_to_a_view_stay_in_that_view():
+    rosters = store.RosterStore()
+    view, _ = rosters.get(ROSTER)
+    comp = view["comp_usd"].to_numpy().copy()
+    view["comp_usd"] = 0
+    view.loc[view.index[0], "name"] = "Someone Else"
+    view["impact_score"] = 1.0
+    fresh, _ = rosters.get(ROSTER)
+    np.testing.assert_array_equal(fresh["comp_usd"].to_numpy(), comp)
+    assert fresh["name"].iloc[0] != "Someone Else" and "impact_score" not in fresh.columns
+
+
+def test_least_recently_used_roster_is_dropped():
+    rosters = store.RosterStore(max_rosters=2)
+    for name in ("employee_roster_seed_startup.csv", "employee_roster_series_e.csv", "employee_roster_seed_startup_refreshes.csv"):
+        rosters.get(ROOT / name)
+    assert len(rosters) == 2
+
+
+def test_failed_load_releases_its_lock(monkeypatch):
+    rosters = store.RosterStore()
+
+    def broken(*args, **kwargs):
+        raise ValueError("unreadable roster")
+
+    monkeypatch.setattr(store.disk_cache, "load_roster_cached", broken)
+    with pytest.raises(ValueError):
+        rosters.get(_upload(ROSTER))
+    assert rosters._loading == {}
+    monkeypatch.undo()
+    view, _ = rosters.get(_upload(ROSTER))
+    assert len(view) and len(rosters) == 1
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import numpy as np
+
+from headcount import engine, sweep
+from headcount.selection import RankedSelection
+
+ROSTER = Path(__file__).resolve().parents[1] / "data_room/people/employee_roster.csv"
+
+
+def test_weight_grid_varies_only_requested_features():
+    grid = sweep.weight_grid(step=0.5, max_weight=1.0, features=("comp", "tenure"), fixed={"level": 2.0})
+    assert grid.shape == (9, len(engine.FEATURE_NAMES))
+    assert set(grid[:, engine.FEATURE_NAMES.index("level")]) == {2.0}
+    assert set(grid[:, engine.FEATURE_NAMES.index("comp")]) == {0.0, 0.5, 1.0}
+
+
+def test_sweep_matches_single_scenario_selection():
+    df, equity_info = engine.load_roster(ROSTER)
+    features = engine.build_features(df, equity_info["format"])
+    weights = sweep.weight_grid(step=1.0, max_weight=1.0)
+    ids = df["employee_id"].to_numpy()
+    result = sweep.run_sweep(features, weights, [0, 3, 10, len(df)], employee_ids=ids)
+    assert len(result) == len(weights) * 4
+
+    for row in result.iloc[::7].itertuples():
+        w = {name: getattr(row, name) for name in engine.FEATURE_NAMES}
+        ranking = RankedSelection(engine.score(features, w), features.comp)
+        expected = ranking.summary(row.headcount)
+        assert row.total == expected["total"]
+        assert row.median == expected["median"]
+        assert row.selected_ids.split() == list(ids[ranking.positions(row.headcount)])
+
+
+def test_sweep_chunks_give_the_same_table():
+    df, equity_info = engine.load_roster(ROSTER)
+    features = engine.build_features(df, equity_info["format"])
+    weights = sweep.weight_grid(step=1.0, max_weight=2.0, features=("comp", "level", "equity"))
+    whole = sweep.run_sweep(features, weights, [5, 20])
+    chunked = sweep.run_sweep(features, weights, [5, 20], chunk_scenarios=4)
+    np.testing.assert_allclose(whole[["total", "median"]].to_numpy(), chunked[["total", "median"]].to_numpy())
+
+
+def test_sweep_breaks_ties_in_roster_order():
+    # Level and direct reports only: many employees tie at the headcount cut-off
+    df, equity_info = engine.load_roster(ROSTER)
+    features = engine.build_features(df, equity_info["format"])
+    weights = [{"level": 1.0, "reports": 0.5}, {"level": 1.0}, {"reports": 1.0}]
+    ids = df["employee_id"].to_numpy()
+    result = sweep.run_sweep(features, weights, [7, 20, 33], employee_ids=ids)
+    for row in result.itertuples():
+        ranking = RankedSelection(engine.score(features, weights[row.scenario]), features.comp)
+        expected = ranking.summary(row.headcount)
+        assert (row.total, row.median) == (expected["total"], expected["median"])
+        assert row.selected_ids.split() == list(ids[ranking.positions(row.headcount)])
@@ -0,0 +1,29 @@
+import pytest
+
+from benchmarks import run_benchmarks, synthetic
+from headcount import engine
+
+EXPECTED_FORMATS = {"data_room": "pct", "seed_startup": "shares", "seed_refreshes": "shares", "series_e": "value"}
+
+
+@pytest.mark.parametrize("schema", synthetic.SCHEMAS)
+def test_synthetic_roster_loads_with_expected_equity_format(tmp_path, schema):
+    path = tmp_path / "roster.csv"
+    synthetic.write_roster(path, schema, 250, seed=1, chunk_rows=100)
+    df, equity_info = engine.load_roster(path)
+    assert equity_info["format"] == EXPECTED_FORMATS[schema]
+    # Trailer rows are dropped; only the odd "TBD" salary can remove an employee
+    assert 240 <= len(df) <= 250
+    assert df["employee_id"].is_unique
+    streamed, _ = engine.load_roster(path, chunksize=64)
+    assert len(streamed) == len(df)
+
+
+def test_threshold_check_flags_slow_stages():
+    results = [
+        {"schema": "data_room", "rows": 1000, "us_per_row": {"load": 50.0}},
+        {"schema": "data_room", "rows": 100000, "us_per_row": {"load": 50.0, "score": 0.01}},
+    ]
+    thresholds = {"min_rows": 10000, "us_per_row": {"load": 40.0, "score": 0.1}}
+    regressions = run_benchmarks.check_thresholds(results, thresholds)
+    assert [(r["rows"], r["stage"]) for r in regressions] == [(100000, "load")]
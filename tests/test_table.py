@@ -0,0 +1,37 @@
+import pandas as pd
+
+from headcount import table
+
+
+def _selected():
+    return pd.DataFrame(
+        {
+            "employee_id": ["E1", "E2", "E3"],
+            "name": ["Ana Diaz", "Bo Li", "Cy Ng"],
+            "role": ["VP Sales", "Engineer", "Sales Rep"],
+            "comp_usd": [1234567, 95000, 80000],
+            "equity_pct": [0.5, 0.0125, 0.0],
+            "impact_score": [2.5, 1.25, 0.5],
+        }
+    )
+
+
+def test_format_page_formats_only_given_rows():
+    page = table.format_page(table.page_slice(_selected(), 1, 2))
+    assert page["Compensation (USD)"].tolist() == ["$1,234,567", "$95,000"]
+    assert page["Impact score"].tolist() == ["2.500", "1.250"]
+    assert page["Equity %"].tolist() == ["0.5000%", "0.0125%"]
+    assert page["Department"].tolist() == ["", ""]
+
+
+def test_grant_values_show_as_equity_score():
+    page = table.format_page(_selected(), equity_format="value")
+    assert page["Equity Score"].tolist() == ["0.5", "0.0", "0.0"]
+
+
+def test_filter_sort_and_paging():
+    df = _selected()
+    assert table.filter_rows(df, "sales")["employee_id"].tolist() == ["E1", "E3"]
+    assert table.sort_rows(df, "comp_usd", ascending=True)["employee_id"].tolist() == ["E3", "E2", "E1"]
+    assert table.page_count(3, 2) == 2
+    assert table.page_slice(df, 9, 2)["employee_id"].tolist() == ["E3"]
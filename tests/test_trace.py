@@ -0,0 +1,62 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+from headcount import engine, trace
+
+ROSTER = Path(__file__).resolve().parents[1] / "data_room/people/employee_roster.csv"
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = trace.Tracer(enabled=False).start()
+    try:
+        with tracer.stage("outer") as stage:
+            stage.rows = 5
+            with trace.stage("inner"):
+                pass
+    finally:
+        tracer.stop()
+    assert tracer.records == []
+    assert trace.stage("unattached") is trace.stage("other")
+
+
+def test_nested_stages_keep_start_order_and_memory_peaks(tmp_path):
+    with trace.Tracer(track_memory=True) as tracer:
+        with tracer.stage("outer", rows=3):
+            with trace.stage("inner") as inner:
+                block = np.ones(1_000_000)
+                inner.rows = len(block)
+                del block
+    assert trace.active_tracer() is None
+    names = [(r.name, r.depth, r.rows) for r in tracer.finished()]
+    assert names == [("outer", 0, 3), ("inner", 1, 1_000_000)]
+    outer, inner = tracer.finished()
+    assert inner.peak_bytes >= 8_000_000
+    assert outer.peak_bytes >= inner.peak_bytes
+
+    log = tmp_path / "trace.jsonl"
+    tracer.export(log)
+    tracer.export(log)
+    lines = [json.loads(line) for line in log.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["outer", "inner", "outer", "inner"]
+    assert lines[0]["run_id"] == tracer.run_id
+
+    prom = tmp_path / "headcount.prom"
+    tracer.export(prom)
+    text = prom.read_text()
+    assert 'headcount_stage_rows{job="headcount",stage="inner"} 1000000' in text
+    assert "# TYPE headcount_stage_peak_bytes gauge" in text
+
+
+def test_engine_reports_feature_substages():
+    df, equity_info = engine.load_roster(ROSTER)
+    with trace.Tracer() as tracer:
+        engine.build_features(df, equity_info["format"])
+    assert [r.name for r in tracer.finished()] == [
+        "features.tenure",
+        "features.reports",
+        "features.level",
+        "features.equity",
+        "features.org",
+    ]
@@ -0,0 +1,57 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from headcount import engine, values
+
+SERIES_E = Path(__file__).resolve().parents[1] / "employee_roster_series_e.csv"
+
+
+def test_parse_numbers_strips_symbols_and_flags_text():
+    parsed, bad = values.parse_numbers(pd.Series(["$280,000", "~175000", "19.0%", "1.2M", "TBD - hourly", ""]))
+    np.testing.assert_allclose(parsed[:4], [280_000, 175_000, 19.0, 1_200_000])
+    assert np.isnan(parsed[4:]).all()
+    # Blank cells are missing, not bad
+    assert bad.tolist() == [False, False, False, False, True, False]
+
+
+def test_parse_dates_detects_formats_per_distinct_string():
+    parsed, bad = values.parse_dates(pd.Series(["2022-01-15", "25/03/2021", "01/02/2021", "Jan 5, 2020", "soon", "2022-01-15"]))
+    # 25/03 only fits day-first, so the day-first layout wins for the ambiguous 01/02 too
+    assert [str(d)[:10] for d in parsed[:4]] == ["2022-01-15", "2021-03-25", "2021-02-01", "2020-01-05"]
+    assert parsed[5] == parsed[0]
+    assert bad.tolist() == [False, False, False, False, True, False]
+
+
+def test_to_usd_uses_rate_table_and_flags_unknown_currencies():
+    usd, bad = values.to_usd(np.array([100.0, 100.0, 100.0, 100.0]), pd.Series(["USD", "eur", "", "XYZ"]))
+    np.testing.assert_allclose(usd[:3], [100.0, 100.0 * values.FX_TO_USD["EUR"], 100.0])
+    assert bad.tolist() == [False, False, False, True]
+
+
+def test_load_roster_converts_currencies_and_reports_bad_values():
+    for kwargs in ({}, {"chunksize": 7}):
+        df, info = engine.load_roster(SERIES_E, **kwargs)
+        by_id = df.set_index("employee_id")["comp_usd"]
+        assert by_id["E0009"] == round(195_000 * values.FX_TO_USD["EUR"])
+        assert by_id["E0016"] == round(18_500_000 * values.FX_TO_USD["JPY"])
+        assert "E0048" not in by_id.index
+        assert info["value_issues"] == [
+            {"column": "comp_usd", "reason": "not a number", "count": 1, "examples": [{"employee_id": "E0048", "value": "TBD - hourly"}]}
+        ]
+
+
+def test_grant_values_are_converted_like_salaries():
+    weights = {**engine.DEFAULT_WEIGHTS, "equity": 3.0}
+    for kwargs in ({}, {"chunksize": 7}):
+        df, info = engine.load_roster(SERIES_E, **kwargs)
+        assert info["format"] == "value"
+        by_id = df.set_index("employee_id")["equity_raw"]
+        # A 12M JPY grant is about $80k, far below the CEO's $2.5M grant
+        assert by_id["E0016"] == 12_000_000 * values.FX_TO_USD["JPY"] and by_id["E0001"] == 2_500_000
+        features = engine.build_features(df, info["format"])
+        equity = pd.Series(features.columns["equity_pct"].to_numpy(), index=df["employee_id"])
+        assert equity["E0001"] == 100.0 and equity["E0016"] < 5
+        ranked = df["employee_id"].to_numpy()[engine.select_top(engine.score(features, weights), len(df))].tolist()
+        assert ranked.index("E0016") > ranked.index("E0001")
@@ -0,0 +1,65 @@
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from headcount import engine, pipeline, vesting
+
+ROSTER = """employee_id,name,start_date,vesting_start_date,comp_usd,equity_shares,equity_refreshes,reports_to
+E1,Ann,2022-01-15,,200000,48000,0,
+E2,Bo,2022-01-15,2023-01-01,150000,4800,4800,E1
+E3,Cy,,,100000,1000,0,E1
+"""
+
+
+def test_schedule_vests_at_the_cliff_then_monthly():
+    grant, refresh = vesting.VestingSchedule(cliff_months=12, duration_months=48, refresh_delay_months=12).curve()
+    assert grant[11] == 0 and grant[12] == pytest.approx(0.25) and grant[13] == pytest.approx(13 / 48)
+    assert grant[-1] == 1.0
+    assert refresh[12] == 0 and refresh[13] == pytest.approx(1 / 48) and refresh[-1] == 1.0
+    quarterly, _ = vesting.VestingSchedule(cliff_months=0, frequency_months=3).curve()
+    assert quarterly[2] == 0 and quarterly[3] == quarterly[5] == pytest.approx(3 / 48)
+
+
+def test_vested_amounts_follow_the_as_of_date():
+    df, equity_info = engine.load_roster(StringIO(ROSTER))
+    curves = vesting.build_curves(df)
+    # E2's grant starts vesting on its own date; E3 has no date and counts as fully vested
+    assert list(curves.vested("2022-06-01")) == [0.0, 0.0, 1000.0]
+    assert curves.vested("2023-01-20") == pytest.approx([12_000.0, 0.0, 1000.0])
+    assert curves.vested("2024-02-01") == pytest.approx([25_000.0, 1400.0, 1000.0])
+    assert curves.amount("2024-02-01", "unvested") == pytest.approx([23_000.0, 8200.0, 0.0])
+    assert curves.vested("2031-01-01") == pytest.approx(curves.amount("2031-01-01", "total"))
+    with pytest.raises(ValueError):
+        curves.amount("2024-02-01", "granted")
+    assert curves.tenure_years("2024-01-15")[0] == pytest.approx(730 / 365.25)
+
+
+def test_as_of_features_only_change_tenure_and_equity():
+    df, equity_info = engine.load_roster(StringIO(ROSTER))
+    base = engine.get_features(df, equity_info["format"], 1_000_000)
+    curves = vesting.get_curves(df)
+    today = vesting.features_as_of(base, curves, pd.Timestamp.now(), equity_info["format"], 1_000_000, "total")
+    np.testing.assert_allclose(today.columns["tenure_years"], base.columns["tenure_years"])
+    # Counting every grant adds E2's refresh to the grant the static score sees
+    assert today.columns["equity_pct"].tolist() == pytest.approx([4.8, 0.96, 0.1])
+    early = vesting.features_as_of(base, curves, "2023-02-01", equity_info["format"], 1_000_000)
+    assert early is vesting.features_as_of(base, curves, "2023-02-01", equity_info["format"], 1_000_000)
+    assert early.columns["equity_pct"].tolist() == pytest.approx([1.3, 0.0, 0.1])
+    changed = [engine.FEATURE_NAMES.index("tenure"), engine.FEATURE_NAMES.index("equity")]
+    others = [c for c in range(len(engine.FEATURE_NAMES)) if c not in changed]
+    np.testing.assert_array_equal(early.matrix[:, others], base.matrix[:, others])
+    assert early.comp is base.comp and early.org is base.org
+
+
+def test_vested_is_the_default_only_with_vesting_start_dates():
+    df, _ = engine.load_roster(StringIO(ROSTER))
+    assert vesting.default_basis(df) == "vested"
+    text = pd.read_csv(StringIO(ROSTER)).drop(columns=["vesting_start_date", "equity_refreshes"]).to_csv(index=False)
+    dated_by_start, info = engine.load_roster(StringIO(text))
+    assert vesting.default_basis(dated_by_start) == "total"
+    # Without vesting start dates the default scores every grant, like the static equity score
+    base = engine.get_features(dated_by_start, info["format"], 1_000_000)
+    features = pipeline.roster_features(dated_by_start, info, 1_000_000)
+    np.testing.assert_allclose(features.columns["equity_pct"], base.columns["equity_pct"])